@@ -0,0 +1,256 @@
+#!/usr/bin/env python3
+"""
+Offline bulk analysis: run text extraction and extract_skills (and optionally
+question generation) over a directory or .zip of resumes, without HTTP.
+
+Files are processed by a process pool and each result is appended to a JSONL
+file as soon as it is ready. The JSONL doubles as the checkpoint: on restart,
+files already analysed successfully are skipped, so an interrupted run picks
+up where it stopped; failed files are dropped from it and tried again. --format parquet converts the finished JSONL with pyarrow.
+Throughput (files/sec) and the error rate are printed while the run goes.
+
+Usage:
+    python analyze_bulk.py resumes/ --out results.jsonl --workers 8
+    python analyze_bulk.py resumes.zip --out results.jsonl --questions --candidate-db candidates.db
+"""
+import io
+import os
+import sys
+import json
+import time
+import zipfile
+import argparse
+import logging
+from concurrent.futures import FIRST_COMPLETED, BrokenExecutor, ProcessPoolExecutor, wait
+
+# Add api directory to path to import index
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), 'api'))
+
+# Per-file failures are recorded in the output, keep the console for progress
+logging.disable(logging.ERROR)
+import index
+from _analysis_cache import AnalysisCache
+
+_worker_archive = None
+
+
+def list_inputs(path):
+    """Sorted resume paths under a directory, or member names of a .zip archive."""
+    if not os.path.isdir(path) and not zipfile.is_zipfile(path):
+        raise ValueError(f"{path} is not a directory or .zip archive")
+    if zipfile.is_zipfile(path):
+        with zipfile.ZipFile(path) as archive:
+            names = [info.filename for info in archive.infolist()
+                     if not info.is_dir() and not os.path.basename(info.filename).startswith('.')]
+    else:
+        names = []
+        for root, dirs, files in os.walk(path):
+            dirs.sort()
+            names.extend(os.path.relpath(os.path.join(root, name), path) for name in sorted(files))
+    return [name for name in sorted(names) if os.path.splitext(name)[1].lower() in index.SUPPORTED_EXTENSIONS]
+
+
+def read_input(source, is_zip, name):
+    global _worker_archive
+    if is_zip:
+        # One open archive per worker process
+        if _worker_archive is None:
+            _worker_archive = zipfile.ZipFile(source)
+        return _worker_archive.read(name)
+    with open(os.path.join(source, name), 'rb') as f:
+        return f.read()
+
+
+def analyze_file(source, is_zip, name, questions):
+    """Worker: one resume -> result dict (never raises)."""
+    started = time.perf_counter()
+    file_ext = os.path.splitext(name)[1].lower()
+    result = {'path': name}
+    try:
+        data = read_input(source, is_zip, name)
+        content_key = AnalysisCache.key_for(data, file_ext)
+        text = index.extract_resume_text(io.BytesIO(data), file_ext)
+        skills = index.extract_skills(text)
+        result.update(status='success', content_key=content_key, characters=len(text), skills=skills)
+        if questions:
+            payload, used_llm = index.generate_payload(text, skills, seed_key=content_key)
+            result.update(questions=payload['questions_categorized'], used_llm=used_llm)
+    except index.ResumeProcessingError as e:
+        result.update(status='error', error=str(e), code=e.status_code)
+    except Exception as e:
+        result.update(status='error', error=f'{type(e).__name__}: {e}', code=500)
+    result['seconds'] = round(time.perf_counter() - started, 4)
+    return result
+
+
+def load_checkpoint(out_path):
+    """
+    Paths analysed successfully in the output file. Error rows are removed so those
+    files are retried, and so is a torn last line left by a crash.
+    """
+    done = set()
+    if not os.path.exists(out_path):
+        return done
+    kept = []
+    valid_bytes = 0
+    retried = False
+    with open(out_path, 'rb') as f:
+        for line in f:
+            try:
+                result = json.loads(line)
+                path = result['path']
+            except (ValueError, KeyError):
+                break
+            valid_bytes += len(line)
+            if result.get('status') == 'success':
+                done.add(path)
+                kept.append(line)
+            else:
+                retried = True
+    if retried:
+        with open(out_path + '.tmp', 'wb') as f:
+            f.writelines(kept)
+        os.replace(out_path + '.tmp', out_path)
+    elif valid_bytes != os.path.getsize(out_path):
+        with open(out_path, 'r+b') as f:
+            f.truncate(valid_bytes)
+    return done
+
+
+class Progress:
+    def __init__(self, total, already_done, interval):
+        self.total = total
+        self.already_done = already_done
+        self.interval = interval
+        self.done = 0
+        self.errors = 0
+        self.started = time.perf_counter()
+        self._last_report = self.started
+        self._last_done = 0
+
+    def update(self, result):
+        self.done += 1
+        if result['status'] != 'success':
+            self.errors += 1
+        now = time.perf_counter()
+        if now - self._last_report >= self.interval:
+            self.report(now)
+
+    def report(self, now=None, final=False):
+        now = now or time.perf_counter()
+        elapsed = max(now - self.started, 1e-9)
+        recent = (self.done - self._last_done) / max(now - self._last_report, 1e-9)
+        rate = self.done / elapsed
+        remaining = self.total - self.already_done - self.done
+        eta = f", ETA {remaining / rate:.0f}s" if rate and remaining and not final else ""
+        error_rate = self.errors / self.done * 100 if self.done else 0.0
+        print(f"{'done' if final else 'progress'}: {self.already_done + self.done}/{self.total} files, "
+              f"{rate:.1f} files/s (recent {recent:.1f}), errors {self.errors} ({error_rate:.1f}%){eta}",
+              file=sys.stderr, flush=True)
+        self._last_report = now
+        self._last_done = self.done
+
+
+def write_parquet(jsonl_path, parquet_path):
+    try:
+        import pyarrow.json as pa_json
+        import pyarrow.parquet as pq
+    except ImportError:
+        print("pyarrow is not installed; results are in the JSONL file only", file=sys.stderr)
+        return False
+    pq.write_table(pa_json.read_json(jsonl_path), parquet_path)
+    return True
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Analyse a directory or .zip of resumes offline")
+    parser.add_argument('input', help="Directory (searched recursively) or .zip archive")
+    parser.add_argument('--out', required=True, help="JSONL output, also used as the resume checkpoint")
+    parser.add_argument('--format', choices=('jsonl', 'parquet'), default='jsonl',
+                        help="parquet also writes <out>.parquet when the run completes")
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1)
+    parser.add_argument('--questions', action='store_true', help="Also generate interview questions")
+    parser.add_argument('--candidate-db', help="Add analysed resumes to this candidate store (SQLite)")
+    parser.add_argument('--progress-interval', type=float, default=5.0, help="Seconds between progress lines")
+    parser.add_argument('--restart', action='store_true', help="Ignore the checkpoint and start over")
+    args = parser.parse_args()
+
+    if args.restart and os.path.exists(args.out):
+        os.remove(args.out)
+    try:
+        names = list_inputs(args.input)
+    except ValueError as e:
+        parser.error(str(e))
+    done = load_checkpoint(args.out)
+    pending = [name for name in names if name not in done]
+    print(f"{len(names)} resumes, {len(names) - len(pending)} already done, {len(pending)} to analyse "
+          f"with {args.workers} workers", file=sys.stderr)
+
+    store = None
+    if args.candidate_db:
+        from _candidate_store import CandidateStore
+        store = CandidateStore(args.candidate_db)
+
+    progress = Progress(len(names), len(names) - len(pending), args.progress_interval)
+    max_in_flight = args.workers * 4  # Bounded so 50k files don't all sit in the pool's queue
+    queue = iter(pending)
+    is_zip = zipfile.is_zipfile(args.input)
+    interrupted = False
+    crashed = None
+    with open(args.out, 'a', encoding='utf-8') as out, ProcessPoolExecutor(max_workers=args.workers) as pool:
+        in_flight = {}  # future -> resume path
+
+        def record(results):
+            stored = []
+            for result in results:
+                out.write(json.dumps(result) + "\n")
+                progress.update(result)
+                if result['status'] == 'success':
+                    stored.append((result['content_key'], result['path'], result['skills']))
+            out.flush()
+            if store is not None and stored:
+                store.add_many(stored)
+
+        try:
+            while True:
+                for name in queue:
+                    in_flight[pool.submit(analyze_file, args.input, is_zip, name, args.questions)] = name
+                    if len(in_flight) >= max_in_flight:
+                        break
+                if not in_flight:
+                    break
+                finished, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                completed = [future for future in finished if future.exception() is None]
+                record([future.result() for future in completed])
+                for future in completed:
+                    del in_flight[future]
+                for future in finished:
+                    if future in in_flight:
+                        raise future.exception()
+        except KeyboardInterrupt:
+            interrupted = True
+            for future in in_flight:
+                future.cancel()
+            pool.shutdown(wait=False, cancel_futures=True)
+        except BrokenExecutor as e:
+            # A worker died (out of memory, a crash in a PDF library): the whole pool is gone.
+            # Files in flight get error rows, so the next run retries them.
+            crashed = e
+            record([{'path': name, 'status': 'error', 'error': f'Worker process crashed: {e}', 'code': 500}
+                    for name in sorted(in_flight.values())])
+            pool.shutdown(wait=False, cancel_futures=True)
+
+    progress.report(final=True)
+    if interrupted:
+        print(f"Interrupted; rerun the same command to resume from {args.out}", file=sys.stderr)
+        sys.exit(130)
+    if crashed is not None:
+        print(f"A worker process crashed ({crashed}); rerun the same command to resume from {args.out}",
+              file=sys.stderr)
+        sys.exit(1)
+    if args.format == 'parquet' and write_parquet(args.out, os.path.splitext(args.out)[0] + '.parquet'):
+        print(f"Wrote {os.path.splitext(args.out)[0]}.parquet", file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,175 @@
+"""
+Admission control for the analysis pipeline.
+
+Each stage (CPU extraction, LLM calls) gets a StageLimiter: at most `limit`
+requests run the stage at once, at most `max_waiting` more wait for a slot,
+and a waiter gives up after `wait_timeout` seconds. Anything beyond that is
+rejected straight away with Overloaded, carrying the HTTP status (429 when
+the wait queue is full, 503 when the wait timed out) and a Retry-After hint
+based on recent stage durations, so a burst is shed before it can pile up
+threads and buffered uploads.
+
+Threads take slots with slot(); coroutines with slot_async(), which waits on
+the event loop instead of blocking it. Both share the same limit, queue and
+counters. A freed slot goes straight to the longest-waiting coroutine, if
+any, before waking a waiting thread.
+"""
+import asyncio
+import math
+import threading
+import time
+from collections import deque
+from contextlib import asynccontextmanager, contextmanager
+
+
+class Overloaded(Exception):
+    def __init__(self, stage, status_code, retry_after):
+        reason = "queue is full" if status_code == 429 else "timed out waiting for a slot"
+        super().__init__(f"Server busy ({stage} {reason}), retry after {retry_after}s")
+        self.stage = stage
+        self.status_code = status_code
+        self.retry_after = retry_after
+
+
+class StageLimiter:
+    def __init__(self, name, limit, max_waiting=16, wait_timeout=10.0):
+        self.name = name
+        self.limit = limit
+        self.max_waiting = max_waiting
+        self.wait_timeout = wait_timeout
+        self._cond = threading.Condition()
+        self._active = 0
+        self._waiting = 0
+        self._async_waiters = deque()  # (loop, future) of coroutines queued in slot_async
+        self._avg_seconds = 1.0  # Running average of stage duration, seeds the Retry-After hint
+        self.counters = {'admitted': 0, 'queued': 0, 'rejected_full': 0, 'rejected_timeout': 0}
+
+    def retry_after(self):
+        """Seconds until a new request would likely get a slot."""
+        with self._cond:
+            backlog = self._waiting + 1
+            return max(1, math.ceil(backlog / max(self.limit, 1) * self._avg_seconds))
+
+    def saturated(self):
+        """True if a new request would be rejected right now (all slots busy and the queue full)."""
+        with self._cond:
+            return self._active >= self.limit and self._waiting >= self.max_waiting
+
+    def _acquire(self, timeout):
+        with self._cond:
+            if self._active < self.limit:
+                self._active += 1
+                self.counters['admitted'] += 1
+                return
+            if self._waiting >= self.max_waiting:
+                self.counters['rejected_full'] += 1
+                status_code = 429
+            else:
+                self._waiting += 1
+                self.counters['queued'] += 1
+                deadline = time.monotonic() + timeout
+                try:
+                    while self._active >= self.limit:
+                        remaining = deadline - time.monotonic()
+                        if remaining <= 0:
+                            break
+                        self._cond.wait(remaining)
+                finally:
+                    self._waiting -= 1
+                if self._active < self.limit:
+                    self._active += 1
+                    self.counters['admitted'] += 1
+                    return
+                self.counters['rejected_timeout'] += 1
+                status_code = 503
+        raise Overloaded(self.name, status_code, self.retry_after())
+
+    async def _acquire_async(self, timeout):
+        loop = asyncio.get_running_loop()
+        with self._cond:
+            if self._active < self.limit:
+                self._active += 1
+                self.counters['admitted'] += 1
+                return
+            if self._waiting >= self.max_waiting:
+                self.counters['rejected_full'] += 1
+                status_code = 429
+            else:
+                self._waiting += 1
+                self.counters['queued'] += 1
+                entry = (loop, loop.create_future())
+                self._async_waiters.append(entry)
+                status_code = None
+        if status_code is None:
+            try:
+                await asyncio.wait({entry[1]}, timeout=timeout)
+            except asyncio.CancelledError:
+                if not self._withdraw(entry):
+                    self._hand_over()  # Granted meanwhile: pass the slot on
+                raise
+            if not self._withdraw(entry):
+                return  # Granted (the slot was handed over in _release)
+            with self._cond:
+                self.counters['rejected_timeout'] += 1
+            status_code = 503
+        raise Overloaded(self.name, status_code, self.retry_after())
+
+    def _withdraw(self, entry):
+        """Take a coroutine out of the queue; False if it was already granted a slot."""
+        with self._cond:
+            try:
+                self._async_waiters.remove(entry)
+            except ValueError:
+                return False
+            self._waiting -= 1
+            return True
+
+    def _hand_over(self):
+        # A freed slot passes to the first queued coroutine (_active stays the same), else a thread may take it
+        with self._cond:
+            if self._async_waiters:
+                loop, waiter = self._async_waiters.popleft()
+                self._waiting -= 1
+                self.counters['admitted'] += 1
+                loop.call_soon_threadsafe(_grant, waiter)
+            else:
+                self._active -= 1
+                self._cond.notify()
+
+    def _release(self, seconds):
+        with self._cond:
+            self._avg_seconds = 0.8 * self._avg_seconds + 0.2 * seconds
+        self._hand_over()
+
+    @contextmanager
+    def slot(self, timeout=None):
+        """Hold one slot of this stage for the duration of the with block. Raises Overloaded."""
+        self._acquire(self.wait_timeout if timeout is None else timeout)
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self._release(time.perf_counter() - started)
+
+    @asynccontextmanager
+    async def slot_async(self, timeout=None):
+        """slot() for coroutines: waits for a slot on the event loop. Raises Overloaded."""
+        await self._acquire_async(self.wait_timeout if timeout is None else timeout)
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self._release(time.perf_counter() - started)
+
+    def stats(self):
+        with self._cond:
+            stats = dict(self.counters)
+            stats.update(limit=self.limit, active=self._active, waiting=self._waiting,
+                         max_waiting=self.max_waiting, wait_timeout=self.wait_timeout,
+                         avg_seconds=round(self._avg_seconds, 4))
+        return stats
+
+
+def _grant(waiter):
+    if not waiter.done():
+        waiter.set_result(None)
@@ -0,0 +1,162 @@
+"""
+Content-addressed cache for /api/upload responses.
+
+Uploads are keyed by a SHA-256 of the raw file bytes (plus extension), so
+re-uploading the same resume skips text extraction, skill matching and the
+Gemini call. The in-memory tier is a bounded LRU with a TTL; an optional
+SQLite tier (RESUME_CACHE_DB) keeps entries across restarts.
+"""
+import hashlib
+import json
+import logging
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+logger = logging.getLogger(__name__)
+
+
+class AnalysisCache:
+    def __init__(self, max_entries=256, ttl_seconds=3600, db_path=None):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.db_path = db_path
+        self._entries = OrderedDict()  # key -> (stored_at, payload, meta)
+        self._lock = threading.Lock()
+        self.counters = {
+            'memory_hits': 0,
+            'disk_hits': 0,
+            'misses': 0,
+            'bypassed': 0,
+            'stores': 0,
+            'evictions': 0,
+            'expired': 0,
+            'saved_seconds': 0.0,
+            'llm_calls_saved': 0,
+        }
+        if db_path:
+            self._init_db()
+
+    @staticmethod
+    def key_for(file_bytes, file_ext):
+        digest = hashlib.sha256(file_bytes).hexdigest()
+        return f"{digest}{file_ext}"
+
+    @staticmethod
+    def key_for_stream(stream, file_ext, chunk_size=1 << 16):
+        """Hash a seekable binary stream in chunks and rewind it."""
+        digest = hashlib.sha256()
+        stream.seek(0)
+        for chunk in iter(lambda: stream.read(chunk_size), b''):
+            digest.update(chunk)
+        stream.seek(0)
+        return f"{digest.hexdigest()}{file_ext}"
+
+    def _init_db(self):
+        try:
+            with sqlite3.connect(self.db_path) as conn:
+                conn.execute(
+                    "CREATE TABLE IF NOT EXISTS analysis_cache ("
+                    "key TEXT PRIMARY KEY, stored_at REAL, payload TEXT, meta TEXT)"
+                )
+        except sqlite3.Error as e:
+            logger.warning(f"Disabling disk cache tier ({self.db_path}): {e}")
+            self.db_path = None
+
+    def _is_fresh(self, stored_at, meta):
+        return time.time() - stored_at < meta.get('ttl_seconds', self.ttl_seconds)
+
+    def _record_hit(self, kind, meta):
+        self.counters[kind] += 1
+        self.counters['saved_seconds'] += meta.get('compute_seconds', 0.0)
+        if meta.get('used_llm'):
+            self.counters['llm_calls_saved'] += 1
+
+    def get(self, key):
+        """Return the cached payload for key, or None on a miss."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                stored_at, payload, meta = entry
+                if self._is_fresh(stored_at, meta):
+                    self._entries.move_to_end(key)
+                    self._record_hit('memory_hits', meta)
+                    return payload
+                del self._entries[key]
+                self.counters['expired'] += 1
+
+        row = self._db_get(key)
+        with self._lock:
+            if row is not None:
+                stored_at, payload, meta = row
+                if self._is_fresh(stored_at, meta):
+                    self._insert(key, stored_at, payload, meta)
+                    self._record_hit('disk_hits', meta)
+                    return payload
+                self.counters['expired'] += 1
+            self.counters['misses'] += 1
+        return None
+
+    def put(self, key, payload, compute_seconds=0.0, used_llm=False, ttl_seconds=None):
+        """ttl_seconds shortens the cache TTL for this entry (e.g. a static fallback while Gemini is down)."""
+        meta = {'compute_seconds': compute_seconds, 'used_llm': used_llm}
+        if ttl_seconds is not None and ttl_seconds < self.ttl_seconds:
+            meta['ttl_seconds'] = ttl_seconds
+        stored_at = time.time()
+        with self._lock:
+            self._insert(key, stored_at, payload, meta)
+            self.counters['stores'] += 1
+        self._db_put(key, stored_at, payload, meta)
+
+    def record_bypass(self):
+        with self._lock:
+            self.counters['bypassed'] += 1
+
+    def _insert(self, key, stored_at, payload, meta):
+        self._entries[key] = (stored_at, payload, meta)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.counters['evictions'] += 1
+
+    def _db_get(self, key):
+        if not self.db_path:
+            return None
+        try:
+            with sqlite3.connect(self.db_path) as conn:
+                row = conn.execute(
+                    "SELECT stored_at, payload, meta FROM analysis_cache WHERE key = ?", (key,)
+                ).fetchone()
+        except sqlite3.Error as e:
+            logger.warning(f"Disk cache read failed: {e}")
+            return None
+        if row is None:
+            return None
+        return row[0], json.loads(row[1]), json.loads(row[2])
+
+    def _db_put(self, key, stored_at, payload, meta):
+        if not self.db_path:
+            return
+        try:
+            with sqlite3.connect(self.db_path) as conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO analysis_cache (key, stored_at, payload, meta) VALUES (?, ?, ?, ?)",
+                    (key, stored_at, json.dumps(payload), json.dumps(meta))
+                )
+                conn.execute("DELETE FROM analysis_cache WHERE stored_at < ?",
+                             (time.time() - self.ttl_seconds,))
+        except sqlite3.Error as e:
+            logger.warning(f"Disk cache write failed: {e}")
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self.counters)
+            stats['entries'] = len(self._entries)
+        lookups = stats['memory_hits'] + stats['disk_hits'] + stats['misses']
+        stats['hit_ratio'] = round((stats['memory_hits'] + stats['disk_hits']) / lookups, 4) if lookups else 0.0
+        stats['saved_seconds'] = round(stats['saved_seconds'], 3)
+        stats['max_entries'] = self.max_entries
+        stats['ttl_seconds'] = self.ttl_seconds
+        stats['disk_tier'] = bool(self.db_path)
+        return stats
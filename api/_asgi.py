@@ -0,0 +1,386 @@
+"""
+ASGI serving mode: the /upload and /api/upload contract of the Flask app, but
+without a worker thread parked on every Gemini call.
+
+An upload is read and parsed off the event loop, text extraction and skill
+matching run in a thread pool sized like the CPU stage (CPU_STAGE_LIMIT +
+CPU_STAGE_QUEUE), and the Gemini call is awaited (GeminiClient.generate_async),
+so a single process keeps hundreds of analyses in flight while the model
+thinks. Cache, question-set reuse, fallbacks and the response body are the
+same as the Flask view's. ?stream=1, incremental uploads and every other
+route are handed to the Flask app in a thread, so the whole API stays
+available.
+
+    pip install uvicorn
+    python api/_asgi.py                      # or: uvicorn _asgi:app --app-dir api
+
+ASGI_MAX_IN_FLIGHT caps concurrent uploads (429 + Retry-After beyond it).
+Awaited Gemini calls go through their own LLM stage (LLM_LIMITER, limit
+ASGI_LLM_LIMIT, since a waiting call holds no thread), with the Flask app's
+LLM_STAGE_QUEUE and STAGE_WAIT_TIMEOUT: they are queued, shed to the static
+questions and counted like the Flask view's calls. Delegated Flask views keep
+index.LLM_LIMITER.
+"""
+import asyncio
+import contextvars
+import functools
+import io
+import json
+import logging
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import parse_qs
+
+from werkzeug.formparser import parse_form_data
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+import index
+from index import LLM_OUTCOMES, ResumeProcessingError, timed_stage
+from _admission import Overloaded, StageLimiter
+from _analysis_cache import AnalysisCache
+from _llm import LLMUnavailable
+
+logger = logging.getLogger(__name__)
+
+ASGI_MAX_IN_FLIGHT = int(os.environ.get("ASGI_MAX_IN_FLIGHT", "512"))
+ASGI_LLM_LIMIT = int(os.environ.get("ASGI_LLM_LIMIT", "256"))
+ASGI_CPU_WORKERS = int(os.environ.get("ASGI_CPU_WORKERS", str(index.CPU_STAGE_LIMIT + index.CPU_STAGE_QUEUE)))
+ASGI_WSGI_WORKERS = int(os.environ.get("ASGI_WSGI_WORKERS", "16"))
+
+UPLOAD_PATHS = ('/upload', '/api/upload')
+UPLOAD_MAX_BODY = index.UPLOAD_ENDPOINTS['upload_resume']
+WSGI_MAX_BODY = max(index.UPLOAD_ENDPOINTS.values())
+
+CPU_EXECUTOR = ThreadPoolExecutor(max_workers=ASGI_CPU_WORKERS, thread_name_prefix="asgi-cpu")
+WSGI_EXECUTOR = ThreadPoolExecutor(max_workers=ASGI_WSGI_WORKERS, thread_name_prefix="asgi-wsgi")
+LLM_LIMITER = StageLimiter('llm', ASGI_LLM_LIMIT, index.LLM_STAGE_QUEUE, index.STAGE_WAIT_TIMEOUT)
+# Gemini calls that lost the hedge race, referenced until they finish
+HEDGED_CALLS = set()
+ASGI_STATS = {'in_flight': 0, 'max_in_flight': ASGI_MAX_IN_FLIGHT,
+              'uploads': 0, 'delegated': 0, 'rejected_busy': 0}
+
+
+def run_in(executor, fn, *args):
+    """run_in_executor that carries the caller's context (SERVER_TIMING, PINNED_SKILL_INDEX) into the thread."""
+    context = contextvars.copy_context()
+    return asyncio.get_running_loop().run_in_executor(executor, functools.partial(context.run, fn, *args))
+
+
+async def generate_questions_with_ai(resume_text, skills, timeout=None):
+    """Async twin of index.generate_questions_with_ai: the Gemini call is awaited."""
+    if index.LLM_CLIENT is None:
+        LLM_OUTCOMES.inc('disabled')
+        return None
+
+    try:
+        prompt = index.build_prompt(resume_text, skills)
+        try:
+            async with LLM_LIMITER.slot_async():
+                with timed_stage('llm'):
+                    content = (await index.LLM_CLIENT.generate_async(prompt, timeout=timeout)).strip()
+        except LLMUnavailable as e:
+            logger.warning(f"Gemini unavailable, falling back to static questions: {e}")
+            LLM_OUTCOMES.inc('unavailable')
+            return None
+        except Overloaded as e:
+            logger.warning(f"LLM stage overloaded, falling back to static questions: {e}")
+            LLM_OUTCOMES.inc('shed')
+            return None
+        return index.parse_ai_questions(content, skills)
+    except Exception as e:
+        logger.error(f"Gemini API error: {e}", exc_info=True)
+        LLM_OUTCOMES.inc('error')
+        return None
+
+
+async def generate_ai_questions(text, skills, timeout=None):
+    """Async twin of index.generate_ai_questions (question-set cache first). Returns (ai_result, used_llm)."""
+    if index.LLM_CLIENT is None:
+        return await generate_questions_with_ai(text, skills), False
+
+    signature = index.question_set_signature(skills)
+    cached = index.QUESTION_SET_CACHE.get(signature)
+    if cached is not None:
+        LLM_OUTCOMES.inc('question_set_cache')
+        return index.question_set_result(cached, skills, text), False
+
+    ai_result = await generate_questions_with_ai(text, skills, timeout=timeout)
+    if ai_result and isinstance(ai_result, dict):
+        index.store_question_set(signature, ai_result["questions"], text, skills)
+        return ai_result, True
+
+    stale = index.QUESTION_SET_CACHE.get(signature, allow_stale=True)
+    if stale is not None:
+        return index.question_set_result(stale, skills, text), False
+    return None, False
+
+
+async def generate_payload(text, skills, seed_key=None):
+    """Async twin of index.generate_payload. Returns (payload, used_llm)."""
+    if index.LLM_HEDGE:
+        # Same race as index.generate_payload: the losing Gemini call keeps running and fills the question-set cache
+        started = time.perf_counter()
+        call = asyncio.ensure_future(generate_ai_questions(text, skills))
+        static_payload = index.build_static_payload(skills, seed_key)
+        done, _ = await asyncio.wait({call}, timeout=max(0.0, index.LLM_HEDGE_BUDGET - (time.perf_counter() - started)))
+        if call in done:
+            ai_result, used_llm = call.result()
+        else:
+            HEDGED_CALLS.add(call)
+            call.add_done_callback(HEDGED_CALLS.discard)
+            LLM_OUTCOMES.inc('hedged')
+            ai_result, used_llm = None, False
+    else:
+        static_payload = None
+        ai_result, used_llm = await generate_ai_questions(text, skills)
+
+    if ai_result:
+        return index.build_ai_payload(ai_result, skills), used_llm
+    LLM_OUTCOMES.inc('fallback')
+    return static_payload or index.build_static_payload(skills, seed_key), False
+
+
+def extract_and_match(data, file_ext, candidate):
+    """CPU part of the upload (runs in CPU_EXECUTOR): extract text, match skills, store the candidate."""
+    text, skills = index.scan_resume(io.BytesIO(data), file_ext)
+    index.record_candidate(candidate, skills)
+    return text, skills
+
+
+def wsgi_environ(scope, body):
+    server = scope.get('server') or ('localhost', 80)
+    client = scope.get('client') or ('', 0)
+    environ = {
+        'REQUEST_METHOD': scope['method'],
+        'SCRIPT_NAME': scope.get('root_path', '').encode('utf-8').decode('latin-1'),
+        'PATH_INFO': scope['path'].encode('utf-8').decode('latin-1'),
+        'QUERY_STRING': scope['query_string'].decode('latin-1'),
+        'SERVER_NAME': server[0],
+        'SERVER_PORT': str(server[1]),
+        'REMOTE_ADDR': client[0],
+        'SERVER_PROTOCOL': f"HTTP/{scope.get('http_version', '1.1')}",
+        'CONTENT_LENGTH': str(len(body)),
+        'wsgi.version': (1, 0),
+        'wsgi.url_scheme': scope.get('scheme', 'http'),
+        'wsgi.input': io.BytesIO(body),
+        'wsgi.errors': sys.stderr,
+        'wsgi.multithread': True,
+        'wsgi.multiprocess': False,
+        'wsgi.run_once': False,
+    }
+    for name, value in scope['headers']:
+        name = name.decode('latin-1').upper().replace('-', '_')
+        value = value.decode('latin-1')
+        if name == 'CONTENT_TYPE':
+            environ['CONTENT_TYPE'] = value
+        elif name != 'CONTENT_LENGTH':
+            key = f"HTTP_{name}"
+            environ[key] = f"{environ[key]},{value}" if key in environ else value
+    return environ
+
+
+async def read_body(scope, receive, max_bytes):
+    """The whole request body; ResumeProcessingError(413) past max_bytes, 400 for a malformed Content-Length."""
+    for name, value in scope['headers']:
+        if name == b'content-length':
+            try:
+                content_length = int(value)
+            except ValueError:
+                raise ResumeProcessingError('Invalid Content-Length header', 400)
+            if content_length > max_bytes:
+                raise ResumeProcessingError(f'Upload too large (max {max_bytes - index.MULTIPART_OVERHEAD} bytes)', 413)
+    chunks = []
+    size = 0
+    while True:
+        message = await receive()
+        if message['type'] == 'http.disconnect':
+            raise ResumeProcessingError('Client disconnected', 400)
+        chunk = message.get('body', b'')
+        size += len(chunk)
+        if size > max_bytes:
+            raise ResumeProcessingError(f'Upload too large (max {max_bytes - index.MULTIPART_OVERHEAD} bytes)', 413)
+        chunks.append(chunk)
+        if not message.get('more_body'):
+            return b''.join(chunks)
+
+
+async def send_response(send, status, body, headers):
+    await send({'type': 'http.response.start', 'status': status,
+                'headers': [(name.lower().encode('latin-1'), str(value).encode('latin-1'))
+                            for name, value in headers]})
+    await send({'type': 'http.response.body', 'body': body})
+
+
+async def send_json(send, status, payload, headers=()):
+    # Same encoding as Flask's jsonify outside debug mode
+    body = (json.dumps(payload, sort_keys=True, separators=(',', ':')) + "\n").encode('utf-8')
+    headers = [('Content-Type', 'application/json'), ('Content-Length', len(body)),
+               ('Access-Control-Allow-Origin', '*'), *headers]
+    await send_response(send, status, body, headers)
+
+
+async def send_error(send, message, status_code, retry_after=None, headers=()):
+    headers = list(headers)
+    if retry_after is not None:
+        headers.append(('Retry-After', retry_after))
+    await send_json(send, status_code, {'status': 'error', 'error': message}, headers)
+
+
+async def call_wsgi(scope, receive, send, body=None):
+    """Serve the request with the Flask app in WSGI_EXECUTOR, streaming its response back."""
+    ASGI_STATS['delegated'] += 1
+    if body is None:
+        try:
+            body = await read_body(scope, receive, WSGI_MAX_BODY)
+        except ResumeProcessingError as e:
+            return await send_error(send, str(e), e.status_code)
+    loop = asyncio.get_running_loop()
+    queue = asyncio.Queue()
+
+    def run():
+        def start_response(status, headers, exc_info=None):
+            loop.call_soon_threadsafe(queue.put_nowait, ('start', int(status.split(' ', 1)[0]), headers))
+        try:
+            result = index.app(wsgi_environ(scope, body), start_response)
+            try:
+                for chunk in result:
+                    if chunk:
+                        loop.call_soon_threadsafe(queue.put_nowait, ('body', chunk))
+            finally:
+                if hasattr(result, 'close'):
+                    result.close()
+        finally:
+            loop.call_soon_threadsafe(queue.put_nowait, ('end',))
+
+    done = loop.run_in_executor(WSGI_EXECUTOR, run)
+    started = False
+    while True:
+        message = await queue.get()
+        if message[0] == 'start':
+            await send({'type': 'http.response.start', 'status': message[1],
+                        'headers': [(name.lower().encode('latin-1'), value.encode('latin-1'))
+                                    for name, value in message[2]]})
+            started = True
+        elif message[0] == 'body':
+            await send({'type': 'http.response.body', 'body': message[1], 'more_body': True})
+        else:
+            break
+    try:
+        await done
+    except Exception as e:
+        logger.error(f"❌ WSGI app failed: {e}", exc_info=True)
+        if not started:
+            return await send_error(send, f'Server error: {str(e)}', 500)
+    await send({'type': 'http.response.body', 'body': b''})
+
+
+async def upload(scope, receive, send):
+    """POST /upload and /api/upload; same responses as index.upload_resume."""
+    started = time.perf_counter()
+    server_timing = {}
+    index.SERVER_TIMING.set(server_timing)
+    # One index snapshot for the whole request (run_in carries it into the CPU stage)
+    skill_index = index.SKILL_INDEX
+    index.PINNED_SKILL_INDEX.set(skill_index)
+    headers = [('X-Index-Version', f"{skill_index.version}-{skill_index.fingerprint}")]
+    status = 200
+    try:
+        body = await read_body(scope, receive, UPLOAD_MAX_BODY)
+        _, form, files = await run_in(None, parse_form_data, wsgi_environ(scope, body))
+        query = parse_qs(scope['query_string'].decode('latin-1'))
+
+        def param(name):
+            return (query.get(name) or [None])[0] or form.get(name)
+
+        def flag(name):
+            return (param(name) or '').lower() in ('1', 'true', 'yes')
+
+        if flag('stream') or flag('incremental') or param('previous'):
+            # Progressive and incremental responses keep using the Flask view (which records its own metrics)
+            status = None
+            return await call_wsgi(scope, receive, send, body)
+
+        file, file_ext = index.get_uploaded_resume(files)
+        filename = file.filename
+        data = file.read()
+        with timed_stage('hash'):
+            content_key = AnalysisCache.key_for(data, file_ext)
+        cache_key = index.index_cache_key(content_key)
+        seed = param('seed')
+        if seed:
+            cache_key = f"{cache_key}#{seed}"
+        if flag('nocache'):
+            index.ANALYSIS_CACHE.record_bypass()
+        else:
+            cached = index.ANALYSIS_CACHE.get(cache_key)
+            if cached is not None:
+                headers.append(('X-Cache', 'HIT'))
+                headers.append(('Server-Timing', index.server_timing_header(server_timing, time.perf_counter() - started)))
+                return await send_json(send, status, cached, headers)
+
+        compute_started = time.perf_counter()
+        text, skills = await run_in(CPU_EXECUTOR, extract_and_match, data, file_ext, (content_key, filename))
+        payload, used_llm = await generate_payload(text, skills, cache_key)
+        index.ANALYSIS_CACHE.put(cache_key, payload,
+                                 compute_seconds=time.perf_counter() - compute_started,
+                                 used_llm=used_llm, ttl_seconds=index.analysis_cache_ttl(payload))
+        headers.append(('X-Cache', 'MISS'))
+        headers.append(('Server-Timing', index.server_timing_header(server_timing, time.perf_counter() - started)))
+        await send_json(send, status, payload, headers)
+    except ResumeProcessingError as e:
+        status = e.status_code
+        if status == 413:
+            index.ADMISSION_REJECTS.inc('upload_resume', 'too_large')
+        await send_error(send, str(e), e.status_code, e.retry_after, headers)
+    except Exception as e:
+        status = 500
+        logger.error(f"❌ Unexpected error processing file: {e}", exc_info=True)
+        await send_error(send, f'Server error: {str(e)}', 500, headers=headers)
+    finally:
+        if status is not None:
+            index.REQUEST_SECONDS.observe('upload_resume', time.perf_counter() - started)
+            index.REQUESTS_TOTAL.inc('upload_resume', str(status))
+
+
+async def lifespan(receive, send):
+    while True:
+        message = await receive()
+        if message['type'] == 'lifespan.startup':
+            await send({'type': 'lifespan.startup.complete'})
+        elif message['type'] == 'lifespan.shutdown':
+            CPU_EXECUTOR.shutdown(wait=False, cancel_futures=True)
+            WSGI_EXECUTOR.shutdown(wait=False, cancel_futures=True)
+            await send({'type': 'lifespan.shutdown.complete'})
+            return
+
+
+async def app(scope, receive, send):
+    if scope['type'] == 'lifespan':
+        return await lifespan(receive, send)
+    if scope['type'] != 'http':
+        return None
+    if scope['method'] != 'POST' or scope['path'] not in UPLOAD_PATHS:
+        return await call_wsgi(scope, receive, send)
+
+    if ASGI_STATS['in_flight'] >= ASGI_MAX_IN_FLIGHT or index.CPU_LIMITER.saturated():
+        ASGI_STATS['rejected_busy'] += 1
+        index.ADMISSION_REJECTS.inc('upload_resume', 'busy')
+        return await send_error(send, 'Server busy, please retry later', 429, index.CPU_LIMITER.retry_after())
+    ASGI_STATS['in_flight'] += 1
+    ASGI_STATS['uploads'] += 1
+    try:
+        await upload(scope, receive, send)
+    finally:
+        ASGI_STATS['in_flight'] -= 1
+
+
+index.METRICS.add_collector('resume_admission_llm_async', 'ASGI LLM stage limit, active/waiting calls and rejections',
+                            lambda: LLM_LIMITER.stats())
+index.METRICS.add_collector('resume_asgi', 'ASGI uploads in flight, delegated and rejected',
+                            lambda: dict(ASGI_STATS))
+
+if __name__ == '__main__':
+    import uvicorn
+    uvicorn.run(app, port=int(os.environ.get("PORT", "5000")), backlog=2048)
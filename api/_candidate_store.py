@@ -0,0 +1,272 @@
+"""
+Persistent candidate store with an inverted skill index (/api/candidates/search).
+
+Every analysed resume is stored once (keyed by its content hash) with the
+skills extract_skills found. For each skill the index keeps a bitmap of
+candidate ids: an arbitrary-precision int with bit n set for candidate n,
+so AND/OR/NOT of whole posting lists are single C-level big-int operations.
+Bitmaps live in memory and are persisted to SQLite zlib-compressed, next to
+the candidate rows and in the same transaction; the candidates table is the
+source of truth and the postings are rebuilt from it if they go missing.
+"""
+import json
+import logging
+import re
+import sqlite3
+import threading
+import time
+import zlib
+
+logger = logging.getLogger(__name__)
+
+# Set bit positions for every byte value, for turning bitmaps back into ids
+_BYTE_BITS = [tuple(bit for bit in range(8) if byte >> bit & 1) for byte in range(256)]
+
+
+def bitmap_to_blob(bitmap):
+    return zlib.compress(bitmap.to_bytes((bitmap.bit_length() + 7) // 8, 'little'))
+
+
+def blob_to_bitmap(blob):
+    return int.from_bytes(zlib.decompress(blob), 'little')
+
+
+def bitmap_ids(bitmap, offset=0, limit=None):
+    """Ids set in bitmap, highest (newest) first, skipping `offset` and stopping after `limit`."""
+    data = bitmap.to_bytes((bitmap.bit_length() + 7) // 8, 'little')
+    ids = []
+    skipped = 0
+    for byte_index in range(len(data) - 1, -1, -1):
+        byte = data[byte_index]
+        if not byte:
+            continue
+        for bit in reversed(_BYTE_BITS[byte]):
+            if skipped < offset:
+                skipped += 1
+                continue
+            ids.append(byte_index * 8 + bit)
+            if limit is not None and len(ids) >= limit:
+                return ids
+    return ids
+
+
+class QueryError(ValueError):
+    pass
+
+
+_QUERY_TOKEN_RE = re.compile(r'\s*(?:(\()|(\))|"([^"]*)"|([^\s()"]+))')
+_OPERATORS = {'and', 'or', 'not'}
+
+
+def parse_query(query):
+    """
+    Parse a boolean skill query into nested tuples: ('skill', name), ('and', a, b),
+    ('or', a, b), ('not', a). AND binds tighter than OR; consecutive words form one
+    skill name (machine learning AND python), and "quoted names" are taken literally.
+    """
+    tokens = []
+    position = 0
+    query = query.strip()
+    while position < len(query):
+        match = _QUERY_TOKEN_RE.match(query, position)
+        if match is None:
+            raise QueryError(f"Unexpected character at position {position}")
+        position = match.end()
+        open_paren, close_paren, quoted, word = match.groups()
+        if open_paren:
+            tokens.append(('(', None))
+        elif close_paren:
+            tokens.append((')', None))
+        elif quoted is not None:
+            tokens.append(('word', quoted))
+        elif word.lower() in _OPERATORS:
+            tokens.append((word.lower(), None))
+        else:
+            tokens.append(('word', word))
+
+    position = 0
+
+    def peek():
+        return tokens[position][0] if position < len(tokens) else None
+
+    def take(kind):
+        nonlocal position
+        if peek() != kind:
+            raise QueryError(f"Expected {kind!r} in query")
+        position += 1
+        return tokens[position - 1][1]
+
+    def parse_or():
+        node = parse_and()
+        while peek() == 'or':
+            take('or')
+            node = ('or', node, parse_and())
+        return node
+
+    def parse_and():
+        node = parse_not()
+        while peek() == 'and':
+            take('and')
+            node = ('and', node, parse_not())
+        return node
+
+    def parse_not():
+        if peek() == 'not':
+            take('not')
+            return ('not', parse_not())
+        if peek() == '(':
+            take('(')
+            node = parse_or()
+            take(')')
+            return node
+        words = [take('word')]
+        while peek() == 'word':
+            words.append(take('word'))
+        return ('skill', " ".join(words).lower())
+
+    if not tokens:
+        raise QueryError("Empty query")
+    tree = parse_or()
+    if position != len(tokens):
+        raise QueryError(f"Unexpected {tokens[position][0]!r} in query")
+    return tree
+
+
+class CandidateStore:
+    def __init__(self, db_path=None):
+        """db_path=None keeps the store in an in-memory SQLite database (lost on restart)."""
+        self.db_path = db_path or ':memory:'
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        self._postings = {}  # skill -> bitmap of candidate ids
+        self._all = 0        # bitmap of every stored candidate
+        self._init_db()
+        self._load()
+
+    def _init_db(self):
+        with self._conn:
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS candidates ("
+                "id INTEGER PRIMARY KEY, content_key TEXT UNIQUE, filename TEXT, skills TEXT, added_at REAL)"
+            )
+            # skill -> compressed bitmap; the row for skill "" holds the bitmap of all candidates
+            self._conn.execute("CREATE TABLE IF NOT EXISTS postings (skill TEXT PRIMARY KEY, bitmap BLOB)")
+
+    def _load(self):
+        started = time.perf_counter()
+        for skill, blob in self._conn.execute("SELECT skill, bitmap FROM postings"):
+            self._postings[skill] = blob_to_bitmap(blob)
+        self._all = self._postings.pop('', 0)
+        stored = self._conn.execute("SELECT COUNT(*) FROM candidates").fetchone()[0]
+        if stored != self._all.bit_count():
+            logger.warning(f"Candidate postings out of date ({self._all.bit_count()}/{stored}), rebuilding")
+            self.rebuild()
+        logger.info(f"Loaded candidate store: {stored} candidates, {len(self._postings)} skills "
+                    f"in {(time.perf_counter() - started) * 1000:.1f} ms")
+
+    def rebuild(self):
+        """Recompute every posting bitmap from the candidates table."""
+        with self._lock:
+            postings = {}
+            all_ids = 0
+            for candidate_id, skills in self._conn.execute("SELECT id, skills FROM candidates"):
+                bit = 1 << candidate_id
+                all_ids |= bit
+                for skill in json.loads(skills):
+                    postings[skill] = postings.get(skill, 0) | bit
+            self._postings = postings
+            self._all = all_ids
+            with self._conn:
+                self._conn.execute("DELETE FROM postings")
+                self._write_postings(set(postings) | {''})
+
+    def _write_postings(self, skills):
+        rows = []
+        for skill in skills:
+            bitmap = self._all if skill == '' else self._postings.get(skill, 0)
+            rows.append((skill, bitmap_to_blob(bitmap)))
+        self._conn.executemany("INSERT OR REPLACE INTO postings (skill, bitmap) VALUES (?, ?)", rows)
+
+    def add(self, content_key, filename, skills):
+        """Store (or update) one analysed resume; returns its candidate id."""
+        return self.add_many([(content_key, filename, skills)])[0]
+
+    def add_many(self, candidates):
+        """Store [(content_key, filename, skills)] in one transaction; returns their ids."""
+        ids = []
+        dirty = {''}
+        now = time.time()
+        with self._lock, self._conn:
+            for content_key, filename, skills in candidates:
+                skills = sorted({skill.lower() for skill in skills})
+                row = self._conn.execute(
+                    "SELECT id, skills FROM candidates WHERE content_key = ?", (content_key,)
+                ).fetchone()
+                if row is None:
+                    candidate_id = self._conn.execute(
+                        "INSERT INTO candidates (content_key, filename, skills, added_at) VALUES (?, ?, ?, ?)",
+                        (content_key, filename, json.dumps(skills), now)
+                    ).lastrowid
+                    old_skills = []
+                else:
+                    candidate_id, old_skills = row[0], json.loads(row[1])
+                    self._conn.execute("UPDATE candidates SET filename = ?, skills = ? WHERE id = ?",
+                                       (filename, json.dumps(skills), candidate_id))
+                bit = 1 << candidate_id
+                for skill in set(old_skills) - set(skills):
+                    self._postings[skill] = self._postings.get(skill, 0) & ~bit
+                    dirty.add(skill)
+                for skill in skills:
+                    self._postings[skill] = self._postings.get(skill, 0) | bit
+                    dirty.add(skill)
+                self._all |= bit
+                ids.append(candidate_id)
+            self._write_postings(dirty)
+        return ids
+
+    def _evaluate(self, node, unknown):
+        kind = node[0]
+        if kind == 'skill':
+            bitmap = self._postings.get(node[1])
+            if bitmap is None:
+                unknown.append(node[1])
+                return 0
+            return bitmap
+        if kind == 'not':
+            return self._all & ~self._evaluate(node[1], unknown)
+        left = self._evaluate(node[1], unknown)
+        right = self._evaluate(node[2], unknown)
+        return left & right if kind == 'and' else left | right
+
+    def search(self, tree, limit=50, offset=0):
+        """
+        Evaluate a parsed query (see parse_query). Returns (total, candidates, unknown_skills)
+        where candidates are the newest `limit` matches after `offset`.
+        """
+        unknown = []
+        with self._lock:
+            bitmap = self._evaluate(tree, unknown)
+        ids = bitmap_ids(bitmap, offset, limit)
+        candidates = []
+        if ids:
+            placeholders = ",".join("?" * len(ids))
+            with self._lock:
+                rows = self._conn.execute(
+                    f"SELECT id, filename, skills, added_at FROM candidates WHERE id IN ({placeholders})", ids
+                ).fetchall()
+            by_id = {row[0]: row for row in rows}
+            for candidate_id in ids:
+                row = by_id[candidate_id]
+                candidates.append({'id': row[0], 'filename': row[1], 'skills': json.loads(row[2]),
+                                   'added_at': row[3]})
+        return bitmap.bit_count(), candidates, unknown
+
+    def stats(self):
+        with self._lock:
+            postings_bytes = sum((bitmap.bit_length() + 7) // 8 for bitmap in self._postings.values())
+            return {
+                'candidates': self._all.bit_count(),
+                'skills': len(self._postings),
+                'bitmap_bytes': postings_bytes,
+                'persistent': self.db_path != ':memory:',
+            }
@@ -0,0 +1,169 @@
+"""
+DOCX text extraction engine used by extract_text_from_docx / iter_text_from_docx.
+
+A .docx is a zip package of XML parts. Instead of building python-docx's
+object model for the whole document, the fast path opens the package with
+zipfile, follows the relationships to the main document part and its
+headers and footers, and stream-parses each part with iterparse. Text is
+yielded one line at a time and parsed elements are dropped as soon as they
+are read, so memory doesn't grow with document length.
+
+Besides body paragraphs (all python-docx's doc.paragraphs gives), the fast
+path reads headers and footers (where many resumes put the name and
+contact line), tables (one line per row, cells separated by " | ") and text
+boxes. The mc:Fallback copy of a drawing, written for older Word versions,
+is skipped, so text-box text isn't doubled.
+
+Packages the fast path can't read (no main part, malformed XML) fall back
+to python-docx, as long as nothing has been yielded yet.
+"""
+import logging
+import posixpath
+import threading
+import zipfile
+from xml.etree.ElementTree import ParseError, iterparse
+
+logger = logging.getLogger(__name__)
+
+TIER_FAST = 'fast'
+TIER_FALLBACK = 'python-docx'
+
+_W = '{http://schemas.openxmlformats.org/wordprocessingml/2006/main}'
+_REL = '{http://schemas.openxmlformats.org/package/2006/relationships}Relationship'
+_OFFICE_DOCUMENT = 'http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument'
+_HEADER = 'http://schemas.openxmlformats.org/officeDocument/2006/relationships/header'
+_FOOTER = 'http://schemas.openxmlformats.org/officeDocument/2006/relationships/footer'
+_FALLBACK = '{http://schemas.openxmlformats.org/markup-compatibility/2006}Fallback'
+
+_P, _T, _TC, _TR = _W + 'p', _W + 't', _W + 'tc', _W + 'tr'
+# Run-level elements that stand for a character
+_CHARACTERS = {_W + 'tab': '\t', _W + 'br': '\n', _W + 'cr': '\n', _W + 'noBreakHyphen': '-'}
+# Block containers whose finished children can be dropped from the tree
+_CONTAINERS = {_W + 'body', _W + 'hdr', _W + 'ftr'}
+
+_tier_counts = {TIER_FAST: 0, TIER_FALLBACK: 0}
+_tier_lock = threading.Lock()
+
+
+def tier_stats():
+    """Documents extracted per tier since startup."""
+    with _tier_lock:
+        return dict(_tier_counts)
+
+
+def _count(tier):
+    with _tier_lock:
+        _tier_counts[tier] += 1
+
+
+def _relationships(archive, part):
+    """(type, target part name) for the relationships of a part, in file order."""
+    directory, name = posixpath.split(part)
+    rels_name = posixpath.join(directory, '_rels', name + '.rels')
+    if rels_name not in archive.namelist():
+        return []
+    relationships = []
+    with archive.open(rels_name) as f:
+        for _, elem in iterparse(f):
+            if elem.tag == _REL and elem.get('TargetMode') != 'External':
+                target = elem.get('Target', '')
+                target = target.lstrip('/') if target.startswith('/') else posixpath.normpath(
+                    posixpath.join(directory, target))
+                relationships.append((elem.get('Type'), target))
+    return relationships
+
+
+def _text_parts(archive):
+    """Headers, main document part, footers: the parts read, in output order."""
+    main = next((target for rel_type, target in _relationships(archive, '')
+                 if rel_type == _OFFICE_DOCUMENT), None)
+    if main is None or main not in archive.namelist():
+        raise KeyError("no main document part in package")
+    related = _relationships(archive, main)
+    headers = sorted({target for rel_type, target in related if rel_type == _HEADER})
+    footers = sorted({target for rel_type, target in related if rel_type == _FOOTER})
+    names = set(archive.namelist())
+    return [part for part in headers if part in names] + [main] + [part for part in footers if part in names]
+
+
+def _iter_part_lines(f):
+    """Lines of one WordprocessingML part: paragraphs, and table rows with cells joined by ' | '."""
+    elements = []       # open elements, for dropping finished blocks from their container
+    frames = []         # open paragraphs / cells / rows: (tag, parts)
+    skipping = 0        # depth inside mc:Fallback
+    for event, elem in iterparse(f, events=('start', 'end')):
+        tag = elem.tag
+        if event == 'start':
+            elements.append(elem)
+            if tag == _FALLBACK:
+                skipping += 1
+            elif not skipping and tag in (_P, _TC, _TR):
+                frames.append((tag, []))
+            continue
+
+        elements.pop()
+        if tag == _FALLBACK:
+            skipping -= 1
+        elif skipping:
+            pass
+        elif tag == _T or tag in _CHARACTERS:
+            if frames and frames[-1][0] == _P:
+                frames[-1][1].append((elem.text or '') if tag == _T else _CHARACTERS[tag])
+        elif tag == _P:
+            line = "".join(frames.pop()[1])
+            if frames and frames[-1][0] == _TC:
+                if line.strip():
+                    frames[-1][1].append(line.strip())
+            else:
+                yield line + "\n"
+        elif tag == _TC:
+            cell = " ".join(frames.pop()[1])
+            if frames and frames[-1][0] == _TR:
+                frames[-1][1].append(cell)
+        elif tag == _TR:
+            cells = frames.pop()[1]
+            if any(cells):
+                yield " | ".join(cell for cell in cells if cell) + "\n"
+
+        if elements and elements[-1].tag in _CONTAINERS:
+            elements[-1].remove(elem)
+
+
+def iter_docx_fast(source):
+    """Lines of a .docx read straight from its XML parts (source: path or seekable binary file)."""
+    with zipfile.ZipFile(source) as archive:
+        for part in _text_parts(archive):
+            with archive.open(part) as f:
+                yield from _iter_part_lines(f)
+
+
+def iter_docx_python_docx(source):
+    import docx
+    doc = docx.Document(source)
+    for para in doc.paragraphs:
+        yield para.text + "\n"
+
+
+def iter_docx_text(source, fast=True):
+    """
+    Lines of a .docx. source can be a path or a seekable binary file-like
+    object. The fast path falls back to python-docx if it fails before its
+    first line; a failure after that is raised, since lines already yielded
+    can't be taken back.
+    """
+    if fast:
+        lines = iter_docx_fast(source)
+        try:
+            first = next(lines, None)
+        except (zipfile.BadZipFile, KeyError, ParseError) as e:
+            logger.warning(f"Fast DOCX extraction failed ({e}); falling back to python-docx")
+            if hasattr(source, 'seek'):
+                source.seek(0)
+        else:
+            _count(TIER_FAST)
+            if first is not None:
+                yield first
+                yield from lines
+            return
+    _count(TIER_FALLBACK)
+    yield from iter_docx_python_docx(source)
@@ -0,0 +1,94 @@
+"""
+Incremental re-analysis of edited resumes (/api/upload?incremental=1 and ?previous=<id>).
+
+Extracted text is split into sections at known heading lines (SKILLS,
+EXPERIENCE, ...), each section keeping its heading line, and every section
+gets a fingerprint of the lowercased text its skills are matched in (the
+section plus the end of the one before it, so terms across the boundary
+are found). An analysis keeps the fingerprints with each section's skill matches
+and which skills each question belongs to, in a bounded LRU with a TTL.
+When the same resume is uploaded again with a previous analysis id, only the
+sections whose fingerprint changed go through skill matching, and only
+questions for added or removed skills are regenerated or dropped.
+"""
+import hashlib
+import threading
+import time
+import uuid
+from collections import OrderedDict
+
+HEADINGS = {
+    'summary', 'professional summary', 'profile', 'objective', 'about me',
+    'skills', 'technical skills', 'core competencies', 'key skills',
+    'experience', 'work experience', 'professional experience', 'employment history', 'work history',
+    'projects', 'education', 'certifications', 'certificates', 'awards', 'achievements',
+    'publications', 'languages', 'interests', 'volunteering', 'references', 'training',
+}
+
+
+def is_heading(line):
+    # Only known headings: an unknown all-caps line ("PYTHON DEVELOPER") is content
+    return line.strip().rstrip(':').strip().lower() in HEADINGS
+
+
+def fingerprint(text):
+    return hashlib.sha1(text.lower().encode('utf-8')).hexdigest()[:16]
+
+
+def split_sections(text):
+    """
+    Split resume text into [(title, body)]; text before the first heading is 'header'.
+    Bodies start with their heading line, so joining them with newlines gives back every line.
+    """
+    sections = []
+    title = 'header'
+    lines = []
+    for line in text.splitlines():
+        if is_heading(line):
+            if lines:
+                sections.append((title, "\n".join(lines)))
+            title = line.strip().rstrip(':').strip().lower()
+            lines = [line]
+        else:
+            lines.append(line)
+    sections.append((title, "\n".join(lines)))
+    return [(title, body) for title, body in sections if body.strip()]
+
+
+class RevisionStore:
+    """Bounded LRU of analysis states, keyed by a random analysis id."""
+
+    def __init__(self, max_entries=1024, ttl_seconds=86400):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries = OrderedDict()  # analysis id -> (stored_at, state)
+        self._lock = threading.Lock()
+        self.counters = {'stores': 0, 'hits': 0, 'misses': 0, 'evictions': 0}
+
+    def get(self, analysis_id):
+        with self._lock:
+            entry = self._entries.get(analysis_id)
+            if entry is None or time.time() - entry[0] > self.ttl_seconds:
+                self._entries.pop(analysis_id, None)
+                self.counters['misses'] += 1
+                return None
+            self._entries.move_to_end(analysis_id)
+            self.counters['hits'] += 1
+            return entry[1]
+
+    def put(self, state):
+        analysis_id = uuid.uuid4().hex
+        with self._lock:
+            self._entries[analysis_id] = (time.time(), state)
+            self.counters['stores'] += 1
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.counters['evictions'] += 1
+        return analysis_id
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self.counters)
+            stats['entries'] = len(self._entries)
+        stats['max_entries'] = self.max_entries
+        return stats
@@ -0,0 +1,128 @@
+"""
+In-process job queue for the submit/poll API (/api/jobs).
+
+Submitted uploads wait in a bounded queue and are processed by a small pool
+of daemon worker threads. When the queue is full, submit() raises QueueFull
+with a retry-after estimate based on recent job durations. Finished jobs are
+kept for result_ttl seconds so clients can poll for them.
+
+Note: on serverless platforms background threads are frozen between
+invocations, so this mode is meant for long-running deployments.
+"""
+import logging
+import math
+import queue
+import threading
+import time
+import uuid
+
+logger = logging.getLogger(__name__)
+
+
+class QueueFull(Exception):
+    def __init__(self, retry_after):
+        super().__init__(f"Job queue is full, retry after {retry_after}s")
+        self.retry_after = retry_after
+
+
+class JobQueue:
+    def __init__(self, handler, workers=2, max_queued=100, result_ttl=3600):
+        """handler(**job_args) runs in a worker thread and returns the job result."""
+        self.handler = handler
+        self.workers = workers
+        self.result_ttl = result_ttl
+        self._queue = queue.Queue(maxsize=max_queued)
+        self._jobs = {}
+        self._lock = threading.Lock()
+        self._threads = []
+        self._avg_seconds = 5.0  # Running average of job duration, seeds the Retry-After hint
+
+    def _ensure_workers(self):
+        with self._lock:
+            if self._threads:
+                return
+            for i in range(self.workers):
+                thread = threading.Thread(target=self._work, name=f"job-worker-{i}", daemon=True)
+                thread.start()
+                self._threads.append(thread)
+
+    def submit(self, **job_args):
+        """Queue a job and return its id. Raises QueueFull when the queue is at capacity."""
+        self._ensure_workers()
+        self._expire()
+        job_id = uuid.uuid4().hex
+        job = {
+            'id': job_id,
+            'status': 'queued',
+            'submitted_at': time.time(),
+            'started_at': None,
+            'finished_at': None,
+            'result': None,
+            'error': None,
+        }
+        with self._lock:
+            self._jobs[job_id] = job
+        try:
+            self._queue.put_nowait((job_id, job_args))
+        except queue.Full:
+            with self._lock:
+                del self._jobs[job_id]
+            raise QueueFull(self.retry_after())
+        return job_id
+
+    def get(self, job_id):
+        """Return a snapshot of the job, or None if it is unknown or expired."""
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return dict(job) if job else None
+
+    def retry_after(self):
+        """Seconds until a queue slot is likely to free up."""
+        depth = self._queue.qsize()
+        return max(1, math.ceil(self._avg_seconds * depth / max(self.workers, 1)))
+
+    def stats(self):
+        with self._lock:
+            statuses = [job['status'] for job in self._jobs.values()]
+        return {
+            'workers': self.workers,
+            'queue_depth': self._queue.qsize(),
+            'queue_capacity': self._queue.maxsize,
+            'queued': statuses.count('queued'),
+            'running': statuses.count('running'),
+            'done': statuses.count('done'),
+            'failed': statuses.count('failed'),
+            'avg_job_seconds': round(self._avg_seconds, 3),
+        }
+
+    def _work(self):
+        while True:
+            job_id, job_args = self._queue.get()
+            with self._lock:
+                job = self._jobs.get(job_id)
+                if job is None:
+                    continue
+                job['status'] = 'running'
+                job['started_at'] = time.time()
+            try:
+                result = self.handler(**job_args)
+                status, error = 'done', None
+            except Exception as e:
+                logger.error(f"Job {job_id} failed: {e}")
+                logger.debug("Job failure traceback", exc_info=True)
+                result, status, error = None, 'failed', e
+            finished_at = time.time()
+            with self._lock:
+                job['status'] = status
+                job['result'] = result
+                job['error'] = error
+                job['finished_at'] = finished_at
+                self._avg_seconds = 0.8 * self._avg_seconds + 0.2 * (finished_at - job['started_at'])
+
+    def _expire(self):
+        cutoff = time.time() - self.result_ttl
+        with self._lock:
+            expired = [job_id for job_id, job in self._jobs.items()
+                       if job['finished_at'] and job['finished_at'] < cutoff]
+            for job_id in expired:
+                del self._jobs[job_id]
@@ -0,0 +1,344 @@
+"""
+Process-wide Gemini client used by generate_questions_with_ai.
+
+- The google.generativeai model is configured once and reused across requests.
+- Every call has a deadline, passed to the model as
+  request_options={'timeout': ...} so a stalled HTTP call ends on its own.
+  The request stops waiting at the deadline and falls back to the static
+  question bank. Blocking calls run in a fixed pool of worker threads; when
+  every worker is still busy (e.g. with abandoned calls), new calls fail
+  fast instead of queueing behind them.
+- A circuit breaker skips the LLM for a cool-off period after repeated
+  failures or slow calls, then lets a single trial call through.
+
+Any object with generate_content(prompt, request_options=None) returning
+something with a .text attribute can stand in for the Gemini model (see FakeGeminiModel, and
+RestGeminiModel for a local stand-in server speaking the REST API).
+generate_async awaits the model's generate_content_async when it has one
+(the ASGI app in _asgi.py), so a waiting call holds no thread at all.
+"""
+import asyncio
+import json
+import logging
+import random
+import ssl
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+
+logger = logging.getLogger(__name__)
+
+
+class LLMUnavailable(Exception):
+    """The circuit breaker is open, the call failed or it missed its deadline."""
+
+
+class FakeGeminiModel:
+    """Local stand-in for the Gemini model with configurable latency and failure rate."""
+
+    def __init__(self, latency=0.0, failure_rate=0.0, seed=None):
+        self.latency = latency
+        self.failure_rate = failure_rate
+        self._random = random.Random(seed)
+
+    def generate_content(self, prompt, request_options=None):
+        timeout = (request_options or {}).get('timeout')
+        if timeout is not None and self.latency > timeout:
+            time.sleep(timeout)
+            raise TimeoutError(f"Fake Gemini call exceeded {timeout}s")
+        if self.latency:
+            time.sleep(self.latency)
+        return self._response()
+
+    async def generate_content_async(self, prompt):
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        return self._response()
+
+    def _response(self):
+        if self._random.random() < self.failure_rate:
+            raise RuntimeError("Fake Gemini failure")
+        # No "skills"/"experience" keys, so callers keep their own matched skills
+        body = {
+            "questions": {
+                "technical": [
+                    {"level": "beginner", "question": "Walk me through a project listed on your resume."},
+                    {"level": "intermediate", "question": "What trade-offs did you make in your last technical design?"},
+                ],
+                "hr": ["Why are you interested in this role?"]
+            }
+        }
+        return _TextResponse(json.dumps(body))
+
+
+class _TextResponse:
+    def __init__(self, text):
+        self.text = text
+
+
+class RestGeminiModel:
+    """
+    Gemini model called over the REST generateContent endpoint with the
+    standard library, for a local stand-in server (benchmarks/fake_gemini.py)
+    or a proxy. HTTP errors and responses without candidate text raise.
+    """
+
+    def __init__(self, base_url, model, api_key=None, timeout=30.0):
+        parts = urllib.parse.urlsplit(base_url)
+        self.url = f"{base_url.rstrip('/')}/v1beta/models/{model}:generateContent"
+        self.path = urllib.parse.urlsplit(self.url).path
+        self.host = parts.hostname
+        self.port = parts.port or (443 if parts.scheme == 'https' else 80)
+        self.ssl = ssl.create_default_context() if parts.scheme == 'https' else None
+        self.headers = {'Content-Type': 'application/json'}
+        if api_key:
+            self.headers['x-goog-api-key'] = api_key
+        self.timeout = timeout
+
+    @staticmethod
+    def _body(prompt):
+        return json.dumps({'contents': [{'parts': [{'text': prompt}]}]}).encode('utf-8')
+
+    @staticmethod
+    def _response(status, raw):
+        if status != 200:
+            raise RuntimeError(f"Gemini endpoint returned HTTP {status}: {raw[:200]!r}")
+        data = json.loads(raw)
+        try:
+            return _TextResponse("".join(part.get('text', '') for part in data['candidates'][0]['content']['parts']))
+        except (KeyError, IndexError, TypeError) as e:
+            raise ValueError(f"No candidate text in Gemini response: {raw[:200]!r}") from e
+
+    def generate_content(self, prompt, request_options=None):
+        request = urllib.request.Request(self.url, data=self._body(prompt), headers=self.headers, method='POST')
+        timeout = (request_options or {}).get('timeout', self.timeout)
+        try:
+            with urllib.request.urlopen(request, timeout=timeout) as response:
+                return self._response(response.status, response.read())
+        except urllib.error.HTTPError as e:
+            return self._response(e.code, e.read())
+
+    async def generate_content_async(self, prompt):
+        body = self._body(prompt)
+        head = "".join(f"{name}: {value}\r\n" for name, value in self.headers.items())
+        reader, writer = await asyncio.open_connection(self.host, self.port, ssl=self.ssl)
+        try:
+            writer.write((f"POST {self.path} HTTP/1.1\r\nHost: {self.host}:{self.port}\r\n{head}"
+                          f"Content-Length: {len(body)}\r\nConnection: close\r\n\r\n").encode() + body)
+            await writer.drain()
+            raw = await reader.read()
+        finally:
+            writer.close()
+        head, _, payload = raw.partition(b"\r\n\r\n")
+        status = int(head.split(b" ", 2)[1])
+        if b"transfer-encoding: chunked" in head.lower():
+            payload = _dechunk(payload)
+        return self._response(status, payload)
+
+
+def _dechunk(payload):
+    out = bytearray()
+    while payload:
+        size_line, _, payload = payload.partition(b"\r\n")
+        size = int(size_line.split(b";")[0], 16)
+        if size == 0:
+            break
+        out += payload[:size]
+        payload = payload[size + 2:]
+    return bytes(out)
+
+
+class GeminiClient:
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+
+    def __init__(self, model_factory, timeout=8.0, slow_call_seconds=None,
+                 failure_threshold=3, cooldown_seconds=30.0, max_workers=8):
+        """
+        model_factory() builds the model on first use.
+        Calls slower than slow_call_seconds count as failures for the breaker even if they succeed.
+        """
+        self.model_factory = model_factory
+        self.timeout = timeout
+        self.slow_call_seconds = slow_call_seconds
+        self.failure_threshold = failure_threshold
+        self.cooldown_seconds = cooldown_seconds
+        self._model = None
+        self.max_workers = max_workers
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="gemini")
+        self._busy_workers = 0
+        self._lock = threading.Lock()
+        self._state = self.CLOSED
+        self._consecutive_failures = 0
+        self._opened_at = 0.0
+        self._trial_in_flight = False
+        self.counters = {
+            'calls': 0,
+            'successes': 0,
+            'failures': 0,
+            'timeouts': 0,
+            'slow_calls': 0,
+            'short_circuited': 0,
+            'circuit_opened': 0,
+            'no_free_worker': 0,
+        }
+
+    def _get_model(self):
+        with self._lock:
+            if self._model is None:
+                self._model = self.model_factory()
+            return self._model
+
+    def _submit(self, model, prompt, timeout):
+        """
+        Run model.generate_content in a worker thread. Returns None without
+        queueing when every worker is still busy.
+        """
+        with self._lock:
+            if self._busy_workers >= self.max_workers:
+                self.counters['no_free_worker'] += 1
+                return None
+            self._busy_workers += 1
+        future = self._executor.submit(model.generate_content, prompt, request_options={'timeout': timeout})
+        future.add_done_callback(self._worker_done)
+        return future
+
+    def _worker_done(self, future):
+        with self._lock:
+            self._busy_workers -= 1
+
+    def _allow_call(self):
+        """Return None if the breaker rejects the call, else whether it is the half-open trial call."""
+        with self._lock:
+            if self._state == self.OPEN:
+                if time.monotonic() - self._opened_at < self.cooldown_seconds:
+                    self.counters['short_circuited'] += 1
+                    return None
+                self._state = self.HALF_OPEN
+            trial = self._state == self.HALF_OPEN
+            if trial:
+                if self._trial_in_flight:
+                    self.counters['short_circuited'] += 1
+                    return None
+                self._trial_in_flight = True
+            self.counters['calls'] += 1
+            return trial
+
+    def _record(self, ok, counter=None, trial=False):
+        """
+        Only the trial call decides a half-open breaker; a late result of a
+        call started before the circuit opened just updates the counters.
+        """
+        with self._lock:
+            if counter:
+                self.counters[counter] += 1
+            if trial:
+                self._trial_in_flight = False
+            elif self._state != self.CLOSED:
+                return
+            if ok:
+                self._consecutive_failures = 0
+                self._state = self.CLOSED
+                return
+            self._consecutive_failures += 1
+            if trial or self._consecutive_failures >= self.failure_threshold:
+                if self._state != self.OPEN:
+                    self.counters['circuit_opened'] += 1
+                    logger.warning(f"Gemini circuit opened for {self.cooldown_seconds}s "
+                                   f"after {self._consecutive_failures} failed/slow calls")
+                self._state = self.OPEN
+                self._opened_at = time.monotonic()
+
+    def generate(self, prompt, timeout=None):
+        """Return the model's response text. Raises LLMUnavailable on open circuit, error or deadline miss."""
+        trial = self._allow_call()
+        if trial is None:
+            raise LLMUnavailable("Gemini circuit is open")
+
+        timeout = self.timeout if timeout is None else timeout
+        started = time.monotonic()
+        try:
+            model = self._get_model()
+            future = self._submit(model, prompt, timeout)
+        except Exception as e:
+            self._record(False, 'failures', trial)
+            raise LLMUnavailable(f"Gemini call failed: {e}") from e
+        if future is None:
+            self._release_trial(trial)
+            raise LLMUnavailable("No free Gemini worker (earlier calls still running)")
+
+        try:
+            response = future.result(timeout=timeout)
+            text = response.text
+        except FutureTimeout:
+            self._record(False, 'timeouts', trial)
+            raise LLMUnavailable(f"Gemini call exceeded {timeout}s deadline")
+        except Exception as e:
+            self._record(False, 'failures', trial)
+            raise LLMUnavailable(f"Gemini call failed: {e}") from e
+
+        self._record_success(time.monotonic() - started, trial)
+        return text
+
+    async def generate_async(self, prompt, timeout=None):
+        """
+        Awaitable generate(): same deadline and breaker. Models without
+        generate_content_async fall back to the worker pool.
+        """
+        trial = self._allow_call()
+        if trial is None:
+            raise LLMUnavailable("Gemini circuit is open")
+
+        timeout = self.timeout if timeout is None else timeout
+        started = time.monotonic()
+        try:
+            model = self._get_model()
+            if hasattr(model, 'generate_content_async'):
+                call = model.generate_content_async(prompt)
+            else:
+                future = self._submit(model, prompt, timeout)
+                if future is None:
+                    self._release_trial(trial)
+                    raise LLMUnavailable("No free Gemini worker (earlier calls still running)")
+                call = asyncio.wrap_future(future)
+            response = await asyncio.wait_for(call, timeout)
+            text = response.text
+        except LLMUnavailable:
+            raise
+        except asyncio.TimeoutError:
+            self._record(False, 'timeouts', trial)
+            raise LLMUnavailable(f"Gemini call exceeded {timeout}s deadline")
+        except Exception as e:
+            self._record(False, 'failures', trial)
+            raise LLMUnavailable(f"Gemini call failed: {e}") from e
+
+        self._record_success(time.monotonic() - started, trial)
+        return text
+
+    def _release_trial(self, trial):
+        # A call that never reached the model neither closes nor reopens the breaker
+        if trial:
+            with self._lock:
+                self._trial_in_flight = False
+
+    def _record_success(self, elapsed, trial):
+        if self.slow_call_seconds and elapsed > self.slow_call_seconds:
+            self._record(False, 'slow_calls', trial)
+        else:
+            self._record(True, trial=trial)
+        with self._lock:
+            self.counters['successes'] += 1
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self.counters)
+            stats['state'] = self._state
+            stats['consecutive_failures'] = self._consecutive_failures
+            stats['busy_workers'] = self._busy_workers
+        stats['timeout_seconds'] = self.timeout
+        stats['cooldown_seconds'] = self.cooldown_seconds
+        return stats
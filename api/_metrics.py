@@ -0,0 +1,118 @@
+"""
+Lightweight in-process metrics with Prometheus text exposition (/api/metrics).
+
+Histograms use fixed buckets, and each observation is one bisect plus a few
+additions under a lock, so recording is cheap enough to leave on in
+production. Collectors let other components (caches, LLM client, job queue)
+export their own counters at scrape time.
+"""
+import bisect
+import threading
+
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+def _format_labels(labels):
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{key}="{value}"' for key, value in labels) + "}"
+
+
+class Histogram:
+    def __init__(self, name, help_text, label_name, buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.help_text = help_text
+        self.label_name = label_name
+        self.buckets = tuple(buckets)
+        self._series = {}  # label value -> [bucket counts..., sum, count]
+        self._lock = threading.Lock()
+
+    def observe(self, label_value, seconds):
+        index = bisect.bisect_left(self.buckets, seconds)
+        with self._lock:
+            series = self._series.get(label_value)
+            if series is None:
+                series = self._series[label_value] = [0] * (len(self.buckets) + 2)
+            if index < len(self.buckets):
+                series[index] += 1
+            series[-2] += seconds
+            series[-1] += 1
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            snapshot = {label: list(series) for label, series in self._series.items()}
+        for label_value, series in sorted(snapshot.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets, series):
+                cumulative += count
+                labels = _format_labels([(self.label_name, label_value), ('le', bound)])
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            labels = _format_labels([(self.label_name, label_value), ('le', '+Inf')])
+            lines.append(f"{self.name}_bucket{labels} {series[-1]}")
+            labels = _format_labels([(self.label_name, label_value)])
+            lines.append(f"{self.name}_sum{labels} {series[-2]:.6f}")
+            lines.append(f"{self.name}_count{labels} {series[-1]}")
+        return lines
+
+
+class Counter:
+    def __init__(self, name, help_text, label_names):
+        self.name = name
+        self.help_text = help_text
+        self.label_names = tuple(label_names)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *label_values, amount=1):
+        with self._lock:
+            self._values[label_values] = self._values.get(label_values, 0) + amount
+
+    def value(self, *label_values):
+        with self._lock:
+            return self._values.get(label_values, 0)
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            snapshot = dict(self._values)
+        for label_values, value in sorted(snapshot.items()):
+            lines.append(f"{self.name}{_format_labels(zip(self.label_names, label_values))} {value}")
+        return lines
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._metrics = []
+        self._collectors = []
+
+    def histogram(self, name, help_text, label_name, buckets=DEFAULT_BUCKETS):
+        metric = Histogram(name, help_text, label_name, buckets)
+        self._metrics.append(metric)
+        return metric
+
+    def counter(self, name, help_text, label_names=()):
+        metric = Counter(name, help_text, label_names)
+        self._metrics.append(metric)
+        return metric
+
+    def add_collector(self, name, help_text, collect, metric_type='gauge'):
+        """collect() returns {label_value: number} (label 'key') or a plain number."""
+        self._collectors.append((name, help_text, collect, metric_type))
+
+    def render(self):
+        lines = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        for name, help_text, collect, metric_type in self._collectors:
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {metric_type}")
+            values = collect()
+            if isinstance(values, dict):
+                for key, value in sorted(values.items()):
+                    if isinstance(value, bool) or not isinstance(value, (int, float)):
+                        continue
+                    lines.append(f'{name}{{key="{key}"}} {value}')
+            else:
+                lines.append(f"{name} {values}")
+        return "\n".join(lines) + "\n"
@@ -0,0 +1,336 @@
+"""
+PDF text extraction engine used by extract_text_from_pdf.
+
+Pages are capped (max_pages) and extraction stops when the time budget runs
+out, so a 200-page upload can't hold a worker. With workers > 1, page ranges
+are spread across a process pool and joined back in page order. Kept in its
+own module so pool workers only import pdfplumber, not the Flask app.
+pdfplumber itself is imported on first use to keep cold starts fast.
+
+Extraction is tiered: each page first goes through a cheap scan of its
+content stream (text-showing operators only, single-byte WinAnsi decoding,
+no layout analysis). Skill matching and the LLM prompt don't need layout, so
+that is enough for most resumes. Pages the fast tier can't read correctly
+go to pdfplumber's layout-aware extract_text instead: pages that draw through
+Form XObjects (whose content streams the scan doesn't follow), pages with
+fonts whose codes aren't cp1252 text (composite/CID and Type3 fonts, custom
+Differences or built-in encodings of embedded fonts), and pages where the
+fast tier comes back empty or garbled (e.g. scanned pages).
+"""
+import io
+import logging
+import os
+import re
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, wait
+
+logger = logging.getLogger(__name__)
+
+# Below this many pages the pool overhead isn't worth it
+PARALLEL_MIN_PAGES = 8
+
+# Fast-tier output is accepted when at least this share of its non-space
+# characters are printable, and this share are letters or digits
+MIN_PRINTABLE_RATIO = 0.95
+MIN_ALNUM_RATIO = 0.5
+
+TIER_FAST = 'fast'
+TIER_LAYOUT = 'layout'
+
+_pool = None
+_pool_workers = 0
+_pool_lock = threading.Lock()
+
+_tier_counts = {TIER_FAST: 0, TIER_LAYOUT: 0}
+_tier_lock = threading.Lock()
+
+
+def tier_stats():
+    """Pages extracted per tier since startup."""
+    with _tier_lock:
+        return dict(_tier_counts)
+
+
+# Content stream tokens: literal strings (one level of nested parens), hex
+# strings, array brackets, dict delimiters, numbers, names, operators, comments
+_TOKEN_RE = re.compile(
+    rb'\((?:[^()\\]|\\.|\((?:[^()\\]|\\.)*\))*\)'
+    rb'|<<|>>|<[0-9A-Fa-f\s]*>'
+    rb'|\[|\]'
+    rb'|[+-]?(?:\d+\.?\d*|\.\d+)'
+    rb'|/[^\s/\[\]()<>{}%]*'
+    rb'|[A-Za-z\'"*][A-Za-z0-9*]*'
+    rb'|%[^\r\n]*',
+    re.S
+)
+_ESCAPE_RE = re.compile(rb'\\([0-7]{1,3}|\r\n|[\s\S])')
+_ESCAPES = {b'n': b'\n', b'r': b'\r', b't': b'\t', b'b': b'\b', b'f': b'\f',
+            b'\n': b'', b'\r': b'', b'\r\n': b''}
+# Horizontal TJ offset (thousandths of text space) treated as a word break
+_TJ_SPACE = -200
+
+# Simple-font encodings whose letters and digits decode as cp1252
+_FAST_ENCODINGS = {'WinAnsiEncoding', 'StandardEncoding', 'MacRomanEncoding', 'PDFDocEncoding'}
+_SIMPLE_FONTS = {'Type1', 'MMType1', 'TrueType'}
+_FONT_FILES = ('FontFile', 'FontFile2', 'FontFile3')
+
+
+def _unescape(match):
+    escaped = match.group(1)
+    if escaped[:1].isdigit():
+        return bytes((int(escaped, 8) & 0xFF,))
+    return _ESCAPES.get(escaped, escaped)
+
+
+def _decode_string(token):
+    if token[:1] == b'(':
+        raw = token[1:-1]
+        if b'\\' in raw:
+            raw = _ESCAPE_RE.sub(_unescape, raw)
+    else:
+        digits = bytes(c for c in token[1:-1] if c not in b' \t\r\n\f')
+        raw = bytes.fromhex((digits + b'0' if len(digits) % 2 else digits).decode('ascii'))
+    return raw.decode('cp1252', errors='replace')
+
+
+def _content_text(data):
+    """Text of a decoded page content stream, from its text-showing operators."""
+    out = []
+    operands = []
+    last_y = None
+    in_inline_image = False
+    for match in _TOKEN_RE.finditer(data):
+        token = match.group()
+        first = token[:1]
+        if in_inline_image:
+            in_inline_image = token != b'EI'
+            continue
+        if first in b'(<[]+-.0123456789/' and token not in (b'<<', b'>>'):
+            operands.append(token)
+            continue
+        if first == b'%' or token in (b'<<', b'>>'):
+            continue
+
+        if token == b'Tj' or token == b"'" or token == b'"':
+            if token != b'Tj':
+                out.append('\n')
+            if operands and operands[-1][:1] in b'(<':
+                out.append(_decode_string(operands[-1]))
+        elif token == b'TJ':
+            for operand in operands:
+                if operand[:1] in b'(<':
+                    out.append(_decode_string(operand))
+                elif operand[:1] not in b'[]/':
+                    if float(operand) < _TJ_SPACE:
+                        out.append(' ')
+        elif token == b'Td' or token == b'TD':
+            if len(operands) >= 2:
+                out.append('\n' if float(operands[-1]) != 0 else ' ')
+        elif token == b'Tm':
+            if len(operands) >= 6:
+                y = float(operands[-1])
+                out.append(' ' if y == last_y else '\n')
+                last_y = y
+        elif token == b'T*':
+            out.append('\n')
+        elif token == b'BT':
+            out.append('\n')
+        elif token == b'ID':
+            in_inline_image = True
+        operands.clear()
+    lines = (" ".join(line.split()) for line in "".join(out).split('\n'))
+    return "\n".join(line for line in lines if line)
+
+
+def _name(obj):
+    from pdfminer.psparser import PSLiteral
+    return obj.name if isinstance(obj, PSLiteral) else obj
+
+
+def _font_decodable(font):
+    """True if the fast tier's single-byte cp1252 decoding reads this font's text correctly."""
+    from pdfminer.pdftypes import resolve1
+    font = resolve1(font)
+    if not isinstance(font, dict) or _name(resolve1(font.get('Subtype'))) not in _SIMPLE_FONTS:
+        return False
+    encoding = resolve1(font.get('Encoding'))
+    if encoding is None:
+        # Built-in encoding: only known to be Latin for the standard 14 fonts, which aren't embedded
+        descriptor = resolve1(font.get('FontDescriptor'))
+        embedded = isinstance(descriptor, dict) and any(key in descriptor for key in _FONT_FILES)
+        return not embedded and 'ToUnicode' not in font
+    # An encoding dictionary remaps codes through /Differences
+    return _name(encoding) in _FAST_ENCODINGS
+
+
+def _fast_tier_readable(page):
+    """False if the page draws through Form XObjects or uses a font the fast tier can't decode."""
+    from pdfminer.pdftypes import resolve1
+    resources = resolve1(page.page_obj.resources) or {}
+    xobjects = resolve1(resources.get('XObject')) or {}
+    if any(_name(resolve1(xobject).get('Subtype')) == 'Form' for xobject in xobjects.values()):
+        return False
+    fonts = resolve1(resources.get('Font')) or {}
+    return all(_font_decodable(font) for font in fonts.values())
+
+
+def _fast_page_text(page):
+    """Fast tier for one pdfplumber page; returns None if the page needs the layout tier."""
+    from pdfminer.pdftypes import resolve1
+    chunks = []
+    try:
+        if not _fast_tier_readable(page):
+            return None
+        for stream in page.page_obj.contents:
+            chunks.append(resolve1(stream).get_data())
+        return _content_text(b'\n'.join(chunks))
+    except Exception as e:
+        logger.debug(f"Fast PDF tier failed on page {page.page_number}: {e}")
+        return None
+
+
+def looks_garbled(text):
+    """True if fast-tier text is empty or unlikely to be real words."""
+    visible = "".join(text.split())
+    if not visible:
+        return True
+    printable = sum(1 for c in visible if c.isprintable() and c != '\ufffd')
+    alnum = sum(1 for c in visible if c.isalnum())
+    return (printable / len(visible) < MIN_PRINTABLE_RATIO
+            or alnum / len(visible) < MIN_ALNUM_RATIO)
+
+
+def _get_pool(workers):
+    global _pool, _pool_workers
+    with _pool_lock:
+        if _pool is None or _pool_workers != workers:
+            if _pool is not None:
+                _pool.shutdown(wait=False, cancel_futures=True)
+            _pool = ProcessPoolExecutor(max_workers=workers)
+            _pool_workers = workers
+        return _pool
+
+
+def _extract_pages(pdf, start, end, deadline, fast=True):
+    """Extract pages [start, end) until the deadline; returns [(page_no, text, seconds, tier)]."""
+    return list(_iter_pages(pdf, start, end, deadline, fast))
+
+
+def _iter_pages(pdf, start, end, deadline, fast=True):
+    for page_no in range(start, end):
+        if time.time() >= deadline:
+            break
+        page_started = time.perf_counter()
+        page = pdf.pages[page_no]
+        text = _fast_page_text(page) if fast else None
+        if text is not None and not looks_garbled(text):
+            tier = TIER_FAST
+        else:
+            text = page.extract_text() or ""
+            tier = TIER_LAYOUT
+        # Drop pdfplumber's per-page object/layout caches once the page is done
+        page.close()
+        yield page_no, text, time.perf_counter() - page_started, tier
+
+
+def _extract_page_range(pdf_bytes, start, end, deadline, fast=True):
+    # Runs in a pool worker
+    import pdfplumber
+    with pdfplumber.open(io.BytesIO(pdf_bytes)) as pdf:
+        return _extract_pages(pdf, start, end, deadline, fast)
+
+
+def _read_bytes(source):
+    if isinstance(source, (str, os.PathLike)):
+        with open(source, 'rb') as f:
+            return f.read()
+    source.seek(0)
+    data = source.read()
+    source.seek(0)
+    return data
+
+
+def extract_pdf_text(source, max_pages=50, time_budget=10.0, workers=0, fast=True):
+    """
+    Extract text from a PDF path or seekable binary stream.
+    Returns (text, page_timings) where page_timings is [(page_no, seconds, tier)]
+    for every page that was extracted within the cap and budget.
+    fast=False skips the fast tier and uses pdfplumber for every page.
+    """
+    import pdfplumber
+    deadline = time.time() + time_budget
+
+    with pdfplumber.open(source) as pdf:
+        total_pages = len(pdf.pages)
+        page_count = min(total_pages, max_pages) if max_pages else total_pages
+        if total_pages > page_count:
+            logger.warning(f"PDF has {total_pages} pages, extracting first {page_count}")
+
+        if workers <= 1 or page_count < PARALLEL_MIN_PAGES:
+            results = _extract_pages(pdf, 0, page_count, deadline, fast)
+        else:
+            results = None
+
+    if results is None:
+        results = _extract_parallel(_read_bytes(source), page_count, deadline, workers, fast)
+
+    if len(results) < page_count:
+        logger.warning(f"PDF time budget ({time_budget}s) exhausted after {len(results)}/{page_count} pages")
+
+    results.sort(key=lambda r: r[0])
+    with _tier_lock:
+        for result in results:
+            _tier_counts[result[3]] += 1
+    text = "".join(page_text for _, page_text, _, _ in results)
+    return text, [(page_no, seconds, tier) for page_no, _, seconds, tier in results]
+
+
+def iter_pdf_text(source, max_pages=50, time_budget=10.0, fast=True):
+    """
+    Page texts of a PDF, yielded one page at a time in page order (the
+    streaming upload path). Same page cap, time budget and tiers as
+    extract_pdf_text, always serial.
+    """
+    import pdfplumber
+    deadline = time.time() + time_budget
+
+    with pdfplumber.open(source) as pdf:
+        total_pages = len(pdf.pages)
+        page_count = min(total_pages, max_pages) if max_pages else total_pages
+        if total_pages > page_count:
+            logger.warning(f"PDF has {total_pages} pages, extracting first {page_count}")
+        extracted = 0
+        for _, text, _, tier in _iter_pages(pdf, 0, page_count, deadline, fast):
+            with _tier_lock:
+                _tier_counts[tier] += 1
+            extracted += 1
+            yield text
+    if extracted < page_count:
+        logger.warning(f"PDF time budget ({time_budget}s) exhausted after {extracted}/{page_count} pages")
+
+
+def _extract_parallel(pdf_bytes, page_count, deadline, workers, fast=True):
+    try:
+        pool = _get_pool(workers)
+    except (OSError, NotImplementedError) as e:
+        # No multiprocessing support (e.g. missing /dev/shm on serverless)
+        logger.warning(f"PDF process pool unavailable, extracting serially: {e}")
+        return _extract_page_range(pdf_bytes, 0, page_count, deadline, fast)
+
+    chunk = -(-page_count // workers)
+    futures = [
+        pool.submit(_extract_page_range, pdf_bytes, start, min(start + chunk, page_count), deadline, fast)
+        for start in range(0, page_count, chunk)
+    ]
+    done, not_done = wait(futures, timeout=max(deadline - time.time(), 0) + 1.0)
+    for future in not_done:
+        future.cancel()
+
+    results = []
+    for future in done:
+        try:
+            results.extend(future.result())
+        except Exception as e:
+            logger.error(f"PDF page range extraction failed: {e}")
+    return results
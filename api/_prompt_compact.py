@@ -0,0 +1,329 @@
+"""
+Token-budgeted compaction of resume text for the Gemini prompt.
+
+Instead of the first 3000 characters, the prompt gets the lines that say the
+most about the candidate within a token budget. Contact details, links and
+boilerplate are stripped; every remaining line is scored by the matched
+skills it mentions (new skills count more than ones already covered), role
+titles, how recent the years on it or on its role line are, quantified
+results, and the weight of its section. The best lines per character are
+packed greedily, a bullet brings its role line along, and the result keeps
+the original order under the original section headings. Text can be fed in
+chunks (ResumeCompactor.begin) while only a bounded set of candidate lines
+is held, for the streaming upload path.
+
+Tokens are estimated as characters / chars_per_token (about 4 for English
+text with Gemini's tokenizer), which is close enough to size a budget.
+"""
+import heapq
+import re
+import threading
+import time
+from datetime import date
+
+from _incremental import is_heading
+
+SECTION_WEIGHTS = (
+    ('skill', 1.5), ('competenc', 1.5), ('experience', 1.3), ('employment', 1.3), ('work history', 1.3),
+    ('project', 1.2), ('summary', 1.0), ('profile', 1.0), ('objective', 0.7), ('about', 0.7),
+    ('certific', 0.8), ('training', 0.7), ('education', 0.6), ('award', 0.6), ('achievement', 0.8),
+    ('publication', 0.5), ('volunteer', 0.4), ('language', 0.3), ('interest', 0.2), ('reference', 0.0),
+)
+DEFAULT_SECTION_WEIGHT = 0.8
+HEADER_WEIGHT = 0.6
+MAX_LINE_CHARS = 400
+
+_CONTACT_RE = re.compile(
+    r"[\w.+-]+@[\w-]+(?:\.[\w-]+)+"                                     # e-mail
+    r"|(?:https?://|www\.)\S+"                                          # URL
+    r"|\b(?:linkedin|github|gitlab|twitter|x)\.com/\S*",                # profile links
+    re.IGNORECASE)
+_PHONE_RE = re.compile(r"(?<!\w)\+?\(?\d[\d\s().-]{7,}\d(?!\w)")
+_BOILERPLATE_RE = re.compile(
+    r"^(?:curriculum vitae|resume|cv|references? (?:available )?(?:up)?on request.*|page \d+(?: of \d+)?)$",
+    re.IGNORECASE)
+_WORD_RE = re.compile(r"[^\W\d_]{2}")
+_SEPARATORS = " \t|•·,;:-–—/"
+_ROLE_RE = re.compile(
+    r"\b(?:engineer|developer|programmer|manager|lead|analyst|scientist|architect|consultant|intern|"
+    r"director|designer|administrator|specialist|officer|head of|coordinator|nurse|accountant|teacher|"
+    r"founder|vp|president|technician|associate|supervisor)\b", re.IGNORECASE)
+_YEAR_RE = re.compile(r"\b(19[5-9]\d|20\d\d)\b")
+_PRESENT_RE = re.compile(r"\b(?:present|current|now|ongoing)\b", re.IGNORECASE)
+_QUANTIFIED_RE = re.compile(r"\d+(?:[.,]\d+)?\s*(?:%|percent|x\b|k\b|m\b|million|users|customers)|[$€£]\s?\d",
+                            re.IGNORECASE)
+
+
+def section_weight(title):
+    if title is None:
+        return HEADER_WEIGHT
+    title = title.lower()
+    for key, weight in SECTION_WEIGHTS:
+        if key in title:
+            return weight
+    return DEFAULT_SECTION_WEIGHT
+
+
+def clean_line(line):
+    """Line without contact details and stray separators ('' if nothing useful is left)."""
+    if '@' in line or '/' in line or 'www.' in line.lower():
+        line = _CONTACT_RE.sub(" ", line)
+    # At least 9 digits, so date ranges like "2019 - 2022" are not taken for phone numbers
+    line = _PHONE_RE.sub(lambda match: " " if sum(ch.isdigit() for ch in match.group()) >= 9 else match.group(), line)
+    line = " ".join(line.split()).strip(_SEPARATORS)
+    if not _WORD_RE.search(line) or _BOILERPLATE_RE.match(line):
+        return ""
+    if len(line) > MAX_LINE_CHARS:
+        line = line[:MAX_LINE_CHARS].rsplit(" ", 1)[0] + " ..."
+    return line
+
+
+def role_lines(text, limit=5):
+    """Role lines of a resume (a role title and a year), most recent first, cleaned of contact details."""
+    this_year = date.today().year
+    roles = []
+    for raw in text.split("\n"):
+        line = clean_line(raw)
+        if not line or len(line) >= 120 or not _ROLE_RE.search(line):
+            continue
+        years = [int(found) for found in _YEAR_RE.findall(line)]
+        if _PRESENT_RE.search(line):
+            years.append(this_year)
+        if years:
+            roles.append((-max(years), len(roles), line))
+    return [line for _, _, line in sorted(roles)[:limit]]
+
+
+def skill_pattern(skills):
+    """One regex for the matched skills, longest first, with the matcher's word boundaries."""
+    terms = sorted({skill.lower() for skill in skills if skill}, key=len, reverse=True)
+    if not terms:
+        return None
+    return re.compile(r"(?<![\w+#])(?:" + "|".join(re.escape(term) for term in terms) + r")(?![\w+#])")
+
+
+class _Line:
+    __slots__ = ('index', 'text', 'section', 'cost', 'skills', 'base', 'anchor')
+
+    def __init__(self, index, text, section, skills, base, anchor):
+        self.index = index
+        self.text = text
+        self.section = section
+        self.cost = len(text) + 1
+        self.skills = skills
+        self.base = base
+        self.anchor = anchor    # Role/date line this bullet belongs to (a _Line), kept with it
+
+
+class Compaction:
+    """
+    One compaction in progress: text is fed in chunks of any size (pages,
+    paragraphs) and only the best candidate lines, up to max_candidate_chars,
+    are held, so memory stays bounded however long the document is.
+    """
+
+    def __init__(self, compactor, skills=None, match_skills=None):
+        self.compactor = compactor
+        self.skills = frozenset(skills) if skills is not None else None
+        if match_skills is None:
+            pattern = skill_pattern(skills or ())
+            match_skills = pattern.findall if pattern is not None else lambda line: ()
+        self.match_skills = match_skills
+        self.this_year = date.today().year
+        self.input_chars = 0
+        self.lines_total = 0
+        self.seconds = 0.0
+        self._partial = ""
+        self._headings = {}
+        self._section = None
+        self._weight = HEADER_WEIGHT
+        self._anchor = None
+        self._year = None
+        self._candidates = {}       # line index -> _Line
+        self._evictable = []        # (standalone value per char, index), lowest first
+        self._candidate_chars = 0
+        self._evicted = False
+
+    def feed(self, chunk):
+        started = time.perf_counter()
+        self.input_chars += len(chunk)
+        lines = (self._partial + chunk).split("\n")
+        self._partial = lines.pop()
+        for raw in lines:
+            self._add_line(raw)
+        self.seconds += time.perf_counter() - started
+
+    def _add_line(self, raw):
+        if is_heading(raw):
+            self._section = len(self._headings)
+            self._headings[self._section] = raw.strip()
+            self._weight = section_weight(raw.strip().rstrip(':'))
+            self._anchor = None
+            self._year = None
+            return
+        line = clean_line(raw)
+        if not line:
+            return
+        years = [int(found) for found in _YEAR_RE.findall(line)]
+        if _PRESENT_RE.search(line):
+            years.append(self.this_year)
+        is_role = _ROLE_RE.search(line) is not None and len(line) < 120
+        if years:
+            self._year = max(years)
+        recency = 0.3 if self._year is None else max(0.0, 1.0 - (self.this_year - self._year) / 10)
+        base = self._weight * (1.0 + recency + (0.8 if is_role else 0.0)
+                               + (0.5 if _QUANTIFIED_RE.search(line) else 0.0))
+        found = frozenset(self.match_skills(line.lower()))
+        if self.skills is not None:
+            found &= self.skills
+        entry = _Line(self.lines_total, line, self._section, found, base,
+                      None if is_role or years else self._anchor)
+        self.lines_total += 1
+        if is_role or years:
+            self._anchor = entry
+
+        self._candidates[entry.index] = entry
+        self._candidate_chars += entry.cost
+        heapq.heappush(self._evictable, (_value(entry, ()) / (entry.cost + 20), entry.index))
+        while self._candidate_chars > self.compactor.max_candidate_chars:
+            _, index = heapq.heappop(self._evictable)
+            self._candidate_chars -= self._candidates.pop(index).cost
+            self._evicted = True
+
+    def finish(self):
+        """Return (compacted_text, report)."""
+        started = time.perf_counter()
+        if self._partial:
+            self._add_line(self._partial)
+            self._partial = ""
+        lines = sorted(self._candidates.values(), key=lambda line: line.index)
+        headings = self._headings
+        budget = int(self.compactor.token_budget * self.compactor.chars_per_token)
+        total_cost = self._candidate_chars + sum(len(heading) + 1 for heading in headings.values())
+        if not self._evicted and total_cost <= budget:
+            selected = lines
+        else:
+            selected = _pack(headings, lines, budget)
+        output = []
+        emitted = set()
+        for line in selected:
+            if line.section is not None and line.section not in emitted:
+                emitted.add(line.section)
+                output.append(headings[line.section])
+            output.append(line.text)
+        compacted = "\n".join(output)
+        self.seconds += time.perf_counter() - started
+
+        estimate = self.compactor.estimate_tokens
+        report = {
+            'input_chars': self.input_chars,
+            'prompt_chars': len(compacted),
+            'input_tokens': int(self.input_chars / self.compactor.chars_per_token + 0.5),
+            'prompt_tokens': estimate(compacted),
+            'lines_total': self.lines_total,
+            'lines_kept': len(selected),
+        }
+        report['saved_chars'] = report['input_chars'] - report['prompt_chars']
+        report['saved_tokens'] = report['input_tokens'] - report['prompt_tokens']
+        self.compactor._record(report, self.seconds)
+        return compacted, report
+
+
+def _value(line, covered):
+    new_skills = len(line.skills.difference(covered))
+    return line.base * (1.0 + 1.5 * new_skills + 0.3 * (len(line.skills) - new_skills))
+
+
+def _pack(headings, lines, budget):
+    """
+    Greedy by value per character, re-scoring skill gains lazily as skills get covered.
+    Returns the selected lines (with their role lines) in document order.
+    """
+    covered = set()
+    selected = {}
+    open_sections = set()
+    used = 0
+
+    def cost(line):
+        extra = 0
+        if line.section is not None and line.section not in open_sections:
+            extra += len(headings[line.section]) + 1
+        if line.anchor is not None and line.anchor.index not in selected:
+            extra += line.anchor.cost
+        return line.cost + extra
+
+    by_index = {line.index: line for line in lines}
+    heap = [(-_value(line, covered) / (line.cost + 20), line.index) for line in lines]
+    heapq.heapify(heap)
+    while heap:
+        _, index = heapq.heappop(heap)
+        if index in selected:
+            continue
+        line = by_index[index]
+        current = -_value(line, covered) / (cost(line) + 20)
+        if heap and current > heap[0][0] + 1e-12:
+            heapq.heappush(heap, (current, index))
+            continue
+        needed = cost(line)
+        if used + needed > budget:
+            continue
+        used += needed
+        members = [line]
+        if line.anchor is not None and line.anchor.index not in selected:
+            members.append(line.anchor)
+        for member in members:
+            selected[member.index] = member
+            covered.update(member.skills)
+            if member.section is not None:
+                open_sections.add(member.section)
+    return [selected[index] for index in sorted(selected)]
+
+
+class ResumeCompactor:
+    def __init__(self, token_budget=600, chars_per_token=4.0, max_candidate_chars=None):
+        """
+        max_candidate_chars bounds how much candidate text a compaction holds
+        (default four budgets); lines worth the least on their own are dropped first.
+        """
+        self.token_budget = token_budget
+        self.chars_per_token = chars_per_token
+        self.max_candidate_chars = max_candidate_chars or int(4 * token_budget * chars_per_token)
+        self._lock = threading.Lock()
+        self.counters = {'compactions': 0, 'input_chars': 0, 'prompt_chars': 0,
+                         'input_tokens': 0, 'prompt_tokens': 0, 'saved_chars': 0, 'saved_tokens': 0,
+                         'seconds': 0.0}
+
+    def estimate_tokens(self, text):
+        return int(len(text) / self.chars_per_token + 0.5)
+
+    def begin(self, skills=None, match_skills=None):
+        """
+        Start a compaction fed in chunks (Compaction.feed, then finish()).
+        skills=None keeps whatever match_skills finds, for when the resume's
+        skills aren't known yet.
+        """
+        return Compaction(self, skills, match_skills)
+
+    def compact(self, text, skills=(), match_skills=None):
+        """
+        Return (compacted_text, report) for resume text and its matched skills.
+        match_skills(line_lower) -> skills in a line (the app passes its SkillMatcher, so
+        aliases count); without it the skills are searched for literally.
+        """
+        compaction = self.begin(skills, match_skills)
+        compaction.feed(text)
+        return compaction.finish()
+
+    def _record(self, report, seconds):
+        with self._lock:
+            self.counters['compactions'] += 1
+            for key in ('input_chars', 'prompt_chars', 'input_tokens', 'prompt_tokens', 'saved_chars', 'saved_tokens'):
+                self.counters[key] += report[key]
+            self.counters['seconds'] += seconds
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self.counters)
+        stats['seconds'] = round(stats['seconds'], 4)
+        stats['token_budget'] = self.token_budget
+        return stats
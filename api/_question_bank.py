@@ -0,0 +1,101 @@
+"""
+Compiled, array-backed view of questions.json for the static fallback path.
+
+Every distinct question string is interned once and gets an integer id;
+each skill owns a contiguous [start, end) range in a flat array of ids, so
+a question shared by several skills is stored once and de-duplicated when
+selecting. Selection draws k random positions from a skill's range (O(k),
+no list copies) from a Random seeded by the caller, so the same
+(resume hash, seed) always yields the same questions.
+"""
+import random
+import sys
+from array import array
+
+
+class QuestionBank:
+    def __init__(self, questions_db):
+        self.questions = []        # id -> question text
+        self.ids = array('I')      # concatenated per-skill question ids
+        self.ranges = {}           # skill -> (start, end) into self.ids
+        ids_by_text = {}
+        for skill, questions in questions_db.items():
+            start = len(self.ids)
+            seen = set()
+            for text in questions:
+                question_id = ids_by_text.get(text)
+                if question_id is None:
+                    question_id = ids_by_text[text] = len(self.questions)
+                    self.questions.append(sys.intern(text))
+                if question_id not in seen:
+                    seen.add(question_id)
+                    self.ids.append(question_id)
+            self.ranges[skill] = (start, len(self.ids))
+
+    def __len__(self):
+        return len(self.questions)
+
+    def count(self, skill):
+        start, end = self.ranges.get(skill, (0, 0))
+        return end - start
+
+    @staticmethod
+    def rng(seed_key=None):
+        """Random for a selection; seed_key=None gives a non-reproducible selection."""
+        return random.Random(seed_key) if seed_key is not None else random.Random()
+
+    def sample(self, skill, k, rng, exclude=()):
+        """Up to k distinct question ids for skill, skipping ids in exclude."""
+        start, end = self.ranges.get(skill, (0, 0))
+        size = end - start
+        if size == 0 or k <= 0:
+            return []
+        # Draw up to k spare positions so questions already picked for other skills can be skipped
+        spare = min(len(exclude), k)
+        drawn = min(size, k + spare)
+        positions = rng.sample(range(start, end), drawn)
+        picked = []
+        for position in positions:
+            question_id = self.ids[position]
+            if question_id not in exclude and question_id not in picked:
+                picked.append(question_id)
+                if len(picked) == k:
+                    return picked
+        if drawn < size:
+            # Too many draws were excluded: go through the rest of the range in random order
+            rest = sorted(set(range(start, end)).difference(positions))
+            rng.shuffle(rest)
+            for position in rest:
+                question_id = self.ids[position]
+                if question_id not in exclude and question_id not in picked:
+                    picked.append(question_id)
+                    if len(picked) == k:
+                        break
+        return picked
+
+    def select(self, skills, seed_key=None, per_skill=2, minimum=5, limit=7, generic='generic'):
+        """
+        Static fallback selection: up to per_skill questions per skill, topped up
+        from the generic pool to `minimum`, shuffled and capped at `limit`. If the
+        generic pool runs short too, the remaining questions of the resume's
+        skills fill the gap.
+        """
+        rng = self.rng(seed_key)
+        chosen = []
+        chosen_set = set()
+
+        def take(skill, k):
+            for question_id in self.sample(skill, k, rng, chosen_set):
+                chosen.append(question_id)
+                chosen_set.add(question_id)
+
+        for skill in skills:
+            take(skill, per_skill)
+        if len(chosen) < minimum:
+            take(generic, minimum - len(chosen))
+        for skill in skills:
+            if len(chosen) >= minimum:
+                break
+            take(skill, minimum - len(chosen))
+        rng.shuffle(chosen)
+        return [self.questions[question_id] for question_id in chosen[:limit]]
@@ -0,0 +1,90 @@
+"""
+Question-set cache keyed by skill signature.
+
+Resumes with the same matched skills (and seniority bucket) get questions
+sampled from previously generated Gemini question sets instead of paying for
+a new LLM call. Each entry pools the technical/HR questions of every set
+generated for its signature; only skill-generic questions are stored, not
+ones quoting the resume they were generated for (index.store_question_set).
+An entry is due for refresh after refresh_seconds or max_serves hits, at
+which point the caller regenerates and the new questions are merged into
+the pool. Entries are evicted LRU.
+"""
+import random
+import threading
+import time
+from collections import OrderedDict
+
+
+class QuestionSetCache:
+    def __init__(self, max_entries=512, refresh_seconds=86400, max_serves=50, max_pool=40):
+        self.max_entries = max_entries
+        self.refresh_seconds = refresh_seconds
+        self.max_serves = max_serves
+        self.max_pool = max_pool
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.counters = {'hits': 0, 'misses': 0, 'refreshes': 0, 'stale_serves': 0, 'stores': 0, 'evictions': 0}
+
+    @staticmethod
+    def signature(skills, seniority=None):
+        key = "+".join(sorted({skill.strip().lower() for skill in skills})) or "generic"
+        return f"{key}|{seniority}" if seniority else key
+
+    def get(self, signature, allow_stale=False):
+        """
+        Return {'technical': [...], 'hr': [...]} sampled from the pooled questions, or None
+        on a miss or when the entry is due for refresh (unless allow_stale).
+        """
+        with self._lock:
+            entry = self._entries.get(signature)
+            if entry is None:
+                if not allow_stale:
+                    self.counters['misses'] += 1
+                return None
+            due = (time.time() - entry['refreshed_at'] > self.refresh_seconds
+                   or entry['serves'] >= self.max_serves)
+            if due and not allow_stale:
+                self.counters['refreshes'] += 1
+                return None
+            self._entries.move_to_end(signature)
+            entry['serves'] += 1
+            self.counters['stale_serves' if due else 'hits'] += 1
+            technical = list(entry['technical'])
+            hr = list(entry['hr'])
+            tech_count, hr_count = entry['tech_count'], entry['hr_count']
+
+        return {
+            'technical': random.sample(technical, min(tech_count, len(technical))),
+            'hr': random.sample(hr, min(hr_count, len(hr))),
+        }
+
+    def put(self, signature, technical, hr):
+        """Merge a freshly generated question set into the pool for signature."""
+        with self._lock:
+            entry = self._entries.get(signature)
+            if entry is None:
+                entry = {'technical': [], 'hr': []}
+                self._entries[signature] = entry
+            for field, questions in (('technical', technical), ('hr', hr)):
+                # Newest questions first, dedupe, cap the pool
+                merged = list(dict.fromkeys(list(questions) + entry[field]))
+                entry[field] = merged[:self.max_pool]
+            entry['tech_count'] = len(technical)
+            entry['hr_count'] = len(hr)
+            entry['refreshed_at'] = time.time()
+            entry['serves'] = 0
+            self._entries.move_to_end(signature)
+            self.counters['stores'] += 1
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.counters['evictions'] += 1
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self.counters)
+            stats['entries'] = len(self._entries)
+        lookups = stats['hits'] + stats['misses'] + stats['refreshes']
+        stats['hit_ratio'] = round(stats['hits'] / lookups, 4) if lookups else 0.0
+        stats['max_entries'] = self.max_entries
+        return stats
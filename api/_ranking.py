@@ -0,0 +1,109 @@
+"""
+Vectorized ranking of resumes against a job description (/api/rank).
+
+All candidates go into one sparse TF-IDF matrix (sublinear tf, smoothed idf,
+L2-normalised rows), so the text similarity for every candidate is a single
+sparse matrix-vector product. The skill score is the share of the job's
+skills a candidate has, computed the same way from a sparse candidate x job
+skill membership matrix. Top-k is an argpartition, so only the returned rows
+are sorted and turned into Python objects.
+NumPy/SciPy are imported on first use to keep cold starts fast.
+"""
+import string
+from collections import Counter, defaultdict
+from itertools import count
+
+# ASCII punctuation becomes a word break, except + and # (c++, c#); str.translate + split
+# is several times faster than a tokenizing regex on thousands of resumes
+_TOKEN_BREAKS = str.maketrans({c: ' ' for c in string.punctuation + string.whitespace if c not in '+#'})
+
+
+def tokenize(text):
+    return text.lower().translate(_TOKEN_BREAKS).split()
+
+
+def tfidf_matrix(documents):
+    """
+    Sparse TF-IDF matrix for a list of token lists (last row is usually the query).
+    Returns (csr matrix with L2-normalised rows, vocabulary dict).
+    """
+    import numpy as np
+    from scipy import sparse
+
+    vocabulary = defaultdict(count().__next__)  # token -> column, assigned on first sight
+    indptr = [0]
+    indices = []
+    counts = []
+    for tokens in documents:
+        term_counts = Counter(tokens)
+        indices.extend(map(vocabulary.__getitem__, term_counts))
+        counts.extend(term_counts.values())
+        indptr.append(len(indices))
+
+    matrix = sparse.csr_matrix(
+        (np.asarray(counts, dtype=np.float32), np.asarray(indices, dtype=np.int32), np.asarray(indptr, dtype=np.int64)),
+        shape=(len(documents), len(vocabulary))
+    )
+    np.log1p(matrix.data, out=matrix.data)  # sublinear tf
+    document_frequency = np.bincount(matrix.indices, minlength=len(vocabulary))
+    idf = np.log((1.0 + len(documents)) / (1.0 + document_frequency)).astype(np.float32) + 1.0
+    matrix.data *= idf[matrix.indices]
+
+    norms = np.sqrt(np.asarray(matrix.multiply(matrix).sum(axis=1)).ravel())
+    norms[norms == 0] = 1.0
+    matrix = sparse.diags((1.0 / norms).astype(np.float32)) @ matrix
+    return matrix.tocsr(), dict(vocabulary)
+
+
+def rank_candidates(job_text, job_skills, candidate_texts, candidate_skills, top_k=10, text_weight=0.5):
+    """
+    Score every candidate against the job description.
+    candidate_texts and candidate_skills are parallel lists (text may be '' when only skills are known).
+    Returns [(index, score, text_score, matched_skills)] for the top_k candidates, best first.
+    """
+    import numpy as np
+    from scipy import sparse
+
+    count = len(candidate_texts)
+    if count == 0:
+        return []
+
+    documents = [tokenize(text) for text in candidate_texts]
+    documents.append(tokenize(job_text))
+    matrix, _ = tfidf_matrix(documents)
+    text_scores = np.asarray((matrix[:count] @ matrix[count].T).todense()).ravel()
+
+    job_skill_ids = {skill: i for i, skill in enumerate(job_skills)}
+    if job_skill_ids:
+        rows = []
+        cols = []
+        for row, skills in enumerate(candidate_skills):
+            for skill in skills:
+                col = job_skill_ids.get(skill)
+                if col is not None:
+                    rows.append(row)
+                    cols.append(col)
+        membership = sparse.csr_matrix(
+            (np.ones(len(rows), dtype=np.float32), (rows, cols)), shape=(count, len(job_skill_ids))
+        )
+        # csr_matrix sums duplicate entries; a skill listed twice still counts once
+        membership.data[:] = 1
+        skill_scores = np.asarray(membership.sum(axis=1)).ravel() / len(job_skill_ids)
+    else:
+        membership = None
+        skill_scores = np.zeros(count, dtype=np.float32)
+        text_weight = 1.0
+
+    scores = text_weight * text_scores + (1.0 - text_weight) * skill_scores
+    top_k = min(top_k, count)
+    top = np.argpartition(-scores, top_k - 1)[:top_k]
+    top = top[np.argsort(-scores[top], kind='stable')]
+
+    results = []
+    for index in top:
+        matched = []
+        if membership is not None:
+            row = membership.getrow(index)
+            matched = [job_skills[col] for col in sorted(row.indices)]
+        results.append((int(index), float(scores[index]), float(text_scores[index]), matched))
+    return results
@@ -1,20 +1,56 @@
 import os
-import tempfile
+import sys
+import io
 import json
 import logging
 import re
-import random
-from flask import Flask, request, jsonify
+import time
+import threading
+import zipfile
+import hashlib
+import hmac
+import contextvars
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout, as_completed
+from contextlib import contextmanager
+from flask import Flask, Response, g, has_request_context, request, jsonify, stream_with_context
 from flask_cors import CORS
-import pdfplumber
-import docx
 
 from collections import Counter
 # CRITICAL: Import will be done dynamically in the function to handle both old and new packages
-from dotenv import load_dotenv
+# Extractor libraries (pdfplumber, python-docx) and dotenv are also imported lazily to keep cold starts fast
+
+# Helper modules live next to this file (underscore-prefixed so Vercel doesn't deploy them as functions)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from _analysis_cache import AnalysisCache
+from _pdf_extract import extract_pdf_text, iter_pdf_text, tier_stats as pdf_tier_stats
+from _docx_extract import iter_docx_text, tier_stats as docx_tier_stats
+from _jobs import JobQueue, QueueFull
+from _admission import Overloaded, StageLimiter
+from _llm import FakeGeminiModel, GeminiClient, LLMUnavailable, RestGeminiModel
+from _question_cache import QuestionSetCache
+from _metrics import MetricsRegistry
+from _question_bank import QuestionBank
+from _ranking import rank_candidates
+from _candidate_store import CandidateStore, parse_query
+from _incremental import RevisionStore, fingerprint as section_fingerprint, split_sections
+from _prompt_compact import ResumeCompactor, role_lines
+
+def load_env_file():
+    """Load .env like load_dotenv() would, but only import python-dotenv when a .env file exists."""
+    directory = os.path.dirname(os.path.abspath(__file__))
+    while True:
+        env_path = os.path.join(directory, '.env')
+        if os.path.isfile(env_path):
+            from dotenv import load_dotenv
+            load_dotenv(env_path)
+            return
+        parent = os.path.dirname(directory)
+        if parent == directory:
+            return
+        directory = parent
 
 # Load environment variables
-load_dotenv()
+load_env_file()
 
 # Initialize Flask app
 app = Flask(__name__)
@@ -25,17 +61,151 @@ logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 # Load questions database
-try:
-    current_dir = os.path.dirname(os.path.abspath(__file__))
-    questions_path = os.path.join(current_dir, 'questions.json')
-    with open(questions_path, 'r') as f:
-        QUESTIONS_DB = json.load(f)
-except FileNotFoundError:
-    logger.error("questions.json not found!")
-    QUESTIONS_DB = {}
+current_dir = os.path.dirname(os.path.abspath(__file__))
+questions_path = os.environ.get("QUESTIONS_PATH") or os.path.join(current_dir, 'questions.json')
+
+def load_questions_db(strict=False):
+    """
+    Skill -> questions mapping from questions.json. At startup a missing file gives an
+    empty database; strict (used by reloads) raises on a missing or empty file instead.
+    """
+    try:
+        with open(questions_path, 'r') as f:
+            questions_db = json.load(f)
+    except FileNotFoundError:
+        if strict:
+            raise
+        logger.error("questions.json not found!")
+        return {}
+    if strict and (not isinstance(questions_db, dict) or not questions_db):
+        raise ValueError(f"{questions_path} has no skills")
+    return questions_db
+
+QUESTIONS_DB = load_questions_db()
 
 # NLP model loading removed - using dictionary matching
 
+# Per-stage latency metrics, exposed on /api/metrics and as Server-Timing headers
+METRICS = MetricsRegistry()
+STAGE_SECONDS = METRICS.histogram('resume_stage_seconds', 'Time spent in each analysis stage', 'stage')
+REQUEST_SECONDS = METRICS.histogram('resume_request_seconds', 'HTTP request latency by endpoint', 'endpoint')
+REQUESTS_TOTAL = METRICS.counter('resume_requests_total', 'HTTP requests by endpoint and status', ('endpoint', 'status'))
+LLM_OUTCOMES = METRICS.counter('resume_llm_outcomes_total',
+                               'Question generation outcomes (success, fallback, parse_error, ...)', ('outcome',))
+ADMISSION_REJECTS = METRICS.counter('resume_admission_rejects_total',
+                                    'Uploads rejected before buffering (too_large, busy)', ('endpoint', 'reason'))
+
+# Stage timings of the current request outside Flask (the ASGI app in _asgi.py sets a dict here)
+SERVER_TIMING = contextvars.ContextVar('server_timing', default=None)
+
+@contextmanager
+def timed_stage(name):
+    """Record how long a block takes in STAGE_SECONDS and the current response's Server-Timing header."""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        record_stage(name, time.perf_counter() - started)
+
+def record_stage(name, elapsed):
+    """Record a stage duration measured by the caller (see timed_stage)."""
+    STAGE_SECONDS.observe(name, elapsed)
+    # Repeated stages (e.g. skills for every resume in /api/rank) are summed into one entry
+    server_timing = g.setdefault('server_timing', {}) if has_request_context() else SERVER_TIMING.get()
+    if server_timing is not None:
+        server_timing[name] = server_timing.get(name, 0.0) + elapsed
+
+# PDF extraction limits: page cap, time budget (seconds) and process pool size (0 = serial)
+PDF_MAX_PAGES = int(os.environ.get("PDF_MAX_PAGES", "50"))
+PDF_TIME_BUDGET = float(os.environ.get("PDF_TIME_BUDGET", "10"))
+PDF_EXTRACT_WORKERS = int(os.environ.get("PDF_EXTRACT_WORKERS", "0"))
+# Try the cheap content-stream pass before pdfplumber's layout-aware extraction (0 = pdfplumber only)
+PDF_FAST_EXTRACT = os.environ.get("PDF_FAST_EXTRACT", "1") != "0"
+# Read DOCX parts straight from the zip package before falling back to python-docx (0 = python-docx only)
+DOCX_FAST_EXTRACT = os.environ.get("DOCX_FAST_EXTRACT", "1") != "0"
+# Characters per chunk when TXT uploads are streamed through scan_resume
+TEXT_CHUNK_CHARS = int(os.environ.get("TEXT_CHUNK_CHARS", str(64 * 1024)))
+
+# Batch upload limits and per-stage pool sizes (CPU = extraction + skills, LLM = question generation)
+BATCH_MAX_FILES = int(os.environ.get("BATCH_MAX_FILES", "50"))
+BATCH_MAX_BYTES = int(os.environ.get("BATCH_MAX_BYTES", str(50 * 1024 * 1024)))
+BATCH_CPU_WORKERS = int(os.environ.get("BATCH_CPU_WORKERS", str(os.cpu_count() or 2)))
+BATCH_LLM_WORKERS = int(os.environ.get("BATCH_LLM_WORKERS", "4"))
+
+# /api/rank: max candidates per request, default top-k and weight of text vs skill similarity
+RANK_MAX_CANDIDATES = int(os.environ.get("RANK_MAX_CANDIDATES", "10000"))
+RANK_TOP_K = int(os.environ.get("RANK_TOP_K", "10"))
+RANK_TEXT_WEIGHT = float(os.environ.get("RANK_TEXT_WEIGHT", "0.5"))
+
+# Gemini client: per-call deadline, circuit breaker and optional hedging against the static bank
+GEMINI_MODEL = os.environ.get("GEMINI_MODEL", "gemini-pro")
+# Call the REST API at this base URL instead of google.generativeai (e.g. the local stand-in, benchmarks/fake_gemini.py)
+GEMINI_API_BASE = os.environ.get("GEMINI_API_BASE", "")
+LLM_TIMEOUT = float(os.environ.get("LLM_TIMEOUT", "8"))
+LLM_SLOW_CALL = float(os.environ.get("LLM_SLOW_CALL", "5"))
+LLM_FAILURE_THRESHOLD = int(os.environ.get("LLM_FAILURE_THRESHOLD", "3"))
+LLM_COOLDOWN = float(os.environ.get("LLM_COOLDOWN", "30"))
+LLM_HEDGE = os.environ.get("LLM_HEDGE", "").lower() in ('1', 'true', 'yes')
+LLM_HEDGE_BUDGET = float(os.environ.get("LLM_HEDGE_BUDGET", "3"))
+# Resume text in the prompt is compacted to this many (estimated) tokens; 0 = first 3000 characters
+PROMPT_TOKEN_BUDGET = int(os.environ.get("PROMPT_TOKEN_BUDGET", "600"))
+PROMPT_COMPACTOR = ResumeCompactor(PROMPT_TOKEN_BUDGET) if PROMPT_TOKEN_BUDGET > 0 else None
+
+# Generated question sets reused across resumes with the same skill signature
+QUESTION_SET_CACHE = QuestionSetCache(
+    max_entries=int(os.environ.get("QSET_CACHE_SIZE", "512")),
+    refresh_seconds=int(os.environ.get("QSET_REFRESH_SECONDS", "86400")),
+    max_serves=int(os.environ.get("QSET_MAX_SERVES", "50"))
+)
+QSET_SENIORITY = os.environ.get("QSET_SENIORITY", "1").lower() in ('1', 'true', 'yes')
+
+# Section fingerprints and question attribution of recent analyses, for ?previous=<analysis_id>
+REVISIONS = RevisionStore(
+    max_entries=int(os.environ.get("REVISIONS_SIZE", "1024")),
+    ttl_seconds=int(os.environ.get("REVISIONS_TTL", "86400"))
+)
+
+# Submit/poll job queue (/api/jobs)
+JOBS_WORKERS = int(os.environ.get("JOBS_WORKERS", "2"))
+JOBS_QUEUE_SIZE = int(os.environ.get("JOBS_QUEUE_SIZE", "100"))
+JOBS_RESULT_TTL = int(os.environ.get("JOBS_RESULT_TTL", "3600"))
+
+# Admission control: request body caps (checked against Content-Length before anything is
+# buffered) and per-stage concurrency limits with a bounded wait queue (see _admission.py)
+UPLOAD_MAX_BYTES = int(os.environ.get("UPLOAD_MAX_BYTES", str(10 * 1024 * 1024)))
+MULTIPART_OVERHEAD = 64 * 1024  # Form boundaries and headers on top of the file itself
+CPU_STAGE_LIMIT = int(os.environ.get("CPU_STAGE_LIMIT", str(2 * (os.cpu_count() or 1))))
+CPU_STAGE_QUEUE = int(os.environ.get("CPU_STAGE_QUEUE", "16"))
+LLM_STAGE_LIMIT = int(os.environ.get("LLM_STAGE_LIMIT", "8"))
+LLM_STAGE_QUEUE = int(os.environ.get("LLM_STAGE_QUEUE", "32"))
+STAGE_WAIT_TIMEOUT = float(os.environ.get("STAGE_WAIT_TIMEOUT", "10"))
+CPU_LIMITER = StageLimiter('cpu', CPU_STAGE_LIMIT, CPU_STAGE_QUEUE, STAGE_WAIT_TIMEOUT)
+LLM_LIMITER = StageLimiter('llm', LLM_STAGE_LIMIT, LLM_STAGE_QUEUE, STAGE_WAIT_TIMEOUT)
+
+# Optional JSON file of extra/overriding aliases, merged over SKILL_ALIASES (hot-reloadable)
+SKILL_ALIASES_PATH = os.environ.get("SKILL_ALIASES_PATH") or os.path.join(os.path.dirname(os.path.abspath(__file__)), 'skill_aliases.json')
+# Poll questions.json / the alias file for changes every N seconds (0 = only reload via the admin endpoint)
+INDEX_WATCH_INTERVAL = float(os.environ.get("INDEX_WATCH_INTERVAL", "0"))
+ADMIN_TOKEN = os.environ.get("ADMIN_TOKEN")
+
+# Prebuilt skill matcher produced at build time by build_skill_index.py
+SKILL_INDEX_PATH = os.environ.get("SKILL_INDEX_PATH") or os.path.join(os.path.dirname(os.path.abspath(__file__)), 'skill_index.json')
+
+# Every analysed resume and its skills, searchable at /api/candidates/search (admin token required).
+# Filenames often carry the candidate's name, so nothing is kept unless CANDIDATE_DB is set.
+CANDIDATE_DB = os.environ.get("CANDIDATE_DB")
+CANDIDATE_STORE = CandidateStore(CANDIDATE_DB) if CANDIDATE_DB else None
+CANDIDATE_SEARCH_LIMIT = int(os.environ.get("CANDIDATE_SEARCH_LIMIT", "50"))
+
+# Upload response cache keyed by file hash (RESUME_CACHE_DB enables the SQLite tier)
+ANALYSIS_CACHE = AnalysisCache(
+    max_entries=int(os.environ.get("RESUME_CACHE_SIZE", "256")),
+    ttl_seconds=int(os.environ.get("RESUME_CACHE_TTL", "3600")),
+    db_path=os.environ.get("RESUME_CACHE_DB") or None
+)
+# Results served without a live Gemini answer expire after this many seconds, so they're retried once it recovers
+RESUME_CACHE_FALLBACK_TTL = int(os.environ.get("RESUME_CACHE_FALLBACK_TTL", "60"))
+
 
 # Skill aliases mapping - maps variations to standard skill names
 SKILL_ALIASES = {
@@ -187,70 +357,389 @@ SKILL_ALIASES = {
     "intern": "entry_level", "trainee": "entry_level", "entry level": "entry_level"
 }
 
+class SkillMatcher:
+    """
+    Compiled skill/alias matcher built once at load time.
+    All dictionary terms are folded into a single trie-shaped regex, so the
+    resume text is scanned in one pass instead of one pass per skill/alias.
+    Matching rules are identical to the original per-term loops:
+    - QUESTIONS_DB skills match as plain substrings
+    - aliases of 3 chars or less need word boundaries, longer ones are substrings
+    """
+
+    EXCLUDED_SKILLS = ("generic", "communication")
+
+    def __init__(self, skills, aliases, known_skills):
+        # term -> list of (needs_word_boundary, skill)
+        self.rules = {}
+        for skill in skills:
+            if skill not in self.EXCLUDED_SKILLS:
+                self.rules.setdefault(skill, []).append((False, skill))
+        for alias, skill in aliases.items():
+            if skill in known_skills:
+                self.rules.setdefault(alias, []).append((len(alias) <= 3, skill))
+
+        # Every term that matches at a position is a prefix of the longest
+        # term matching there, so the scan only needs the longest match.
+        terms = list(self.rules)
+        self.prefixes = {
+            term: [t for t in terms if term.startswith(t)] for term in terms
+        }
+        self.pattern = re.compile("(?=(" + self._trie_regex(self._build_trie(terms)) + "))")
+        self.overlap = self._overlap(self.rules)
+
+    def to_dict(self):
+        """Serializable form of the compiled matcher (see build_skill_index.py)."""
+        return {
+            'pattern': self.pattern.pattern,
+            'rules': {term: [[needs_boundary, skill] for needs_boundary, skill in rules]
+                      for term, rules in self.rules.items()},
+            'prefixes': self.prefixes,
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        """Restore a matcher from to_dict() output without rebuilding the trie."""
+        matcher = cls.__new__(cls)
+        matcher.rules = {term: [(needs_boundary, skill) for needs_boundary, skill in rules]
+                         for term, rules in data['rules'].items()}
+        matcher.prefixes = data['prefixes']
+        matcher.pattern = re.compile(data['pattern'])
+        matcher.overlap = cls._overlap(matcher.rules)
+        return matcher
+
+    @staticmethod
+    def _overlap(rules):
+        # Characters carried between chunks (see MatchStream): the longest term plus boundary context
+        return max(map(len, rules), default=0) + 2
+
+    @staticmethod
+    def _build_trie(terms):
+        trie = {}
+        for term in terms:
+            node = trie
+            for ch in term:
+                node = node.setdefault(ch, {})
+            node[""] = True
+        return trie
+
+    @classmethod
+    def _trie_regex(cls, node):
+        branches = [re.escape(ch) + cls._trie_regex(child)
+                    for ch, child in sorted(node.items()) if ch != ""]
+        if not branches:
+            return ""
+        if "" in node:
+            # Greedy optional group: prefer the longer term
+            return "(?:" + "|".join(branches) + ")?"
+        if len(branches) == 1:
+            return branches[0]
+        return "(?:" + "|".join(branches) + ")"
+
+    @staticmethod
+    def _is_word_char(ch):
+        return ch.isalnum() or ch == "_"
+
+    @classmethod
+    def _at_boundary(cls, text, pos):
+        # Same semantics as re's \b on str patterns
+        before = pos > 0 and cls._is_word_char(text[pos - 1])
+        after = pos < len(text) and cls._is_word_char(text[pos])
+        return before != after
+
+    def match(self, text_lower, found=None, lo=0, hi=None):
+        """
+        Skills in text_lower (added to found). Only terms starting at or after lo
+        and ending before hi count - MatchStream uses this to skip matches that
+        lack context at a window edge.
+        """
+        found = set() if found is None else found
+        for m in self.pattern.finditer(text_lower):
+            start = m.start()
+            if start < lo:
+                continue
+            for term in self.prefixes[m.group(1)]:
+                if hi is not None and start + len(term) > hi:
+                    continue
+                bounded = None
+                for needs_boundary, skill in self.rules[term]:
+                    if skill in found:
+                        continue
+                    if needs_boundary:
+                        if bounded is None:
+                            bounded = (self._at_boundary(text_lower, start)
+                                       and self._at_boundary(text_lower, start + len(term)))
+                        if not bounded:
+                            continue
+                    found.add(skill)
+        return found
+
+    def stream(self):
+        return MatchStream(self)
+
+class MatchStream:
+    """
+    Incremental SkillMatcher.match over lowercased text fed in chunks.
+    Each chunk is matched together with the last `overlap` characters of the
+    previous window, so terms crossing a chunk boundary are found, and
+    matches are only taken where the characters around them are known (not at
+    the very start of a carried-over window, and not touching its end until
+    the next chunk or close()). The result equals match() on the whole text.
+    """
+
+    def __init__(self, matcher):
+        self.matcher = matcher
+        self.found = set()
+        self._tail = ""
+        self._at_start = True   # The tail still begins at the start of the text
+
+    def feed(self, chunk_lower):
+        if not chunk_lower:
+            return
+        window = self._tail + chunk_lower
+        self.matcher.match(window, self.found, 0 if self._at_start else 1, len(window) - 1)
+        if len(window) > self.matcher.overlap:
+            self._tail = window[-self.matcher.overlap:]
+            self._at_start = False
+        else:
+            self._tail = window
+
+    def close(self):
+        """Match what is left at the end of the text; returns the found skills."""
+        self.matcher.match(self._tail, self.found, 0 if self._at_start else 1)
+        self._tail = ""
+        return self.found
+
+def skill_index_fingerprint(skills, aliases):
+    """Hash of the dictionary a SkillMatcher is built from, used to detect a stale prebuilt index."""
+    source = json.dumps([sorted(skills), sorted(aliases.items())])
+    return hashlib.sha256(source.encode('utf-8')).hexdigest()
+
+def load_skill_matcher(questions_db, aliases, index_path=SKILL_INDEX_PATH):
+    """
+    Load the matcher from the prebuilt index (see build_skill_index.py) when it matches
+    questions_db/aliases, otherwise build it from scratch.
+    """
+    fingerprint = skill_index_fingerprint(questions_db.keys(), aliases)
+    try:
+        with open(index_path, 'r') as f:
+            data = json.load(f)
+        if data.get('fingerprint') == fingerprint:
+            return SkillMatcher.from_dict(data['matcher'])
+        logger.warning("Prebuilt skill index is stale, building the matcher from questions.json")
+    except FileNotFoundError:
+        logger.info("No prebuilt skill index, building at startup")
+    except (ValueError, KeyError) as e:
+        logger.warning(f"Invalid prebuilt skill index ({e}), building at startup")
+    return SkillMatcher(questions_db.keys(), aliases, questions_db)
+
+def load_skill_aliases():
+    """SKILL_ALIASES with the optional SKILL_ALIASES_PATH overrides merged on top."""
+    aliases = dict(SKILL_ALIASES)
+    try:
+        with open(SKILL_ALIASES_PATH, 'r') as f:
+            aliases.update({alias.lower(): skill for alias, skill in json.load(f).items()})
+    except FileNotFoundError:
+        pass
+    return aliases
+
+class SkillIndex:
+    """
+    Immutable snapshot of everything derived from questions.json and the alias table:
+    the skill matcher and the compiled question bank. Reloads build a new snapshot and
+    swap the SKILL_INDEX reference, so readers never see a half-built index.
+    """
+
+    def __init__(self, questions_db, aliases, version):
+        self.questions_db = questions_db
+        self.aliases = aliases
+        self.version = version
+        source = json.dumps([questions_db, sorted(aliases.items())], sort_keys=True)
+        self.fingerprint = hashlib.sha256(source.encode('utf-8')).hexdigest()[:16]
+        self.matcher = load_skill_matcher(questions_db, aliases)
+        self.question_bank = QuestionBank(questions_db)
+
+    def estimated_bytes(self):
+        """Approximate memory held by the snapshot (sys.getsizeof over everything it references, once each)."""
+        seen = set()
+        pending = [vars(self)]
+        total = 0
+        while pending:
+            item = pending.pop()
+            if id(item) in seen:
+                continue
+            seen.add(id(item))
+            total += sys.getsizeof(item)
+            if isinstance(item, dict):
+                pending.extend(item.keys())
+                pending.extend(item.values())
+            elif isinstance(item, (list, tuple, set, frozenset)):
+                pending.extend(item)
+            elif hasattr(item, '__dict__') and not isinstance(item, type):
+                pending.append(vars(item))
+        return total
+
+SKILL_INDEX = SkillIndex(QUESTIONS_DB, load_skill_aliases(), version=1)
+INDEX_RELOAD_STATS = {'reloads': 0, 'last_reload_at': None, 'last_reload_seconds': None,
+                      'last_reload_index_bytes': None, 'last_reload_reason': None, 'last_error': None}
+_index_reload_lock = threading.Lock()
+# Snapshot pinned to the current request outside Flask (the ASGI app in _asgi.py sets it)
+PINNED_SKILL_INDEX = contextvars.ContextVar('pinned_skill_index', default=None)
+
+def current_skill_index():
+    """The snapshot pinned to the current request (see pin_skill_index, PINNED_SKILL_INDEX), else the latest one."""
+    pinned = g.get('skill_index') if has_request_context() else PINNED_SKILL_INDEX.get()
+    return SKILL_INDEX if pinned is None else pinned
+
+def index_cache_key(content_key):
+    """Analysis cache key scoped to the skill index, so a reload never serves results from the old one."""
+    return f"{content_key}@{current_skill_index().fingerprint}"
+
+def index_source_mtimes():
+    mtimes = []
+    for path in (questions_path, SKILL_ALIASES_PATH):
+        try:
+            mtimes.append(os.path.getmtime(path))
+        except OSError:
+            mtimes.append(None)
+    return mtimes
+
+def reload_skill_index(reason, raise_errors=False):
+    """
+    Rebuild the skill matcher and question bank from disk and swap them in atomically.
+    Returns True if a new version was installed (False if the sources are unchanged).
+    A failed rebuild keeps the current version and returns False, or re-raises with raise_errors.
+    """
+    global SKILL_INDEX
+    with _index_reload_lock:
+        started = time.perf_counter()
+        try:
+            candidate = SkillIndex(load_questions_db(strict=True), load_skill_aliases(),
+                                   version=SKILL_INDEX.version + 1)
+        except Exception as e:
+            logger.error(f"❌ Skill index reload failed, keeping version {SKILL_INDEX.version}: {e}", exc_info=True)
+            INDEX_RELOAD_STATS['last_error'] = str(e)
+            if raise_errors:
+                raise
+            return False
+        
+        if candidate.fingerprint == SKILL_INDEX.fingerprint:
+            logger.info("Skill index sources unchanged, nothing to reload")
+            return False
+        
+        SKILL_INDEX = candidate  # single reference swap
+        elapsed = time.perf_counter() - started
+        index_bytes = candidate.estimated_bytes()
+        INDEX_RELOAD_STATS.update(reloads=INDEX_RELOAD_STATS['reloads'] + 1, last_reload_at=time.time(),
+                                  last_reload_seconds=round(elapsed, 4), last_reload_index_bytes=index_bytes,
+                                  last_reload_reason=reason, last_error=None)
+        logger.info(f"🔄 Skill index v{candidate.version} ({reason}) built in {elapsed * 1000:.1f} ms, "
+                    f"~{index_bytes / 1024:.0f} KiB")
+        return True
+
+def watch_index_sources(interval):
+    """Background loop: reload when questions.json or the alias file changes on disk."""
+    last_mtimes = index_source_mtimes()
+    while True:
+        time.sleep(interval)
+        mtimes = index_source_mtimes()
+        if mtimes != last_mtimes:
+            last_mtimes = mtimes
+            reload_skill_index('file change')
+
+if INDEX_WATCH_INTERVAL > 0:
+    threading.Thread(target=watch_index_sources, args=(INDEX_WATCH_INTERVAL,),
+                     name="skill-index-watcher", daemon=True).start()
+
 def extract_skills(text):
     """
     Extract skills from text using keyword matching and aliases.
     Refactored to remove Spacy dependency for lighter deployment.
+    Uses the precompiled matcher of the current skill index (single pass over the text).
     """
-    text_lower = text.lower()
-    found_skills = set()
-    
-    # Check for direct skill matches in the questions database
-    for skill in QUESTIONS_DB.keys():
-        if skill != "generic" and skill != "communication":
-            # Check in full text (simple substring match)
-            # Add padding to avoid matching substrings of other words (e.g., "go" in "google")
-            # But simple substring is often enough for unique skill names
-            pattern = r'\b' + re.escape(skill) + r'\b'
-            if re.search(pattern, text_lower):
-                found_skills.add(skill)
-            elif skill in text_lower: # Fallback for multi-word skills where word boundary might fail or be complex
-                 found_skills.add(skill)
-
-    # Check for aliases
-    for alias, skill in SKILL_ALIASES.items():
-        # Use word boundary matching for short aliases to avoid false positives
-        if len(alias) <= 3:
-            pattern = r'\b' + re.escape(alias) + r'\b'
-            if re.search(pattern, text_lower):
-                if skill in QUESTIONS_DB:
-                    found_skills.add(skill)
-        else:
-            if alias in text_lower:
-                if skill in QUESTIONS_DB:
-                    found_skills.add(skill)
+    with timed_stage('skills'):
+        found_skills = current_skill_index().matcher.match(text.lower())
     
     logger.info(f"Matched skills: {list(found_skills)}")
-    return list(found_skills)
+    # Sorted so downstream selection and responses are reproducible
+    return sorted(found_skills)
 
-def generate_questions_with_ai(resume_text, skills):
+def create_llm_client():
     """
-    Generate interview questions using Gemini AI API.
-    CRITICAL FIX: Use correct model name and handle API properly
+    Build the process-wide Gemini client: a local fake when GEMINI_FAKE_LATENCY
+    is set, the REST endpoint at GEMINI_API_BASE, or google.generativeai.
     """
-    # Try Gemini generation first
-    api_key = os.environ.get("GEMINI_API_KEY")
-    if not api_key:
-        logger.warning("GEMINI_API_KEY not set. Falling back to static questions.")
+    fake_latency = os.environ.get("GEMINI_FAKE_LATENCY")
+    if fake_latency:
+        fake_failure_rate = float(os.environ.get("GEMINI_FAKE_FAILURE_RATE", "0"))
+        logger.info(f"Using fake Gemini model (latency {fake_latency}s, failure rate {fake_failure_rate})")
+        model_factory = lambda: FakeGeminiModel(latency=float(fake_latency), failure_rate=fake_failure_rate)
+    elif GEMINI_API_BASE:
+        logger.info(f"Using Gemini REST endpoint {GEMINI_API_BASE} (model {GEMINI_MODEL})")
+        model_factory = lambda: RestGeminiModel(GEMINI_API_BASE, GEMINI_MODEL,
+                                                api_key=os.environ.get("GEMINI_API_KEY"), timeout=LLM_TIMEOUT)
+    else:
+        api_key = os.environ.get("GEMINI_API_KEY")
+        if not api_key:
+            return None
+
+        def model_factory():
+            # Use the installed google.generativeai package
+            import google.generativeai as genai
+            genai.configure(api_key=api_key)
+            logger.info(f"Using Gemini model {GEMINI_MODEL}")
+            return genai.GenerativeModel(GEMINI_MODEL)
+
+    return GeminiClient(
+        model_factory,
+        timeout=LLM_TIMEOUT,
+        slow_call_seconds=LLM_SLOW_CALL,
+        failure_threshold=LLM_FAILURE_THRESHOLD,
+        cooldown_seconds=LLM_COOLDOWN
+    )
+
+LLM_CLIENT = create_llm_client()
+# Hedged mode runs Gemini calls here, racing the static bank; calls that lose keep going under LLM_TIMEOUT
+HEDGE_EXECUTOR = ThreadPoolExecutor(max_workers=LLM_STAGE_LIMIT + LLM_STAGE_QUEUE, thread_name_prefix="hedge")
+
+class StaticPayload(dict):
+    """Upload payload answered from the static question bank (the rule-based fallback)."""
+
+def analysis_cache_ttl(payload):
+    """
+    ANALYSIS_CACHE TTL for an upload result (None = the cache default). LLM-derived questions,
+    fresh or from the question-set pool, keep the default; a StaticPayload is only kept briefly
+    so a later upload of the same file gets another chance at Gemini.
+    """
+    if LLM_CLIENT is None or not isinstance(payload, StaticPayload):
         return None
+    return RESUME_CACHE_FALLBACK_TTL
 
-    try:
-        # Use the installed google.generativeai package
-        import google.generativeai as genai
-        genai.configure(api_key=api_key)
-        
-        # CRITICAL FIX: Use correct model name - gemini-pro is the stable model
-        model = genai.GenerativeModel('gemini-pro')
-        logger.info("Using Gemini Pro model")
-        
-        skills_str = ", ".join(skills) if skills else "general skills"
-        
-        # CRITICAL: Use the EXACT prompt format specified in requirements
-        prompt = f"""You are an interview preparation assistant.
+class PromptText(str):
+    """Resume text already compacted for the prompt (by scan_resume); compact_resume_text passes it through."""
+
+def compact_resume_text(resume_text, skills=()):
+    """The part of the resume that goes into the prompt: the most informative lines within PROMPT_TOKEN_BUDGET."""
+    if isinstance(resume_text, PromptText):
+        return resume_text
+    if PROMPT_COMPACTOR is None:
+        return resume_text[:3000]
+    with timed_stage('compact'):
+        compacted, report = PROMPT_COMPACTOR.compact(resume_text, skills, current_skill_index().matcher.match)
+    log_compaction(report)
+    return compacted
+
+def log_compaction(report):
+    logger.info(f"✂️ Prompt resume text: {report['input_tokens']} -> {report['prompt_tokens']} tokens "
+                f"({report['lines_kept']}/{report['lines_total']} lines)")
+
+def build_prompt(resume_text, skills=()):
+    # CRITICAL: Use the EXACT prompt format specified in requirements
+    return f"""You are an interview preparation assistant.
 Analyze the following resume text and return ONLY valid JSON. Do not add explanations or markdown.
 
 Resume Text:
-{resume_text[:3000]}
+{compact_resume_text(resume_text, skills)}
 
 Return JSON in this exact structure:
 {{
@@ -266,259 +755,1246 @@ Return JSON in this exact structure:
     "hr": ["example HR question"]
   }}
 }}"""
+
+def generate_questions_with_ai(resume_text, skills, timeout=None):
+    """
+    Generate interview questions using Gemini AI API.
+    Goes through the shared LLM_CLIENT, so the call is bounded by LLM_TIMEOUT
+    (or timeout) and skipped while the circuit breaker is open.
+    """
+    if LLM_CLIENT is None:
+        logger.warning("GEMINI_API_KEY not set. Falling back to static questions.")
+        LLM_OUTCOMES.inc('disabled')
+        return None
+
+    try:
+        prompt = build_prompt(resume_text, skills)
         
         logger.info("Sending request to Gemini API...")
-        response = model.generate_content(prompt)
-        content = response.text.strip()
+        try:
+            with LLM_LIMITER.slot(), timed_stage('llm'):
+                content = LLM_CLIENT.generate(prompt, timeout=timeout).strip()
+        except LLMUnavailable as e:
+            logger.warning(f"Gemini unavailable, falling back to static questions: {e}")
+            LLM_OUTCOMES.inc('unavailable')
+            return None
+        except Overloaded as e:
+            # Too many calls in flight: shed this one to the static questions instead of queueing
+            logger.warning(f"LLM stage overloaded, falling back to static questions: {e}")
+            LLM_OUTCOMES.inc('shed')
+            return None
         
-        logger.info(f"Raw Gemini response (first 200 chars): {content[:200]}")
+        return parse_ai_questions(content, skills)
         
-        # Clean up potential markdown code blocks
-        if content.startswith("```json"):
-            content = content[7:]
-        if content.startswith("```"):
-            content = content[3:]
-        if content.endswith("```"):
-            content = content[:-3]
-        content = content.strip()
+    except Exception as e:
+        logger.error(f"Gemini API error: {e}", exc_info=True)
+        LLM_OUTCOMES.inc('error')
+        return None
+
+def parse_ai_questions(content, skills):
+    """Turn a raw Gemini response into the structured result (None if it can't be used)."""
+    logger.info(f"Raw Gemini response (first 200 chars): {content[:200]}")
+    
+    # Clean up potential markdown code blocks
+    if content.startswith("```json"):
+        content = content[7:]
+    if content.startswith("```"):
+        content = content[3:]
+    if content.endswith("```"):
+        content = content[:-3]
+    content = content.strip()
+    
+    try:
+        result = json.loads(content)
+        logger.info(f"Successfully parsed JSON response")
         
-        try:
-            result = json.loads(content)
-            logger.info(f"Successfully parsed JSON response")
+        # Validate and extract questions
+        if isinstance(result, dict) and "questions" in result:
+            questions_obj = result.get("questions", {})
             
-            # Validate and extract questions
-            if isinstance(result, dict) and "questions" in result:
-                questions_obj = result.get("questions", {})
-                
-                # Handle both formats: array of objects or simple strings
-                technical_questions = []
-                hr_questions = []
+            # Handle both formats: array of objects or simple strings
+            technical_questions = []
+            hr_questions = []
+            
+            if isinstance(questions_obj, dict):
+                tech_list = questions_obj.get("technical", [])
+                hr_list = questions_obj.get("hr", [])
                 
-                if isinstance(questions_obj, dict):
-                    tech_list = questions_obj.get("technical", [])
-                    hr_list = questions_obj.get("hr", [])
-                    
-                    # Extract question text from objects or use strings directly
-                    for item in tech_list:
-                        if isinstance(item, dict):
-                            technical_questions.append(item.get("question", str(item)))
-                        else:
-                            technical_questions.append(str(item))
-                    
-                    for item in hr_list:
-                        if isinstance(item, dict):
-                            hr_questions.append(item.get("question", str(item)))
-                        else:
-                            hr_questions.append(str(item))
+                # Extract question text from objects or use strings directly
+                for item in tech_list:
+                    if isinstance(item, dict):
+                        technical_questions.append(item.get("question", str(item)))
+                    else:
+                        technical_questions.append(str(item))
                 
-                if technical_questions or hr_questions:
-                    logger.info(f"✅ Extracted {len(technical_questions)} technical, {len(hr_questions)} HR questions")
-                    return {
-                        "skills": result.get("skills", skills)[:15],
-                        "experience": result.get("experience", [])[:5],
-                        "questions": {
-                            "technical": technical_questions,
-                            "hr": hr_questions
-                        }
+                for item in hr_list:
+                    if isinstance(item, dict):
+                        hr_questions.append(item.get("question", str(item)))
+                    else:
+                        hr_questions.append(str(item))
+            
+            if technical_questions or hr_questions:
+                logger.info(f"✅ Extracted {len(technical_questions)} technical, {len(hr_questions)} HR questions")
+                LLM_OUTCOMES.inc('success')
+                return {
+                    "skills": result.get("skills", skills)[:15],
+                    "experience": result.get("experience", [])[:5],
+                    "questions": {
+                        "technical": technical_questions,
+                        "hr": hr_questions
                     }
-                else:
-                    logger.warning("No questions found in structured response")
-                    return None
+                }
             else:
-                logger.warning(f"Invalid response structure: {type(result)}")
+                logger.warning("No questions found in structured response")
+                LLM_OUTCOMES.inc('invalid_response')
                 return None
-                
-        except json.JSONDecodeError as je:
-            logger.error(f"JSON Parse Error: {je}")
-            logger.error(f"Content that failed to parse: {content[:500]}")
+        else:
+            logger.warning(f"Invalid response structure: {type(result)}")
+            LLM_OUTCOMES.inc('invalid_response')
             return None
-        
-    except Exception as e:
-        logger.error(f"Gemini API error: {e}", exc_info=True)
+            
+    except json.JSONDecodeError as je:
+        logger.error(f"JSON Parse Error: {je}")
+        logger.error(f"Content that failed to parse: {content[:500]}")
+        LLM_OUTCOMES.inc('parse_error')
         return None
 
+INTRO_QUESTION = "Tell me about yourself and walk me through your background."
+SUPPORTED_EXTENSIONS = ('.pdf', '.docx', '.txt')
+
+class ResumeProcessingError(Exception):
+    """Raised when an uploaded resume can't be analysed; carries the HTTP status to return."""
+
+    def __init__(self, message, status_code, retry_after=None):
+        super().__init__(message)
+        self.status_code = status_code
+        self.retry_after = retry_after
+
+def extract_resume_text(source, file_ext):
+    """Extract and validate resume text (STEP 3 and 4 of the upload flow)."""
+    logger.info("📝 Extracting text from file...")
+    try:
+        with CPU_LIMITER.slot():
+            try:
+                with timed_stage('extract'):
+                    text = extract_text(source, file_ext)
+            except Exception as extract_error:
+                logger.error(f"❌ Text extraction failed: {extract_error}")
+                raise ResumeProcessingError(f'Failed to extract text from file: {str(extract_error)}', 500)
+    except Overloaded as e:
+        logger.warning(f"⚠️ {e}")
+        raise ResumeProcessingError(str(e), e.status_code, e.retry_after)
+    
+    logger.info(f"📊 Extracted text length: {len(text)} characters")
+    
+    if not text or len(text.strip()) < 10:
+        logger.error("❌ Extracted text is empty or too short")
+        raise ResumeProcessingError('Resume content appears to be empty or too short. Please check your file.', 400)
+    
+    logger.info(f"✅ Text extracted successfully. First 100 chars: {text[:100]}...")
+    return text
+
+def scan_resume(source, file_ext):
+    """
+    Streaming STEP 3 to 5 for one resume: text chunks from iter_text go straight
+    into the skill matcher (MatchStream) and the prompt compaction, and are
+    dropped, so memory stays flat however long the document is. Same checks
+    and errors as extract_resume_text + extract_skills.
+    Returns (prompt_text, skills), prompt_text being the compacted resume for build_prompt.
+    """
+    logger.info("📝 Extracting text from file (streaming)...")
+    matcher = current_skill_index().matcher
+    skill_stream = matcher.stream()
+    compaction = PROMPT_COMPACTOR.begin(match_skills=matcher.match) if PROMPT_COMPACTOR else None
+    head = []                   # First 3000 characters, when compaction is off
+    head_chars = 0
+    characters = 0
+    content_start = None        # Offsets of the first and last non-whitespace characters,
+    content_end = 0             # i.e. len(text.strip()) without keeping the text
+    started = time.perf_counter()
+    scan_seconds = 0.0
+    try:
+        with CPU_LIMITER.slot():
+            try:
+                for chunk in iter_text(source, file_ext):
+                    scan_started = time.perf_counter()
+                    if chunk and not chunk.isspace():
+                        if content_start is None:
+                            content_start = characters + len(chunk) - len(chunk.lstrip())
+                        content_end = characters + len(chunk.rstrip())
+                    characters += len(chunk)
+                    skill_stream.feed(chunk.lower())
+                    if compaction is not None:
+                        compaction.feed(chunk)
+                    elif head_chars < 3000:
+                        head.append(chunk[:3000 - head_chars])
+                        head_chars += len(head[-1])
+                    scan_seconds += time.perf_counter() - scan_started
+            except Exception as extract_error:
+                logger.error(f"❌ Text extraction failed: {extract_error}")
+                raise ResumeProcessingError(f'Failed to extract text from file: {str(extract_error)}', 500)
+    except Overloaded as e:
+        logger.warning(f"⚠️ {e}")
+        raise ResumeProcessingError(str(e), e.status_code, e.retry_after)
+    record_stage('extract', time.perf_counter() - started - scan_seconds)
+    
+    logger.info(f"📊 Extracted text length: {characters} characters")
+    
+    if content_start is None or content_end - content_start < 10:
+        logger.error("❌ Extracted text is empty or too short")
+        raise ResumeProcessingError('Resume content appears to be empty or too short. Please check your file.', 400)
+    
+    close_started = time.perf_counter()
+    skills = sorted(skill_stream.close())
+    if compaction is None:
+        record_stage('skills', scan_seconds + time.perf_counter() - close_started)
+        logger.info(f"Matched skills: {skills}")
+        return PromptText("".join(head)), skills
+    # Compaction time is tracked by the compaction itself, the rest of the scan is skill matching
+    record_stage('skills', scan_seconds - compaction.seconds + time.perf_counter() - close_started)
+    logger.info(f"Matched skills: {skills}")
+    prompt_text, report = compaction.finish()
+    record_stage('compact', compaction.seconds)
+    log_compaction(report)
+    return PromptText(prompt_text), skills
+
+def build_ai_payload(ai_result, skills):
+    """Build the upload response from a structured Gemini result."""
+    technical_questions = ai_result.get("questions", {}).get("technical", [])
+    hr_questions = ai_result.get("questions", {}).get("hr", [])
+    
+    # Combine all questions with intro first
+    final_questions = [INTRO_QUESTION]
+    final_questions.extend(technical_questions)
+    final_questions.extend(hr_questions)
+    
+    logger.info(f"✅ Returning {len(final_questions)} questions ({len(technical_questions)} technical, {len(hr_questions)} HR)")
+    
+    return {
+        'status': 'success',
+        'questions': final_questions,
+        'skills': ai_result.get("skills", skills)[:15],
+        'experience': ai_result.get("experience", [])[:5],
+        'questions_categorized': {
+            'technical': technical_questions,
+            'hr': hr_questions
+        }
+    }
+
+def build_static_payload(skills, seed_key=None):
+    """Build the upload response from the static question database."""
+    with timed_stage('fallback'):
+        return _build_static_payload(skills, seed_key)
+
+def _build_static_payload(skills, seed_key=None):
+    # ALWAYS add introduction question first
+    final_questions = [INTRO_QUESTION]
+    
+    # Up to 2 questions per skill, topped up with generic ones, shuffled and limited to 7.
+    # Seeded by (resume hash, seed) so the same upload always gets the same questions.
+    final_questions.extend(current_skill_index().question_bank.select(skills, seed_key))
+    
+    # Categorize fallback questions
+    tech_count = len(final_questions) // 2
+    
+    logger.info(f"✅ Returning {len(final_questions)} questions (fallback mode)")
+    
+    return StaticPayload({
+        'status': 'success',
+        'questions': final_questions,
+        'skills': skills[:15],
+        'experience': [f"Experience in {skills[0]}" if skills else "General experience"],
+        'questions_categorized': {
+            'technical': final_questions[1:tech_count+1],
+            'hr': final_questions[tech_count+1:]
+        }
+    })
+
+def record_candidate(candidate, skills):
+    """Add an analysed resume to the candidate store; candidate is (content_key, filename) or None."""
+    if candidate is None or CANDIDATE_STORE is None:
+        return
+    try:
+        CANDIDATE_STORE.add(candidate[0], candidate[1], skills)
+    except Exception as e:
+        # Search is a side feature, never fail an upload because of it
+        logger.error(f"❌ Failed to store candidate {candidate[1]}: {e}")
+
+def analyze_text(text, seed_key=None, candidate=None):
+    """
+    Run skill matching and question generation on extracted text (STEP 5 and 6).
+    Returns (payload, used_llm).
+    """
+    logger.info("🔍 Extracting skills from resume...")
+    skills = extract_skills(text)
+    logger.info(f"✅ Extracted {len(skills)} skills: {skills}")
+    record_candidate(candidate, skills)
+    return generate_payload(text, skills, seed_key)
+
+def generate_payload(text, skills, seed_key=None):
+    """Generate questions (Gemini first, static bank as fallback). Returns (payload, used_llm)."""
+    logger.info("🤖 Generating interview questions...")
+    
+    if LLM_HEDGE:
+        # Hedged mode: Gemini starts first and the static answer is built while it runs. If Gemini
+        # misses LLM_HEDGE_BUDGET the static answer goes out; the call carries on and its questions
+        # still land in the question-set cache for the next upload with these skills.
+        started = time.perf_counter()
+        future = HEDGE_EXECUTOR.submit(contextvars.copy_context().run, generate_ai_questions, text, skills)
+        static_payload = build_static_payload(skills, seed_key)
+        try:
+            ai_result, used_llm = future.result(timeout=max(0.0, LLM_HEDGE_BUDGET - (time.perf_counter() - started)))
+        except FutureTimeout:
+            logger.info(f"⏱️ Gemini missed the {LLM_HEDGE_BUDGET}s hedge budget, answering from the static bank")
+            LLM_OUTCOMES.inc('hedged')
+            ai_result, used_llm = None, False
+    else:
+        static_payload = None
+        # Try AI generation first for structured output
+        ai_result, used_llm = generate_ai_questions(text, skills)
+    
+    if ai_result:
+        logger.info("✅ Successfully generated structured analysis using Gemini AI")
+        return build_ai_payload(ai_result, skills), used_llm
+    
+    # Fallback to static question database
+    logger.info("⚠️ AI generation failed, using static question database")
+    LLM_OUTCOMES.inc('fallback')
+    return static_payload or build_static_payload(skills, seed_key), False
+
+def seniority_bucket(skills):
+    if 'entry_level' in skills:
+        return 'entry'
+    if 'executive' in skills or 'leadership' in skills:
+        return 'senior'
+    return 'mid'
+
+def question_set_signature(skills):
+    return QuestionSetCache.signature(skills, seniority_bucket(skills) if QSET_SENIORITY else None)
+
+def generate_ai_questions(text, skills, timeout=None):
+    """
+    AI questions for these skills, served from QUESTION_SET_CACHE when a question set
+    for the same skill signature exists and isn't due for refresh.
+    Returns (ai_result or None, used_llm).
+    """
+    if LLM_CLIENT is None:
+        # Nothing can have been cached; keep the hit ratio meaningful
+        return generate_questions_with_ai(text, skills), False
+    
+    signature = question_set_signature(skills)
+    cached = QUESTION_SET_CACHE.get(signature)
+    if cached is not None:
+        logger.info(f"⚡ Question set cache hit for {signature}")
+        LLM_OUTCOMES.inc('question_set_cache')
+        return question_set_result(cached, skills, text), False
+    
+    ai_result = generate_questions_with_ai(text, skills, timeout=timeout)
+    if ai_result and isinstance(ai_result, dict):
+        store_question_set(signature, ai_result["questions"], text, skills)
+        return ai_result, True
+    
+    # LLM unavailable: a question set that is due for refresh still beats the static bank
+    stale = QUESTION_SET_CACHE.get(signature, allow_stale=True)
+    if stale is not None:
+        logger.info(f"♻️ Serving stale question set for {signature}")
+        return question_set_result(stale, skills, text), False
+    return None, False
+
+# Capitalised words after the first one, and anything with a digit: names, employers, products, figures
+_NAMED_TOKEN_RE = re.compile(r"(?<!^)\b[A-Z][\w&+.-]*|\b\w*\d[\w%]*")
+
+def is_resume_specific(question, text_lower, skill_words):
+    """True if a question quotes this resume beyond its skills (an employer, project, product or figure)."""
+    for token in _NAMED_TOKEN_RE.findall(question):
+        token = token.lower().strip(".-")
+        if len(token) < 2 or token in skill_words:
+            continue
+        if re.search(r"(?<!\w)" + re.escape(token) + r"(?!\w)", text_lower):
+            return True
+    return False
+
+def store_question_set(signature, questions, text, skills):
+    """
+    Pool the skill-generic part of a generated question set for other resumes with
+    the same signature; questions that quote this resume are not shared.
+    """
+    text_lower = text.lower()
+    skill_words = {word for skill in skills for word in skill.lower().split()}
+    shared = {field: [question for question in questions[field]
+                      if not is_resume_specific(question, text_lower, skill_words)]
+              for field in ('technical', 'hr')}
+    if shared['technical']:
+        QUESTION_SET_CACHE.put(signature, shared['technical'], shared['hr'])
+
+def question_set_result(questions, skills, text):
+    """AI result for pooled questions; the experience summary comes from this resume's own role lines."""
+    return {
+        "skills": skills[:15],
+        "experience": role_lines(text) or [f"Experience in {skills[0]}" if skills else "General experience"],
+        "questions": questions
+    }
+
+def analyze_resume(source, file_ext, seed_key=None, candidate=None):
+    """Full pipeline for one resume file: extract, validate, match skills, generate questions."""
+    text, skills = scan_resume(source, file_ext)
+    logger.info(f"✅ Extracted {len(skills)} skills: {skills}")
+    record_candidate(candidate, skills)
+    return generate_payload(text, skills, seed_key)
+
+def attribute_questions(questions, skills):
+    """Map each question to the resume skills it mentions ([] = general, never dropped)."""
+    skills = set(skills)
+    return {question: [skill for skill in extract_skills(question) if skill in skills] for question in questions}
+
+def questions_for_skills(text, skills, seed_key=None, per_skill=2):
+    """
+    New technical questions for skills added by an edit, as {question: [skills]}.
+    Gemini sees only the changed sections; the static bank is the fallback.
+    Returns (questions, used_llm).
+    """
+    ai_result = generate_questions_with_ai(text, skills)
+    if ai_result:
+        technical = ai_result["questions"]["technical"][:per_skill * len(skills)]
+        attribution = attribute_questions(technical, skills)
+        return {question: attribution[question] or list(skills) for question in technical}, True
+    
+    bank = current_skill_index().question_bank
+    rng = bank.rng(seed_key)
+    questions = {}
+    picked = set()
+    for skill in skills:
+        for question_id in bank.sample(skill, per_skill, rng, picked):
+            picked.add(question_id)
+            questions[bank.questions[question_id]] = [skill]
+    return questions, False
+
+def analyze_incremental(text, previous=None, seed_key=None):
+    """
+    Incremental variant of analyze_text. previous is the state of an earlier analysis of
+    the same resume (see _incremental.py): sections with an unchanged fingerprint reuse
+    their skill matches, and only questions for added/removed skills change.
+    Returns (payload, used_llm, state, report).
+    """
+    previous_sections = {fp: skills for _, fp, skills in previous['sections']} if previous else {}
+    matcher = current_skill_index().matcher
+    sections = []
+    changed_text = []
+    changed_titles = []
+    tail = None
+    for title, body in split_sections(text):
+        # Matched together with the end of the previous section (as MatchStream carries its
+        # overlap), so a term across the boundary is found just like in the whole text
+        window = body if tail is None else tail + "\n" + body
+        fp = section_fingerprint(window)
+        section_skills = previous_sections.get(fp)
+        if section_skills is None:
+            # A cut-off tail has no context before its first character; terms starting
+            # there lie wholly in the previous section and were matched with it
+            lo = 1 if tail is not None and len(tail) == matcher.overlap else 0
+            with timed_stage('skills'):
+                section_skills = sorted(matcher.match(window.lower(), lo=lo))
+            changed_titles.append(title)
+            changed_text.append(body)
+        sections.append((title, fp, section_skills))
+        tail = window[-matcher.overlap:]
+    skills = sorted({skill for _, _, section_skills in sections for skill in section_skills})
+    report = {
+        'sections': len(sections),
+        'sections_recomputed': changed_titles,
+    }
+    
+    if previous is None:
+        payload, used_llm = generate_payload(text, skills, seed_key)
+        technical = payload['questions_categorized']['technical']
+        attribution = attribute_questions(technical, skills)
+        report.update(skills_added=skills, skills_removed=[], questions_reused=0,
+                      questions_dropped=0, questions_generated=len(payload['questions']), llm_called=used_llm)
+        return payload, used_llm, {'sections': sections, 'skills': skills, 'payload': payload,
+                                   'attribution': attribution}, report
+    
+    previous_skills = set(previous['skills'])
+    added = [skill for skill in skills if skill not in previous_skills]
+    removed = set(previous_skills) - set(skills)
+    previous_payload = previous['payload']
+    
+    # Keep questions that don't belong to a removed skill, add questions for the new ones
+    attribution = {}
+    for question in previous_payload['questions_categorized']['technical']:
+        owners = previous['attribution'].get(question, [])
+        if not removed.intersection(owners):
+            attribution[question] = owners
+    dropped = len(previous_payload['questions_categorized']['technical']) - len(attribution)
+    generated, used_llm = questions_for_skills("\n".join(changed_text), added, seed_key) if added else ({}, False)
+    new_questions = 0
+    for question, owners in generated.items():
+        if question not in attribution:
+            attribution[question] = owners
+            new_questions += 1
+    
+    technical = list(attribution)
+    hr = previous_payload['questions_categorized']['hr']
+    payload = {
+        'status': 'success',
+        'questions': [INTRO_QUESTION] + technical + hr,
+        'skills': skills[:15],
+        'experience': previous_payload['experience'],
+        'questions_categorized': {
+            'technical': technical,
+            'hr': hr
+        }
+    }
+    report.update(skills_added=added, skills_removed=sorted(removed),
+                  questions_reused=len(technical) - new_questions + len(hr),
+                  questions_dropped=dropped, questions_generated=new_questions, llm_called=used_llm)
+    return payload, used_llm, {'sections': sections, 'skills': skills, 'payload': payload,
+                               'attribution': attribution}, report
+
+def incremental_upload(file, file_ext, previous_id=None):
+    """
+    /api/upload in incremental mode. The response is the usual payload plus an analysis_id
+    to send back as ?previous= with the next edit, and an 'incremental' report of what
+    was recomputed.
+    """
+    filename = file.filename
+    content_key = AnalysisCache.key_for_stream(file.stream, file_ext)
+    previous = REVISIONS.get(previous_id) if previous_id else None
+    if previous_id and previous is None:
+        logger.info(f"Previous analysis {previous_id} not found, analysing {filename} from scratch")
+    
+    try:
+        text = extract_resume_text(file.stream, file_ext)
+        payload, used_llm, state, report = analyze_incremental(text, previous, seed_key=content_key)
+    except ResumeProcessingError as e:
+        return error_response(str(e), e.status_code, e.retry_after)
+    except Exception as e:
+        logger.error(f"❌ Unexpected error processing file: {e}", exc_info=True)
+        return error_response(f'Server error: {str(e)}', 500)
+    
+    record_candidate((content_key, filename), state['skills'])
+    analysis_id = REVISIONS.put(state)
+    logger.info(f"♻️ Incremental analysis of {filename}: recomputed {report['sections_recomputed']}, "
+                f"+{len(report['skills_added'])}/-{len(report['skills_removed'])} skills")
+    report.update(previous=previous_id if previous is not None else None)
+    return jsonify(dict(payload, analysis_id=analysis_id, incremental=report)), 200
+
+def error_response(message, status_code, retry_after=None):
+    response = jsonify({
+        'status': 'error',
+        'error': message
+    })
+    if retry_after is not None:
+        response.headers['Retry-After'] = str(retry_after)
+    return response, status_code
+
+def get_uploaded_resume(files=None):
+    """Validate the 'resume' upload (STEP 1 and 2, plus UPLOAD_MAX_BYTES) in files (default request.files). Returns (file, file_ext)."""
+    files = request.files if files is None else files
+    if 'resume' not in files:
+        logger.error("❌ No file part in request")
+        raise ResumeProcessingError('No file part in request', 400)
+    
+    file = files['resume']
+    if file.filename == '':
+        logger.error("❌ No selected file")
+        raise ResumeProcessingError('No file selected', 400)
+
+    file_ext = os.path.splitext(file.filename)[1].lower()
+    logger.info(f"📄 Processing file: {file.filename} (type: {file_ext})")
+    
+    if file_ext not in SUPPORTED_EXTENSIONS:
+        logger.error(f"❌ Unsupported file format: {file_ext}")
+        raise ResumeProcessingError(f'Unsupported file format: {file_ext}. Please upload PDF, DOCX, or TXT.', 400)
+    
+    # The body cap allows MULTIPART_OVERHEAD for the form around the file; the file itself gets no slack
+    file.stream.seek(0, os.SEEK_END)
+    size = file.stream.tell()
+    file.stream.seek(0)
+    if size > UPLOAD_MAX_BYTES:
+        logger.error(f"❌ File too large: {size} bytes")
+        raise ResumeProcessingError(f'Upload too large (max {UPLOAD_MAX_BYTES} bytes)', 413)
+    return file, file_ext
+
 @app.route('/upload', methods=['POST'])
 @app.route('/api/upload', methods=['POST'])
 def upload_resume():
     """
     Upload endpoint for resume processing.
     Returns structured JSON with questions, skills, and experience.
+    With ?stream=1 the stages are streamed as NDJSON events (see stream_analysis).
     """
-    # STEP 1: Validate file upload
+    # STEP 1 and 2: Validate file upload and type
     logger.info("📥 Received upload request")
+    try:
+        file, file_ext = get_uploaded_resume()
+    except ResumeProcessingError as e:
+        return error_response(str(e), e.status_code, e.retry_after)
+    filename = file.filename
     
-    if 'resume' not in request.files:
-        logger.error("❌ No file part in request")
-        return jsonify({
-            'status': 'error',
-            'error': 'No file part in request'
-        }), 400
+    # Incremental mode: ?incremental=1 starts tracking sections, ?previous=<analysis_id> diffs against them
+    previous_id = request.args.get('previous') or request.form.get('previous')
+    if previous_id or request_flag('incremental'):
+        return incremental_upload(file, file_ext, previous_id)
     
-    file = request.files['resume']
-    if file.filename == '':
-        logger.error("❌ No selected file")
-        return jsonify({
-            'status': 'error',
-            'error': 'No file selected'
-        }), 400
-
-    filename = file.filename
-    file_ext = os.path.splitext(filename)[1].lower()
-    logger.info(f"📄 Processing file: {filename} (type: {file_ext})")
+    # Check the analysis cache before doing any work.
+    # The upload is processed straight from the request stream: Werkzeug keeps small
+    # uploads in memory and spools large ones to an anonymous, per-request temp file.
+    stream = file.stream
+    with timed_stage('hash'):
+        content_key = AnalysisCache.key_for_stream(stream, file_ext)
+    cache_key = index_cache_key(content_key)
+    # The cache key doubles as the question selection seed; ?seed=N picks another reproducible set
+    seed = request.args.get('seed') or request.form.get('seed')
+    if seed:
+        cache_key = f"{cache_key}#{seed}"
+    cached = None
+    if cache_bypass_requested():
+        logger.info("⏭️ Cache bypass requested")
+        ANALYSIS_CACHE.record_bypass()
+    else:
+        cached = ANALYSIS_CACHE.get(cache_key)
+        if cached is not None:
+            logger.info(f"⚡ Cache hit for {filename}")
     
-    # STEP 2: Validate file type
-    if file_ext not in ['.pdf', '.docx', '.txt']:
-        logger.error(f"❌ Unsupported file format: {file_ext}")
-        return jsonify({
-            'status': 'error',
-            'error': f'Unsupported file format: {file_ext}. Please upload PDF, DOCX, or TXT.'
-        }), 400
+    if request_flag('stream'):
+        # Werkzeug closes the upload once the view returns, so keep our own copy for the generator
+        events = stream_analysis(io.BytesIO(stream.read()), file_ext, cache_key, cached,
+                                 candidate=(content_key, filename))
+        response = Response(stream_with_context(ndjson_lines(events)), mimetype='application/x-ndjson')
+        response.headers['X-Cache'] = 'HIT' if cached is not None else 'MISS'
+        return response
     
-    # Save temporarily to /tmp (or system temp dir) to avoid read-only errors on Vercel
-    temp_dir = tempfile.gettempdir()
-    temp_path = os.path.join(temp_dir, "temp_resume" + file_ext)
+    if cached is not None:
+        response = jsonify(cached)
+        response.headers['X-Cache'] = 'HIT'
+        return response, 200
     
+    started = time.perf_counter()
     try:
-        file.save(temp_path)
-        logger.info(f"✅ File saved temporarily: {temp_path}")
-        
-        # STEP 3: Extract text from file
-        logger.info("📝 Extracting text from file...")
-        text = ""
-        
-        try:
-            if file_ext == '.pdf':
-                text = extract_text_from_pdf(temp_path)
-            elif file_ext == '.docx':
-                text = extract_text_from_docx(temp_path)
-            elif file_ext == '.txt':
-                with open(temp_path, 'r', encoding='utf-8') as f:
-                    text = f.read()
-        except Exception as extract_error:
-            logger.error(f"❌ Text extraction failed: {extract_error}")
-            return jsonify({
-                'status': 'error',
-                'error': f'Failed to extract text from file: {str(extract_error)}'
-            }), 500
-        
-        # STEP 4: Validate extracted text
-        logger.info(f"📊 Extracted text length: {len(text)} characters")
-        
-        if not text or len(text.strip()) < 10:
-            logger.error("❌ Extracted text is empty or too short")
-            return jsonify({
-                'status': 'error',
-                'error': 'Resume content appears to be empty or too short. Please check your file.'
-            }), 400
-        
-        logger.info(f"✅ Text extracted successfully. First 100 chars: {text[:100]}...")
+        payload, used_llm = analyze_resume(stream, file_ext, cache_key, candidate=(content_key, filename))
+    except ResumeProcessingError as e:
+        return error_response(str(e), e.status_code, e.retry_after)
+    except Exception as e:
+        logger.error(f"❌ Unexpected error processing file: {e}", exc_info=True)
+        return error_response(f'Server error: {str(e)}', 500)
+    
+    ANALYSIS_CACHE.put(cache_key, payload,
+                       compute_seconds=time.perf_counter() - started,
+                       used_llm=used_llm, ttl_seconds=analysis_cache_ttl(payload))
+    response = jsonify(payload)
+    response.headers['X-Cache'] = 'MISS'
+    return response, 200
+
+def stream_analysis(source, file_ext, cache_key, cached=None, candidate=None):
+    """
+    Progressive variant of the upload flow. Yields one event per stage as soon as it is ready:
+    text -> skills -> static_questions -> ai_questions (if Gemini succeeds) -> result.
+    The final 'result' event carries the same payload the non-streaming endpoint returns.
+    """
+    if cached is not None:
+        yield {'stage': 'result', 'cached': True, 'data': cached}
+        return
+    
+    started = time.perf_counter()
+    try:
+        text = extract_resume_text(source, file_ext)
+        yield {
+            'stage': 'text',
+            'characters': len(text),
+            'words': len(text.split()),
+            'lines': text.count("\n") + 1
+        }
         
-        # STEP 5: Extract skills using NLP
-        logger.info("🔍 Extracting skills from resume...")
         skills = extract_skills(text)
-        logger.info(f"✅ Extracted {len(skills)} skills: {skills}")
+        record_candidate(candidate, skills)
+        yield {'stage': 'skills', 'skills': skills}
         
-        # STEP 6: Generate questions
-        logger.info("🤖 Generating interview questions...")
+        static_payload = build_static_payload(skills, cache_key)
+        yield {'stage': 'static_questions', 'questions': static_payload['questions']}
         
-        # Try AI generation first for structured output
-        ai_result = generate_questions_with_ai(text, skills)
-        
-        if ai_result and isinstance(ai_result, dict):
-            # AI returned structured format
-            logger.info("✅ Successfully generated structured analysis using Gemini AI")
-            
-            # Build final questions list
-            technical_questions = ai_result.get("questions", {}).get("technical", [])
-            hr_questions = ai_result.get("questions", {}).get("hr", [])
-            
-            # Combine all questions with intro first
-            final_questions = ["Tell me about yourself and walk me through your background."]
-            final_questions.extend(technical_questions)
-            final_questions.extend(hr_questions)
-            
-            logger.info(f"✅ Returning {len(final_questions)} questions ({len(technical_questions)} technical, {len(hr_questions)} HR)")
-            
-            return jsonify({
-                'status': 'success',
-                'questions': final_questions,
-                'skills': ai_result.get("skills", skills)[:15],
-                'experience': ai_result.get("experience", [])[:5],
-                'questions_categorized': {
-                    'technical': technical_questions,
-                    'hr': hr_questions
-                }
-            }), 200
+        ai_result, used_llm = generate_ai_questions(text, skills)
+        if ai_result:
+            payload = build_ai_payload(ai_result, skills)
+            yield {'stage': 'ai_questions', 'questions': payload['questions_categorized']}
         else:
-            # Fallback to static question database
-            logger.info("⚠️ AI generation failed, using static question database")
-            
-            # ALWAYS add introduction question first
-            final_questions = ["Tell me about yourself and walk me through your background."]
-            generated_questions = []
-            
-            # Add skill-specific questions
-            for skill in skills:
-                skill_questions = QUESTIONS_DB.get(skill, [])
-                if skill_questions:
-                    count = min(len(skill_questions), 2)
-                    generated_questions.extend(random.sample(skill_questions, count))
-            
-            # Add generic questions if needed
-            if len(generated_questions) < 5:
-                generic_pool = QUESTIONS_DB.get('generic', [])
-                if generic_pool:
-                    count = min(len(generic_pool), 5 - len(generated_questions))
-                    generated_questions.extend(random.sample(generic_pool, count))
-            
-            # Shuffle and limit
-            random.shuffle(generated_questions)
-            final_questions.extend(generated_questions[:7])
-            
-            # Categorize fallback questions
-            tech_count = len(final_questions) // 2
-            
-            logger.info(f"✅ Returning {len(final_questions)} questions (fallback mode)")
-            
-            return jsonify({
-                'status': 'success',
-                'questions': final_questions,
-                'skills': skills[:15],
-                'experience': [f"Experience in {skills[0]}" if skills else "General experience"],
-                'questions_categorized': {
-                    'technical': final_questions[1:tech_count+1],
-                    'hr': final_questions[tech_count+1:]
-                }
-            }), 200
-
+            payload = static_payload
+    except ResumeProcessingError as e:
+        event = {'stage': 'error', 'status': e.status_code, 'error': str(e)}
+        if e.retry_after is not None:
+            event['retry_after'] = e.retry_after
+        yield event
+        return
     except Exception as e:
         logger.error(f"❌ Unexpected error processing file: {e}", exc_info=True)
-        return jsonify({
-            'status': 'error',
-            'error': f'Server error: {str(e)}'
-        }), 500
-    finally:
-        # CRITICAL: Always cleanup temp file
-        if os.path.exists(temp_path):
-            try:
-                os.remove(temp_path)
-                logger.info(f"🗑️ Cleaned up temp file: {temp_path}")
-            except Exception as cleanup_error:
-                logger.warning(f"⚠️ Failed to cleanup temp file: {cleanup_error}")
-
-def extract_text_from_pdf(file_path):
-    text = ""
-    with pdfplumber.open(file_path) as pdf:
-        for page in pdf.pages:
-            text += page.extract_text() or ""
-    return text
+        yield {'stage': 'error', 'status': 500, 'error': f'Server error: {str(e)}'}
+        return
+    
+    ANALYSIS_CACHE.put(cache_key, payload,
+                       compute_seconds=time.perf_counter() - started,
+                       used_llm=used_llm, ttl_seconds=analysis_cache_ttl(payload))
+    yield {'stage': 'result', 'cached': False, 'data': payload}
+
+def ndjson_lines(events):
+    for event in events:
+        yield json.dumps(event) + "\n"
+
+def request_flag(name):
+    """True if a boolean flag is set in the query string or form (e.g. ?stream=1)."""
+    flag = request.args.get(name) or request.form.get(name) or ''
+    return flag.lower() in ('1', 'true', 'yes')
+
+def cache_bypass_requested():
+    """True if the client asked to skip the analysis cache (?nocache=1 or form field nocache)."""
+    return request_flag('nocache')
+
+@app.before_request
+def start_request_timer():
+    g.request_started = time.perf_counter()
+
+# Body cap per endpoint, enforced before the upload is read
+UPLOAD_ENDPOINTS = {
+    'upload_resume': UPLOAD_MAX_BYTES + MULTIPART_OVERHEAD,
+    'submit_job': UPLOAD_MAX_BYTES + MULTIPART_OVERHEAD,
+    'upload_batch': BATCH_MAX_BYTES + MULTIPART_OVERHEAD,
+    'rank_resumes': BATCH_MAX_BYTES + MULTIPART_OVERHEAD,
+}
 
-def extract_text_from_docx(file_path):
-    doc = docx.Document(file_path)
-    text = ""
-    for para in doc.paragraphs:
-        text += para.text + "\n"
+@app.before_request
+def admit_upload():
+    """Reject oversized or excess uploads before their body is buffered."""
+    max_bytes = UPLOAD_ENDPOINTS.get(request.endpoint)
+    if max_bytes is None:
+        return None
+    if request.content_length is not None and request.content_length > max_bytes:
+        ADMISSION_REJECTS.inc(request.endpoint, 'too_large')
+        return error_response(f'Upload too large (max {max_bytes - MULTIPART_OVERHEAD} bytes)', 413)
+    # Chunked uploads have no Content-Length; Werkzeug stops reading past this limit
+    request.max_content_length = max_bytes
+    if request.endpoint == 'upload_resume' and CPU_LIMITER.saturated():
+        ADMISSION_REJECTS.inc(request.endpoint, 'busy')
+        return error_response('Server busy, please retry later', 429, CPU_LIMITER.retry_after())
+    return None
+
+@app.errorhandler(413)
+def upload_too_large(e):
+    return error_response('Upload too large', 413)
+
+@app.before_request
+def pin_skill_index():
+    # The whole request uses one index snapshot, even if a reload swaps SKILL_INDEX meanwhile
+    g.skill_index = SKILL_INDEX
+
+@app.after_request
+def add_index_version(response):
+    skill_index = g.get('skill_index')
+    if skill_index is not None:
+        response.headers['X-Index-Version'] = f"{skill_index.version}-{skill_index.fingerprint}"
+    return response
+
+@app.after_request
+def record_request_metrics(response):
+    started = g.get('request_started')
+    if started is None:
+        return response
+    elapsed = time.perf_counter() - started
+    endpoint = request.endpoint or 'unknown'
+    REQUEST_SECONDS.observe(endpoint, elapsed)
+    REQUESTS_TOTAL.inc(endpoint, str(response.status_code))
+    response.headers['Server-Timing'] = server_timing_header(g.get('server_timing', {}), elapsed)
+    return response
+
+def server_timing_header(server_timing, total_seconds):
+    timings = [f"{name};dur={seconds * 1000:.2f}" for name, seconds in server_timing.items()]
+    timings.append(f"total;dur={total_seconds * 1000:.2f}")
+    return ", ".join(timings)
+
+METRICS.add_collector('resume_analysis_cache', 'Analysis cache counters', lambda: ANALYSIS_CACHE.stats())
+METRICS.add_collector('resume_question_set_cache', 'Question-set cache counters', lambda: QUESTION_SET_CACHE.stats())
+METRICS.add_collector('resume_llm_client', 'Gemini client counters',
+                      lambda: LLM_CLIENT.stats() if LLM_CLIENT else {})
+METRICS.add_collector('resume_job_queue', 'Job queue depth and job counts', lambda: JOB_QUEUE.stats())
+METRICS.add_collector('resume_admission_cpu', 'CPU stage limit, active/waiting requests and rejections',
+                      lambda: CPU_LIMITER.stats())
+METRICS.add_collector('resume_admission_llm', 'LLM stage limit, active/waiting calls and rejections',
+                      lambda: LLM_LIMITER.stats())
+METRICS.add_collector('resume_candidate_store', 'Stored candidates, indexed skills and bitmap bytes',
+                      lambda: CANDIDATE_STORE.stats() if CANDIDATE_STORE else {})
+METRICS.add_collector('resume_prompt_compaction', 'Resume text compacted for LLM prompts: characters/tokens in and saved',
+                      lambda: PROMPT_COMPACTOR.stats() if PROMPT_COMPACTOR else {})
+METRICS.add_collector('resume_pdf_pages_total', 'PDF pages extracted per tier (fast = content stream, layout = pdfplumber)',
+                      pdf_tier_stats, metric_type='counter')
+METRICS.add_collector('resume_docx_documents_total', 'DOCX documents extracted per tier (fast = zip/XML stream, python-docx = fallback)',
+                      docx_tier_stats, metric_type='counter')
+
+@app.route('/api/metrics', methods=['GET'])
+def metrics():
+    """Prometheus text exposition of stage latencies, request counts and component counters."""
+    return Response(METRICS.render(), mimetype='text/plain; version=0.0.4')
+
+@app.route('/api/admission', methods=['GET'])
+def admission_stats():
+    """Current admission limits, in-flight and queued requests per stage."""
+    return jsonify({
+        'upload_max_bytes': UPLOAD_MAX_BYTES,
+        'batch_max_bytes': BATCH_MAX_BYTES,
+        'stages': {'cpu': CPU_LIMITER.stats(), 'llm': LLM_LIMITER.stats()},
+    }), 200
+
+def admin_authorized():
+    token = request.headers.get('X-Admin-Token', '')
+    return bool(ADMIN_TOKEN) and hmac.compare_digest(token.encode(), ADMIN_TOKEN.encode())
+
+@app.route('/api/admin/index', methods=['GET'])
+def index_status():
+    """Current skill index version and reload statistics."""
+    skill_index = SKILL_INDEX
+    return jsonify(dict(INDEX_RELOAD_STATS,
+                        version=skill_index.version,
+                        fingerprint=skill_index.fingerprint,
+                        skills=len(skill_index.questions_db),
+                        aliases=len(skill_index.aliases),
+                        questions=len(skill_index.question_bank),
+                        watch_interval=INDEX_WATCH_INTERVAL)), 200
+
+@app.route('/api/admin/reload', methods=['POST'])
+def reload_index():
+    """
+    Rebuild the skill index from questions.json and the alias file (requires X-Admin-Token).
+    Runs in the background and returns 202; ?wait=1 waits and reports the result
+    (422 with the error if the sources were rejected and the current version kept).
+    """
+    if not admin_authorized():
+        return error_response('Forbidden', 403)
+    if request_flag('wait'):
+        try:
+            reloaded = reload_skill_index('admin', raise_errors=True)
+        except Exception as e:
+            return jsonify({'status': 'failed', 'error': str(e), 'version': SKILL_INDEX.version}), 422
+        return jsonify({'status': 'reloaded' if reloaded else 'unchanged', 'version': SKILL_INDEX.version,
+                        'seconds': INDEX_RELOAD_STATS['last_reload_seconds'],
+                        'index_bytes': INDEX_RELOAD_STATS['last_reload_index_bytes']}), 200
+    threading.Thread(target=reload_skill_index, args=('admin',), name="skill-index-reload", daemon=True).start()
+    return jsonify({'status': 'reloading', 'version': SKILL_INDEX.version}), 202
+
+@app.route('/api/llm/stats', methods=['GET'])
+def llm_stats():
+    """Gemini client call counters and circuit breaker state."""
+    if LLM_CLIENT is None:
+        return jsonify({'enabled': False}), 200
+    return jsonify(dict(LLM_CLIENT.stats(), enabled=True, hedge=LLM_HEDGE,
+                        prompt=PROMPT_COMPACTOR.stats() if PROMPT_COMPACTOR else None)), 200
+
+@app.route('/api/cache/stats', methods=['GET'])
+def cache_stats():
+    """Analysis cache hit/miss counters and estimated latency/LLM calls saved."""
+    return jsonify(dict(ANALYSIS_CACHE.stats(), question_sets=QUESTION_SET_CACHE.stats(),
+                        revisions=REVISIONS.stats())), 200
+
+# Shared across requests so batch concurrency is bounded per process, not per request
+_batch_pools = {}
+_batch_pools_lock = threading.Lock()
+
+def get_batch_pool(stage):
+    with _batch_pools_lock:
+        if stage not in _batch_pools:
+            workers = BATCH_CPU_WORKERS if stage == 'cpu' else BATCH_LLM_WORKERS
+            _batch_pools[stage] = ThreadPoolExecutor(max_workers=max(workers, 1),
+                                                     thread_name_prefix=f"batch-{stage}")
+        return _batch_pools[stage]
+
+def collect_batch_files(uploads):
+    """
+    Flatten uploaded files (and the members of any .zip) into (filename, bytes) pairs.
+    Raises ResumeProcessingError when the batch exceeds BATCH_MAX_FILES / BATCH_MAX_BYTES.
+    """
+    items = []
+    total_bytes = 0
+    
+    def add(name, data):
+        nonlocal total_bytes
+        total_bytes += len(data)
+        if len(items) >= BATCH_MAX_FILES:
+            raise ResumeProcessingError(f'Too many files in batch (max {BATCH_MAX_FILES})', 413)
+        if total_bytes > BATCH_MAX_BYTES:
+            raise ResumeProcessingError(f'Batch too large (max {BATCH_MAX_BYTES} bytes)', 413)
+        items.append((name, data))
+    
+    for upload in uploads:
+        if not upload.filename:
+            continue
+        if os.path.splitext(upload.filename)[1].lower() != '.zip':
+            add(upload.filename, upload.read())
+            continue
+        try:
+            with zipfile.ZipFile(upload.stream) as archive:
+                for info in archive.infolist():
+                    if info.is_dir() or os.path.basename(info.filename).startswith('.'):
+                        continue
+                    # Check the declared size before inflating anything
+                    if total_bytes + info.file_size > BATCH_MAX_BYTES:
+                        raise ResumeProcessingError(f'Batch too large (max {BATCH_MAX_BYTES} bytes)', 413)
+                    add(info.filename, archive.read(info))
+        except zipfile.BadZipFile:
+            raise ResumeProcessingError(f'Invalid zip archive: {upload.filename}', 400)
+    return items
+
+def batch_extract(filename, data):
+    """CPU stage for one batch file: cache lookup, text extraction and skill matching."""
+    file_ext = os.path.splitext(filename)[1].lower()
+    if file_ext not in SUPPORTED_EXTENSIONS:
+        raise ResumeProcessingError(f'Unsupported file format: {file_ext}. Please upload PDF, DOCX, or TXT.', 400)
+    content_key = AnalysisCache.key_for(data, file_ext)
+    cache_key = index_cache_key(content_key)
+    cached = ANALYSIS_CACHE.get(cache_key)
+    if cached is not None:
+        return cache_key, None, None, cached
+    text = extract_resume_text(io.BytesIO(data), file_ext)
+    skills = extract_skills(text)
+    record_candidate((content_key, filename), skills)
+    return cache_key, text, skills, None
+
+def batch_error(filename, e):
+    if isinstance(e, ResumeProcessingError):
+        return {'filename': filename, 'status': 'error', 'error': str(e), 'code': e.status_code}
+    logger.error(f"❌ Unexpected error processing {filename}: {e}", exc_info=True)
+    return {'filename': filename, 'status': 'error', 'error': f'Server error: {str(e)}', 'code': 500}
+
+@app.route('/api/upload/batch', methods=['POST'])
+def upload_batch():
+    """
+    Batch upload endpoint. Accepts several 'resumes' files (PDF, DOCX, TXT or a .zip of them)
+    and returns one result or error per file, in upload order.
+    Extraction runs on the CPU pool and question generation on the LLM pool, so
+    Gemini calls for early files overlap with extraction of later ones.
+    """
+    logger.info("📥 Received batch upload request")
+    uploads = request.files.getlist('resumes') + request.files.getlist('resume')
+    if not uploads:
+        return error_response('No files in request', 400)
+    
+    try:
+        items = collect_batch_files(uploads)
+    except ResumeProcessingError as e:
+        return error_response(str(e), e.status_code, e.retry_after)
+    if not items:
+        return error_response('No files selected', 400)
+    logger.info(f"📄 Processing batch of {len(items)} files")
+    
+    started = time.perf_counter()
+    results = [None] * len(items)
+    cpu_pool = get_batch_pool('cpu')
+    llm_pool = get_batch_pool('llm')
+    
+    cpu_futures = {cpu_pool.submit(batch_extract, name, data): i for i, (name, data) in enumerate(items)}
+    llm_futures = {}
+    for future in as_completed(cpu_futures):
+        i = cpu_futures[future]
+        filename = items[i][0]
+        try:
+            cache_key, text, skills, cached = future.result()
+        except Exception as e:
+            results[i] = batch_error(filename, e)
+            continue
+        if cached is not None:
+            results[i] = dict(cached, filename=filename, cached=True)
+            continue
+        llm_futures[llm_pool.submit(generate_payload, text, skills, cache_key)] = (i, cache_key)
+    
+    for future in as_completed(llm_futures):
+        i, cache_key = llm_futures[future]
+        filename = items[i][0]
+        try:
+            payload, used_llm = future.result()
+        except Exception as e:
+            results[i] = batch_error(filename, e)
+            continue
+        ANALYSIS_CACHE.put(cache_key, payload, used_llm=used_llm, ttl_seconds=analysis_cache_ttl(payload))
+        results[i] = dict(payload, filename=filename, cached=False)
+    
+    failed = sum(1 for r in results if r['status'] == 'error')
+    logger.info(f"✅ Batch done: {len(results) - failed} succeeded, {failed} failed "
+                f"in {time.perf_counter() - started:.2f}s")
+    return jsonify({
+        'status': 'success',
+        'count': len(results),
+        'succeeded': len(results) - failed,
+        'failed': failed,
+        'results': results
+    }), 200
+
+def rank_extract(filename, data):
+    """CPU stage for one /api/rank file: text and skills (no question generation)."""
+    file_ext = os.path.splitext(filename)[1].lower()
+    if file_ext not in SUPPORTED_EXTENSIONS:
+        raise ResumeProcessingError(f'Unsupported file format: {file_ext}. Please upload PDF, DOCX, or TXT.', 400)
+    text = extract_resume_text(io.BytesIO(data), file_ext)
+    return text, extract_skills(text)
+
+def collect_rank_candidates():
+    """
+    Candidates for /api/rank as (job_description, [{'id', 'text', 'skills'}], errors).
+    JSON: {"job_description": "...", "resumes": [{"id": ..., "text": "..."} or {"id": ..., "skills": [...]}]}
+    where skills can come from an earlier /api/upload response; multipart: a job_description
+    field plus 'resumes' files (PDF, DOCX, TXT or a .zip of them).
+    """
+    candidates = []
+    errors = []
+    if request.is_json:
+        body = request.get_json(silent=True) or {}
+        job_description = body.get('job_description') or ''
+        resumes = body.get('resumes') or []
+        if not isinstance(resumes, list):
+            raise ResumeProcessingError('resumes must be a list', 400)
+        if len(resumes) > RANK_MAX_CANDIDATES:
+            raise ResumeProcessingError(f'Too many resumes (max {RANK_MAX_CANDIDATES})', 413)
+        for i, item in enumerate(resumes):
+            if isinstance(item, str):
+                item = {'text': item}
+            if not isinstance(item, dict):
+                raise ResumeProcessingError(f'resumes[{i}] must be an object or a string', 400)
+            text = item.get('text') or ''
+            skills = item.get('skills')
+            if skills is None:
+                skills = extract_skills(text)
+            elif not isinstance(skills, list):
+                raise ResumeProcessingError(f'resumes[{i}].skills must be a list', 400)
+            candidates.append({'id': item.get('id', i), 'text': text, 'skills': sorted({str(s).lower() for s in skills})})
+        return job_description, candidates, errors
+    
+    job_description = request.form.get('job_description') or ''
+    items = collect_batch_files(request.files.getlist('resumes') + request.files.getlist('resume'))
+    futures = [get_batch_pool('cpu').submit(rank_extract, name, data) for name, data in items]
+    for (filename, _), future in zip(items, futures):
+        try:
+            text, skills = future.result()
+        except Exception as e:
+            errors.append(batch_error(filename, e))
+            continue
+        candidates.append({'id': filename, 'text': text, 'skills': skills})
+    return job_description, candidates, errors
+
+@app.route('/api/rank', methods=['POST'])
+def rank_resumes():
+    """
+    Rank resumes against a job description and return the top-k (?top_k=N).
+    The score mixes TF-IDF cosine similarity with the share of the job's skills a
+    candidate has (RANK_TEXT_WEIGHT), computed for all candidates at once (see _ranking.py).
+    """
+    try:
+        job_description, candidates, errors = collect_rank_candidates()
+    except ResumeProcessingError as e:
+        return error_response(str(e), e.status_code, e.retry_after)
+    if len(job_description.strip()) < 10:
+        return error_response('job_description is missing or too short', 400)
+    if not candidates and not errors:
+        return error_response('No resumes to rank', 400)
+    try:
+        top_k = max(1, int(request.args.get('top_k', RANK_TOP_K)))
+    except ValueError:
+        return error_response('top_k must be an integer', 400)
+    
+    job_skills = extract_skills(job_description)
+    with timed_stage('rank'):
+        ranked = rank_candidates(job_description, job_skills,
+                                 [c['text'] or " ".join(c['skills']) for c in candidates],
+                                 [c['skills'] for c in candidates],
+                                 top_k=top_k, text_weight=RANK_TEXT_WEIGHT)
+    
+    results = []
+    for index, score, text_score, matched in ranked:
+        results.append({
+            'id': candidates[index]['id'],
+            'score': round(score, 4),
+            'text_score': round(text_score, 4),
+            'skill_score': round(len(matched) / len(job_skills), 4) if job_skills else 0.0,
+            'matched_skills': matched,
+            'missing_skills': [skill for skill in job_skills if skill not in matched]
+        })
+    logger.info(f"✅ Ranked {len(candidates)} resumes against {len(job_skills)} job skills")
+    return jsonify({
+        'status': 'success',
+        'job_skills': job_skills,
+        'count': len(candidates),
+        'results': results,
+        'errors': errors
+    }), 200
+
+@app.route('/api/candidates/search', methods=['GET'])
+def search_candidates():
+    """
+    Boolean skill search over every analysed resume, e.g.
+    ?q=kubernetes AND (aws OR gcp) AND NOT php&limit=50&offset=0 (newest matches first).
+    Skill names and aliases are normalised the same way extract_skills reports them.
+    Requires X-Admin-Token; 404 unless CANDIDATE_DB is set.
+    """
+    if CANDIDATE_STORE is None:
+        return error_response('Candidate search is not enabled', 404)
+    if not admin_authorized():
+        return error_response('Forbidden', 403)
+    query = request.args.get('q', '')
+    try:
+        limit = min(max(int(request.args.get('limit', CANDIDATE_SEARCH_LIMIT)), 0), 1000)
+        offset = max(int(request.args.get('offset', 0)), 0)
+        tree = normalize_query(parse_query(query), current_skill_index().aliases)
+    except ValueError as e:
+        return error_response(f'Invalid query: {e}', 400)
+    
+    started = time.perf_counter()
+    with timed_stage('search'):
+        total, candidates, unknown = CANDIDATE_STORE.search(tree, limit=limit, offset=offset)
+    return jsonify({
+        'status': 'success',
+        'query': query,
+        'total': total,
+        'candidates': candidates,
+        'unknown_skills': unknown,
+        'took_ms': round((time.perf_counter() - started) * 1000, 3)
+    }), 200
+
+def normalize_query(tree, aliases):
+    """Map aliases in a parsed query to the skill names stored in the index (k8s -> kubernetes)."""
+    if tree[0] == 'skill':
+        return ('skill', aliases.get(tree[1], tree[1]))
+    return (tree[0],) + tuple(normalize_query(child, aliases) for child in tree[1:])
+
+def run_analysis_job(filename, file_ext, data):
+    """Job handler for /api/jobs: same pipeline and cache as /api/upload."""
+    content_key = AnalysisCache.key_for(data, file_ext)
+    cache_key = index_cache_key(content_key)
+    cached = ANALYSIS_CACHE.get(cache_key)
+    if cached is not None:
+        logger.info(f"⚡ Cache hit for job file {filename}")
+        return cached
+    started = time.perf_counter()
+    payload, used_llm = analyze_resume(io.BytesIO(data), file_ext, cache_key, candidate=(content_key, filename))
+    ANALYSIS_CACHE.put(cache_key, payload,
+                       compute_seconds=time.perf_counter() - started,
+                       used_llm=used_llm, ttl_seconds=analysis_cache_ttl(payload))
+    return payload
+
+JOB_QUEUE = JobQueue(run_analysis_job, workers=JOBS_WORKERS,
+                     max_queued=JOBS_QUEUE_SIZE, result_ttl=JOBS_RESULT_TTL)
+
+@app.route('/api/jobs', methods=['POST'])
+def submit_job():
+    """
+    Submit a resume for background analysis. Returns 202 with a job id to poll
+    at GET /api/jobs/<id>, or 429 with Retry-After when the queue is full.
+    """
+    logger.info("📥 Received job submission")
+    try:
+        file, file_ext = get_uploaded_resume()
+    except ResumeProcessingError as e:
+        return error_response(str(e), e.status_code, e.retry_after)
+    
+    try:
+        job_id = JOB_QUEUE.submit(filename=file.filename, file_ext=file_ext, data=file.read())
+    except QueueFull as e:
+        logger.warning(f"⚠️ Job queue full, asking client to retry in {e.retry_after}s")
+        return error_response('Job queue is full, please retry later', 429, e.retry_after)
+    
+    logger.info(f"✅ Queued job {job_id}")
+    response = jsonify({'status': 'queued', 'job_id': job_id, 'poll_url': f'/api/jobs/{job_id}'})
+    response.headers['Location'] = f'/api/jobs/{job_id}'
+    return response, 202
+
+@app.route('/api/jobs/<job_id>', methods=['GET'])
+def get_job(job_id):
+    """Poll a job: status is queued, running, done (with result) or failed (with error)."""
+    job = JOB_QUEUE.get(job_id)
+    if job is None:
+        return error_response('Job not found or expired', 404)
+    
+    body = {
+        'job_id': job_id,
+        'status': job['status'],
+        'submitted_at': job['submitted_at'],
+        'started_at': job['started_at'],
+        'finished_at': job['finished_at'],
+    }
+    if job['status'] == 'done':
+        body['result'] = job['result']
+    elif job['status'] == 'failed':
+        error = job['error']
+        if isinstance(error, ResumeProcessingError):
+            body['error'] = {'message': str(error), 'code': error.status_code}
+        else:
+            body['error'] = {'message': f'Server error: {str(error)}', 'code': 500}
+    else:
+        response = jsonify(body)
+        response.headers['Retry-After'] = '1'
+        return response, 200
+    return jsonify(body), 200
+
+@app.route('/api/jobs', methods=['GET'])
+def job_stats():
+    """Queue depth, capacity and job counts by status."""
+    return jsonify(JOB_QUEUE.stats()), 200
+
+def extract_text(source, file_ext):
+    """
+    Extract text from a resume. source can be a path or a seekable binary
+    file-like object (e.g. the upload stream or a BytesIO) - nothing is copied to disk.
+    """
+    if file_ext == '.pdf':
+        return extract_text_from_pdf(source)
+    if file_ext == '.docx':
+        return extract_text_from_docx(source)
+    if file_ext == '.txt':
+        return extract_text_from_txt(source)
+    raise ValueError(f"Unsupported file format: {file_ext}")
+
+def extract_text_from_pdf(source, max_pages=None, time_budget=None, workers=None):
+    text, page_timings = extract_pdf_text(
+        source,
+        max_pages=PDF_MAX_PAGES if max_pages is None else max_pages,
+        time_budget=PDF_TIME_BUDGET if time_budget is None else time_budget,
+        workers=PDF_EXTRACT_WORKERS if workers is None else workers,
+        fast=PDF_FAST_EXTRACT
+    )
+    if logger.isEnabledFor(logging.DEBUG):
+        for page_no, seconds, tier in page_timings:
+            logger.debug(f"PDF page {page_no + 1}: {seconds * 1000:.1f} ms ({tier})")
+    logger.info(f"PDF extracted {len(page_timings)} pages in {sum(s for _, s, _ in page_timings) * 1000:.1f} ms")
     return text
 
+def extract_text_from_docx(source):
+    return "".join(iter_text_from_docx(source))
+
+def extract_text_from_txt(source):
+    return "".join(iter_text_from_txt(source))
+
+def iter_text(source, file_ext):
+    """
+    Resume text in chunks for the streaming pipeline (scan_resume): PDF pages,
+    DOCX lines, TEXT_CHUNK_CHARS of TXT. With a PDF process pool the
+    whole file is needed anyway, so that path yields the text in one chunk.
+    """
+    if file_ext == '.pdf':
+        if PDF_EXTRACT_WORKERS > 1:
+            return iter((extract_text_from_pdf(source),))
+        return iter_pdf_text(source, max_pages=PDF_MAX_PAGES, time_budget=PDF_TIME_BUDGET, fast=PDF_FAST_EXTRACT)
+    if file_ext == '.docx':
+        return iter_text_from_docx(source)
+    if file_ext == '.txt':
+        return iter_text_from_txt(source)
+    raise ValueError(f"Unsupported file format: {file_ext}")
+
+def iter_text_from_docx(source):
+    return iter_docx_text(source, fast=DOCX_FAST_EXTRACT)
+
+def iter_text_from_txt(source, chunk_chars=None):
+    chunk_chars = chunk_chars or TEXT_CHUNK_CHARS
+    if isinstance(source, (str, os.PathLike)):
+        with open(source, 'r', encoding='utf-8') as f:
+            yield from iter(lambda: f.read(chunk_chars), '')
+        return
+    # Same decoding/newline handling as open(..., 'r'), without closing the caller's stream
+    wrapper = io.TextIOWrapper(source, encoding='utf-8')
+    try:
+        yield from iter(lambda: wrapper.read(chunk_chars), '')
+    finally:
+        wrapper.detach()
+
 if __name__ == '__main__':
     app.run(debug=True, port=5000)
@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""
+Benchmark for the candidate store behind /api/candidates/search.
+Loads synthetic candidates (random skill sets drawn from questions.json) into
+a temporary SQLite store, then times boolean queries, a cold reopen, and
+reports how big the compressed postings are on disk.
+
+Usage: python benchmarks/bench_candidate_search.py [--count 100000]
+"""
+import os
+import sys
+import time
+import random
+import argparse
+import tempfile
+import logging
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'api'))
+
+logging.disable(logging.INFO)
+from _candidate_store import CandidateStore, parse_query
+from index import QUESTIONS_DB
+
+QUERIES = [
+    "python",
+    "kubernetes AND (aws OR gcp)",
+    "python AND sql AND NOT java",
+    "(react OR angular OR vue) AND node",
+    "machine learning OR data analysis OR statistics",
+]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark boolean candidate search")
+    parser.add_argument('--count', type=int, default=100_000)
+    parser.add_argument('--skills', type=int, default=8, help="Average skills per candidate")
+    args = parser.parse_args()
+
+    rnd = random.Random(3)
+    skills = [skill for skill in QUESTIONS_DB if skill not in ('generic', 'communication')]
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, 'candidates.db')
+        store = CandidateStore(db_path)
+        started = time.perf_counter()
+        batch = []
+        for i in range(args.count):
+            batch.append((f"key{i}", f"resume_{i}.pdf", rnd.sample(skills, rnd.randint(1, 2 * args.skills - 1))))
+            if len(batch) == 5_000:
+                store.add_many(batch)
+                batch = []
+        if batch:
+            store.add_many(batch)
+        print(f"Loaded {args.count} candidates in {time.perf_counter() - started:.1f}s "
+              f"({os.path.getsize(db_path) / 1e6:.1f} MB on disk)")
+
+        started = time.perf_counter()
+        store = CandidateStore(db_path)
+        print(f"Reopened store in {(time.perf_counter() - started) * 1000:.1f} ms: {store.stats()}")
+
+        print(f"{'query':<50} {'matches':>8} {'ms':>8}")
+        for query in QUERIES:
+            tree = parse_query(query)
+            store.search(tree)
+            runs = 20
+            started = time.perf_counter()
+            for _ in range(runs):
+                total, _, _ = store.search(tree, limit=50)
+            print(f"{query:<50} {total:>8} {(time.perf_counter() - started) / runs * 1000:>8.3f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+DOCX extraction benchmark: python-docx's paragraphs (the previous
+extract_text_from_docx) vs the fast path that stream-parses the package's XML
+parts (api/_docx_extract.py).
+
+The corpus mixes plain paragraph-only documents with 'docx-rich' ones that
+keep the contact block in the page header and the skills in a table. For
+each mode the report shows documents per second, the peak Python
+allocations while a large document's lines are read and dropped (as the
+streaming upload path does; lxml's tree lives outside them, so the
+python-docx figure is a lower bound), and the share of each resume's
+skills (from its source text) found in the extracted text.
+
+Usage: python benchmarks/bench_docx_extract.py [--count 60] [--words 1200] [--rich-share 0.5]
+"""
+import io
+import os
+import sys
+import time
+import argparse
+import logging
+import tracemalloc
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'api'))
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+logging.disable(logging.WARNING)
+from benchmarks.corpus import generate_corpus
+from _docx_extract import iter_docx_fast, iter_docx_python_docx
+from index import extract_skills
+
+MODES = (('python-docx', iter_docx_python_docx), ('fast', iter_docx_fast))
+
+
+def extract(iter_lines, data):
+    return "".join(iter_lines(io.BytesIO(data)))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark DOCX extraction")
+    parser.add_argument('--count', type=int, default=60)
+    parser.add_argument('--words', type=int, default=1200, help="Approximate words per resume")
+    parser.add_argument('--rich-share', type=float, default=0.5, help="Fraction of header/table documents")
+    parser.add_argument('--large-words', type=int, default=100000, help="Words in the memory test document")
+    args = parser.parse_args()
+
+    rich_count = int(args.count * args.rich_share)
+    corpus = generate_corpus(args.count - rich_count, args.words, formats=('docx',), seed=1)
+    corpus += generate_corpus(rich_count, args.words, formats=('docx-rich',), seed=2)
+    expected = [set(extract_skills(text)) for _, _, text in corpus]
+    _, large, _ = generate_corpus(1, args.large_words, formats=('docx-rich',), seed=3)[0]
+    print(f"{len(corpus)} DOCX ({rich_count} with header/table), ~{args.words} words each; "
+          f"memory test on a {len(large) / 1e6:.1f} MB / {args.large_words}-word document")
+
+    print(f"{'mode':>12} {'seconds':>8} {'docs/s':>8} {'peak MB':>8} {'skills found':>13}")
+    seconds = {}
+    for mode, iter_lines in MODES:
+        started = time.perf_counter()
+        texts = [extract(iter_lines, data) for _, data, _ in corpus]
+        seconds[mode] = time.perf_counter() - started
+
+        tracemalloc.start()
+        for _ in iter_lines(io.BytesIO(large)):
+            pass
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+
+        found = sum(len(set(extract_skills(text)) & skills) / max(len(skills), 1)
+                    for text, skills in zip(texts, expected)) / len(corpus)
+        print(f"{mode:>12} {seconds[mode]:>8.2f} {len(corpus) / seconds[mode]:>8.1f} {peak / 1e6:>8.2f} "
+              f"{found * 100:>12.1f}%")
+    print(f"speedup {seconds['python-docx'] / seconds['fast']:.1f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+Memory benchmark for the upload text pipeline: the full-text path
+(extract_resume_text -> extract_skills -> prompt compaction) against the
+streaming path (scan_resume), on TXT, DOCX and PDF resumes of growing length.
+
+Every measurement runs in a fresh process that opens the file from disk (as
+Werkzeug hands over a spooled upload) and reports the pipeline's peak
+Python allocations (tracemalloc) and how far peak RSS rose above the RSS
+before the run (on Linux the peak is reset through /proc/self/clear_refs).
+The page cap and time budget are lifted so the whole document is processed.
+
+Usage: python benchmarks/bench_memory.py [--words 2000,20000,200000] [--formats txt,docx,pdf]
+"""
+import os
+import sys
+import json
+import random
+import argparse
+import resource
+import tempfile
+import subprocess
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.append(os.path.join(ROOT, 'api'))
+sys.path.append(ROOT)
+
+
+def run_pipeline(mode, path):
+    import index
+    file_ext = os.path.splitext(path)[1]
+    with open(path, 'rb') as source:
+        if mode == 'full':
+            text = index.extract_resume_text(source, file_ext)
+            skills = index.extract_skills(text)
+            index.compact_resume_text(text, skills)
+        else:
+            index.scan_resume(source, file_ext)
+
+
+def measure(mode, path, traced):
+    """Child process: run one pipeline and print its memory figures as JSON."""
+    import logging
+    logging.disable(logging.ERROR)
+    import index  # noqa: F401  (imports and matcher load are not part of the measurement)
+    if traced:
+        import tracemalloc
+        tracemalloc.start()
+        run_pipeline(mode, path)
+        print(json.dumps({'traced_peak': tracemalloc.get_traced_memory()[1]}))
+        return
+    before = current_rss()
+    reset_peak_rss()
+    run_pipeline(mode, path)
+    print(json.dumps({'rss_growth': max(peak_rss() - before, 0)}))
+
+
+def current_rss():
+    with open('/proc/self/statm') as f:
+        return int(f.read().split()[1]) * resource.getpagesize()
+
+
+def reset_peak_rss():
+    # Linux: writing 5 to clear_refs resets VmHWM (peak RSS) to the current RSS
+    try:
+        with open('/proc/self/clear_refs', 'w') as f:
+            f.write('5')
+    except OSError:
+        pass
+
+
+def peak_rss():
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith('VmHWM:'):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+def child(mode, path, traced):
+    env = dict(os.environ, PDF_MAX_PAGES="100000", PDF_TIME_BUDGET="100000", PDF_EXTRACT_WORKERS="0")
+    args = [sys.executable, os.path.abspath(__file__), '--child', mode, path] + (['--traced'] if traced else [])
+    output = subprocess.run(args, env=env, capture_output=True, text=True, check=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Peak memory of the full-text vs streaming text pipeline")
+    parser.add_argument('--words', default='2000,20000,200000', help="Comma-separated document lengths")
+    parser.add_argument('--formats', default='txt,docx,pdf')
+    parser.add_argument('--child', nargs=2, metavar=('MODE', 'PATH'), help=argparse.SUPPRESS)
+    parser.add_argument('--traced', action='store_true', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        return measure(args.child[0], args.child[1], args.traced)
+
+    from benchmarks.corpus import RENDERERS, make_resume_text, skill_terms
+    rnd = random.Random(2)
+    terms = skill_terms()
+    print(f"{'format':<7} {'words':>8} {'file MB':>8} {'text MB':>8} | {'full: heap MB':>13} {'RSS MB':>7} "
+          f"| {'stream: heap MB':>15} {'RSS MB':>7}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for fmt in args.formats.split(','):
+            for words in (int(w) for w in args.words.split(',')):
+                text = make_resume_text(rnd, words=words, terms=terms)
+                path = os.path.join(tmp, f"resume_{words}.{fmt}")
+                with open(path, 'wb') as f:
+                    f.write(RENDERERS[fmt](text))
+                row = {}
+                for mode in ('full', 'stream'):
+                    row[mode] = (child(mode, path, True)['traced_peak'] / 1e6,
+                                 child(mode, path, False)['rss_growth'] / 1e6)
+                print(f"{fmt:<7} {words:>8} {os.path.getsize(path) / 1e6:>8.2f} {len(text) / 1e6:>8.2f} | "
+                      f"{row['full'][0]:>13.2f} {row['full'][1]:>7.1f} | {row['stream'][0]:>15.2f} {row['stream'][1]:>7.1f}")
+
+
+if __name__ == '__main__':
+    main()
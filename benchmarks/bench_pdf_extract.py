@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+PDF extraction benchmark: pdfplumber on every page vs the tiered engine
+(fast content-stream pass, pdfplumber only for pages it can't read).
+The corpus mixes simple-font PDFs with composite-font ('pdf-cid') ones, which
+always fall through to pdfplumber, and checks both modes find the same skills.
+
+Usage: python benchmarks/bench_pdf_extract.py [--count 40] [--words 1200] [--cid-share 0.25]
+"""
+import io
+import os
+import sys
+import time
+import argparse
+import logging
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'api'))
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+logging.disable(logging.WARNING)
+from benchmarks.corpus import generate_corpus
+from _pdf_extract import extract_pdf_text
+from index import extract_skills
+
+
+def run(corpus, fast):
+    texts = []
+    tiers = {}
+    pages = 0
+    started = time.perf_counter()
+    for _, data in corpus:
+        text, page_timings = extract_pdf_text(io.BytesIO(data), max_pages=0, time_budget=600, fast=fast)
+        texts.append(text)
+        pages += len(page_timings)
+        for _, _, tier in page_timings:
+            tiers[tier] = tiers.get(tier, 0) + 1
+    return time.perf_counter() - started, pages, tiers, texts
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark tiered PDF extraction")
+    parser.add_argument('--count', type=int, default=40)
+    parser.add_argument('--words', type=int, default=1200, help="Approximate words per resume")
+    parser.add_argument('--cid-share', type=float, default=0.25, help="Fraction of composite-font PDFs")
+    args = parser.parse_args()
+
+    cid_count = int(args.count * args.cid_share)
+    corpus = [(name, data) for name, data, _ in
+              generate_corpus(args.count - cid_count, args.words, formats=('pdf',), seed=1)]
+    corpus += [(name, data) for name, data, _ in
+               generate_corpus(cid_count, args.words, formats=('pdf-cid',), seed=2)]
+    print(f"{len(corpus)} PDFs ({cid_count} composite-font), ~{args.words} words each")
+
+    results = {}
+    print(f"{'mode':>10} {'seconds':>8} {'pages/s':>8} {'docs/s':>7}  tiers")
+    for mode, fast in (('pdfplumber', False), ('tiered', True)):
+        seconds, pages, tiers, texts = run(corpus, fast)
+        results[mode] = (seconds, texts)
+        print(f"{mode:>10} {seconds:>8.2f} {pages / seconds:>8.1f} {len(corpus) / seconds:>7.1f}  {tiers}")
+
+    baseline, tiered = results['pdfplumber'], results['tiered']
+    mismatches = sum(extract_skills(a) != extract_skills(b) for a, b in zip(baseline[1], tiered[1]))
+    print(f"speedup {baseline[0] / tiered[0]:.1f}x, skill mismatches: {mismatches}/{len(corpus)}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Benchmark for the prompt compaction stage (api/_prompt_compact.py) against the
+old blind cut of the first 3000 characters.
+
+Synthetic career resumes (contact block, summary, several dated roles with
+bullets, skills at the top or the bottom, education, interests, references)
+are compacted at a few token budgets. For every variant the report shows the
+average prompt size, the share of the resume's matched skills that survive
+into the prompt, how often the two most recent roles are kept, and the time
+per resume.
+
+Usage: python benchmarks/bench_prompt_compact.py [--count 200] [--roles 8]
+"""
+import os
+import sys
+import time
+import random
+import argparse
+import logging
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'api'))
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+logging.disable(logging.WARNING)
+from benchmarks.corpus import FILLER, FIRST_NAMES, LAST_NAMES, TITLES, skill_terms
+from _prompt_compact import ResumeCompactor
+from index import current_skill_index, extract_skills
+
+COMPANIES = ["Acme Corp", "Globex", "Initech", "Umbrella Health", "Stark Industries", "Wayne Analytics",
+             "Hooli", "Vandelay Imports", "Soylent Foods", "Tyrell Systems"]
+
+
+def make_career_resume(rnd, roles, terms):
+    """Resume text plus the role lines of its two most recent jobs."""
+    name = f"{rnd.choice(FIRST_NAMES)} {rnd.choice(LAST_NAMES)}"
+    header = [name, f"{name.lower().replace(' ', '.')}@example.com | +1 (555) 010-{rnd.randint(1000, 9999)}",
+              f"linkedin.com/in/{name.lower().replace(' ', '')} | 42 Main Street, Springfield", ""]
+    summary = ["SUMMARY", "Experienced professional " + " ".join(rnd.choice(FILLER) for _ in range(30)) + ".", ""]
+    skills = ["SKILLS", ", ".join(rnd.sample(terms, 12)), ""]
+
+    experience = ["EXPERIENCE"]
+    role_lines = []
+    year = 2026
+    for _ in range(roles):
+        start = year - rnd.randint(1, 4)
+        role = f"{rnd.choice(TITLES)}, {rnd.choice(COMPANIES)} ({start} - {'Present' if year == 2026 else year})"
+        role_lines.append(role)
+        experience.append(role)
+        for _ in range(rnd.randint(3, 6)):
+            words = [rnd.choice(terms) if rnd.random() < 0.12 else rnd.choice(FILLER) for _ in range(rnd.randint(10, 20))]
+            if rnd.random() < 0.3:
+                words.append(f"by {rnd.randint(5, 60)}%")
+            experience.append("- " + " ".join(words).capitalize() + ".")
+        experience.append("")
+        year = start
+
+    tail = ["EDUCATION", f"B.Sc. Computer Science, State University, {year - 4}", "",
+            "INTERESTS", "Hiking, chess, photography, cooking", "",
+            "REFERENCES", "References available upon request"]
+    body = header + summary + (skills + experience if rnd.random() < 0.5 else experience + skills) + tail
+    return "\n".join(body) + "\n", role_lines[:2]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark prompt compaction vs truncation")
+    parser.add_argument('--count', type=int, default=200)
+    parser.add_argument('--roles', type=int, default=8, help="Jobs per resume")
+    args = parser.parse_args()
+
+    rnd = random.Random(11)
+    terms = skill_terms()
+    resumes = [make_career_resume(rnd, args.roles, terms) for _ in range(args.count)]
+    matched = [set(extract_skills(text)) for text, _ in resumes]
+    print(f"{args.count} resumes, {args.roles} roles each, "
+          f"average {sum(len(text) for text, _ in resumes) / args.count / 4:.0f} tokens")
+
+    match = current_skill_index().matcher.match
+    variants = [('first 3000 chars', None)] + [(f"compact {budget} tok", ResumeCompactor(budget))
+                                               for budget in (300, 600, 1000)]
+    print(f"{'variant':<18} {'tokens':>7} {'skills kept':>12} {'recent roles':>13} {'ms/resume':>10}")
+    for label, compactor in variants:
+        tokens = coverage = roles_kept = 0
+        started = time.perf_counter()
+        prompts = []
+        for (text, recent_roles), skills in zip(resumes, matched):
+            prompt = text[:3000] if compactor is None else compactor.compact(text, skills, match)[0]
+            prompts.append(prompt)
+        elapsed = time.perf_counter() - started
+        for prompt, (text, recent_roles), skills in zip(prompts, resumes, matched):
+            tokens += len(prompt) / 4
+            coverage += len(set(extract_skills(prompt)) & skills) / max(len(skills), 1)
+            roles_kept += sum(role in prompt for role in recent_roles) / len(recent_roles)
+        print(f"{label:<18} {tokens / args.count:>7.0f} {coverage / args.count * 100:>11.1f}% "
+              f"{roles_kept / args.count * 100:>12.1f}% {elapsed / args.count * 1000:>10.3f}")
+
+
+if __name__ == '__main__':
+    main()
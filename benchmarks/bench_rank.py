@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+"""
+Benchmark for /api/rank scoring (rank_candidates) on synthetic resumes.
+Times the vectorized TF-IDF + skill-overlap ranking for growing candidate
+counts, with skills precomputed as they would be for cached analyses.
+
+Usage: python benchmarks/bench_rank.py [--words 500]
+"""
+import os
+import sys
+import time
+import random
+import argparse
+import logging
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'api'))
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+logging.disable(logging.WARNING)
+from benchmarks.corpus import make_resume_text, skill_terms
+from _ranking import rank_candidates
+from index import extract_skills
+
+JOB_DESCRIPTION = ("Backend engineer to build and operate Python services on AWS. Experience with Django, "
+                   "Docker, Kubernetes and SQL databases; machine learning is a plus.")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark resume ranking")
+    parser.add_argument('--words', type=int, default=500, help="Approximate words per resume")
+    args = parser.parse_args()
+
+    rnd = random.Random(7)
+    terms = skill_terms()
+    texts = [make_resume_text(rnd, words=args.words, terms=terms) for _ in range(10_000)]
+    skills = [extract_skills(text) for text in texts]
+    job_skills = extract_skills(JOB_DESCRIPTION)
+
+    rank_candidates(JOB_DESCRIPTION, job_skills, texts[:10], skills[:10])  # NumPy/SciPy import
+    print(f"{'resumes':>8} {'text+skills ms':>15} {'skills only ms':>15}")
+    for count in (1_000, 3_000, 10_000):
+        started = time.perf_counter()
+        rank_candidates(JOB_DESCRIPTION, job_skills, texts[:count], skills[:count])
+        full = (time.perf_counter() - started) * 1000
+        started = time.perf_counter()
+        rank_candidates(JOB_DESCRIPTION, job_skills, [" ".join(s) for s in skills[:count]], skills[:count])
+        skills_only = (time.perf_counter() - started) * 1000
+        print(f"{count:>8} {full:>15.1f} {skills_only:>15.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+"""
+Load comparison of the two serving modes for POST /api/upload with a fake
+Gemini model of fixed latency (GEMINI_FAKE_LATENCY):
+
+- wsgi: the Flask app behind a fixed pool of worker threads (like gunicorn
+  --threads N); each request holds its worker for the whole Gemini call.
+- asgi: api/_asgi.py under uvicorn; Gemini calls are awaited.
+
+Each mode runs in its own server process. `--concurrency` clients upload
+distinct .txt resumes (cache bypassed, no question-set reuse) back to back;
+the report shows throughput, latency percentiles and how many responses got
+AI questions rather than the static fallback. Needs uvicorn for asgi.
+
+Usage: python benchmarks/bench_serving.py [--concurrency 200] [--requests 1000] [--latency 1.0]
+"""
+import os
+import sys
+import time
+import random
+import asyncio
+import argparse
+import logging
+import subprocess
+import statistics
+from concurrent.futures import ThreadPoolExecutor
+from wsgiref.simple_server import WSGIRequestHandler, WSGIServer
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.append(os.path.join(ROOT, 'api'))
+sys.path.append(ROOT)
+
+logging.disable(logging.WARNING)
+
+# Marker of FakeGeminiModel's questions, absent from the static question bank
+FAKE_AI_QUESTION = b"Walk me through a project listed on your resume."
+
+
+class PooledWSGIServer(WSGIServer):
+    """wsgiref server handing connections to a fixed pool of worker threads."""
+    request_queue_size = 2048
+
+    def __init__(self, address, workers):
+        super().__init__(address, QuietHandler)
+        self._pool = ThreadPoolExecutor(max_workers=workers)
+
+    def process_request(self, request, client_address):
+        self._pool.submit(self._handle, request, client_address)
+
+    def _handle(self, request, client_address):
+        try:
+            self.finish_request(request, client_address)
+        except Exception:
+            self.handle_error(request, client_address)
+        finally:
+            self.shutdown_request(request)
+
+
+class QuietHandler(WSGIRequestHandler):
+    def log_message(self, *args):
+        pass
+
+
+def serve(mode, port, workers):
+    if mode == 'wsgi':
+        from index import app
+        server = PooledWSGIServer(('127.0.0.1', port), workers)
+        server.set_app(app)
+        server.serve_forever()
+    else:
+        import uvicorn
+        from _asgi import app
+        uvicorn.run(app, host='127.0.0.1', port=port, log_level='error', backlog=2048)
+
+
+def multipart_body(filename, data, boundary):
+    return (f"--{boundary}\r\nContent-Disposition: form-data; name=\"resume\"; filename=\"{filename}\"\r\n"
+            f"Content-Type: text/plain\r\n\r\n").encode() + data + f"\r\n--{boundary}--\r\n".encode()
+
+
+async def post(port, body, boundary):
+    reader, writer = await asyncio.open_connection('127.0.0.1', port)
+    writer.write((f"POST /api/upload?nocache=1 HTTP/1.1\r\nHost: 127.0.0.1:{port}\r\n"
+                  f"Content-Type: multipart/form-data; boundary={boundary}\r\n"
+                  f"Content-Length: {len(body)}\r\nConnection: close\r\n\r\n").encode() + body)
+    await writer.drain()
+    response = await reader.read()
+    writer.close()
+    status = int(response.split(b" ", 2)[1]) if response.startswith(b"HTTP/") else 0
+    return status, FAKE_AI_QUESTION in response
+
+
+async def run_load(port, bodies, concurrency, boundary):
+    pending = iter(bodies)
+    results = []
+
+    async def client():
+        for body in pending:
+            started = time.perf_counter()
+            try:
+                status, used_llm = await post(port, body, boundary)
+            except OSError:
+                status, used_llm = 0, False
+            results.append((time.perf_counter() - started, status, used_llm))
+
+    started = time.perf_counter()
+    await asyncio.gather(*(client() for _ in range(concurrency)))
+    return time.perf_counter() - started, results
+
+
+def wait_for_port(port, timeout=30):
+    import socket
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            socket.create_connection(('127.0.0.1', port), timeout=1).close()
+            return
+        except OSError:
+            time.sleep(0.2)
+    raise RuntimeError(f"server on port {port} did not start")
+
+
+def percentile(samples, q):
+    return samples[min(len(samples) - 1, int(q * len(samples)))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare WSGI and ASGI serving under concurrent uploads")
+    parser.add_argument('--concurrency', type=int, default=200)
+    parser.add_argument('--requests', type=int, default=1000)
+    parser.add_argument('--latency', type=float, default=1.0, help="Fake Gemini latency in seconds")
+    parser.add_argument('--wsgi-workers', type=int, default=16, help="Worker threads in wsgi mode")
+    parser.add_argument('--modes', default='wsgi,asgi')
+    parser.add_argument('--port', type=int, default=5099)
+    parser.add_argument('--serve', choices=('wsgi', 'asgi'), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.serve:
+        return serve(args.serve, args.port, args.wsgi_workers)
+
+    from benchmarks.corpus import make_resume_text, skill_terms
+    rnd = random.Random(5)
+    terms = skill_terms()
+    boundary = "benchboundary7MA4YWxkTrZu0gW"
+    bodies = [multipart_body(f"resume_{i}.txt", make_resume_text(rnd, words=400, terms=terms).encode(), boundary)
+              for i in range(args.requests)]
+
+    env = dict(os.environ, GEMINI_FAKE_LATENCY=str(args.latency), GEMINI_FAKE_FAILURE_RATE="0",
+               QSET_MAX_SERVES="0", LLM_TIMEOUT=str(max(8.0, args.latency * 4)),
+               LLM_SLOW_CALL=str(max(5.0, args.latency * 2)))
+    env.pop("GEMINI_API_KEY", None)
+    print(f"{args.requests} uploads, {args.concurrency} concurrent clients, fake Gemini latency {args.latency}s")
+    print(f"{'mode':<6} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'errors':>7} {'AI %':>6}")
+    for mode in args.modes.split(','):
+        server = subprocess.Popen([sys.executable, os.path.abspath(__file__), '--serve', mode,
+                                   '--port', str(args.port), '--wsgi-workers', str(args.wsgi_workers)], env=env)
+        try:
+            wait_for_port(args.port)
+            elapsed, results = asyncio.run(run_load(args.port, bodies, args.concurrency, boundary))
+        finally:
+            server.terminate()
+            server.wait()
+        latencies = sorted(seconds * 1000 for seconds, _, _ in results)
+        errors = sum(1 for _, status, _ in results if status != 200)
+        ai_share = sum(1 for _, _, used_llm in results if used_llm) / len(results) * 100
+        print(f"{mode:<6} {len(results) / elapsed:>8.1f} {statistics.median(latencies):>8.0f} "
+              f"{percentile(latencies, 0.95):>8.0f} {percentile(latencies, 0.99):>8.0f} {errors:>7} {ai_share:>6.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark for skill matching.
+Compares the original per-skill regex/substring loops against the compiled
+SkillMatcher used by extract_skills, across resume lengths and dictionary sizes.
+
+Usage: python benchmarks/bench_skill_matcher.py
+"""
+import os
+import re
+import sys
+import random
+import logging
+import timeit
+
+# Add api directory to path to import index
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'api'))
+
+logging.disable(logging.INFO)
+from index import QUESTIONS_DB, SKILL_ALIASES, SkillMatcher
+
+FILLER = ("responsible for delivering projects on time with cross functional teams "
+          "improved performance reduced costs and mentored colleagues ").split()
+
+
+def legacy_extract_skills(text, skills_db, aliases):
+    """Original extract_skills loops: one regex/substring scan per skill and alias."""
+    text_lower = text.lower()
+    found_skills = set()
+    for skill in skills_db.keys():
+        if skill != "generic" and skill != "communication":
+            pattern = r'\b' + re.escape(skill) + r'\b'
+            if re.search(pattern, text_lower):
+                found_skills.add(skill)
+            elif skill in text_lower:
+                found_skills.add(skill)
+    for alias, skill in aliases.items():
+        if len(alias) <= 3:
+            pattern = r'\b' + re.escape(alias) + r'\b'
+            if re.search(pattern, text_lower):
+                if skill in skills_db:
+                    found_skills.add(skill)
+        else:
+            if alias in text_lower:
+                if skill in skills_db:
+                    found_skills.add(skill)
+    return found_skills
+
+
+def make_resume(num_chars, terms, rnd):
+    words = []
+    size = 0
+    while size < num_chars:
+        word = rnd.choice(terms) if rnd.random() < 0.05 else rnd.choice(FILLER)
+        words.append(word)
+        size += len(word) + 1
+    return " ".join(words)
+
+
+def time_call(fn, repeat=5):
+    number = 20
+    return min(timeit.repeat(fn, number=number, repeat=repeat)) / number * 1000
+
+
+def main():
+    rnd = random.Random(42)
+    all_terms = list(QUESTIONS_DB) + list(SKILL_ALIASES)
+
+    print("Per-resume match time vs text length (full dictionary)")
+    print(f"{'chars':>8} {'legacy ms':>10} {'compiled ms':>12} {'speedup':>8}")
+    matcher = SkillMatcher(QUESTIONS_DB.keys(), SKILL_ALIASES, QUESTIONS_DB)
+    for num_chars in (1_000, 5_000, 20_000, 100_000):
+        text = make_resume(num_chars, all_terms, rnd)
+        assert legacy_extract_skills(text, QUESTIONS_DB, SKILL_ALIASES) == matcher.match(text.lower())
+        legacy = time_call(lambda: legacy_extract_skills(text, QUESTIONS_DB, SKILL_ALIASES))
+        compiled = time_call(lambda: matcher.match(text.lower()))
+        print(f"{num_chars:>8} {legacy:>10.3f} {compiled:>12.3f} {legacy / compiled:>7.1f}x")
+
+    print()
+    print("Per-resume match time vs dictionary size (5,000 chars)")
+    print(f"{'terms':>8} {'legacy ms':>10} {'compiled ms':>12} {'build ms':>9}")
+    alias_items = list(SKILL_ALIASES.items())
+    text = make_resume(5_000, all_terms, rnd)
+    for fraction in (0.25, 0.5, 1.0):
+        skills_db = dict(list(QUESTIONS_DB.items())[:int(len(QUESTIONS_DB) * fraction)])
+        aliases = dict(alias_items[:int(len(alias_items) * fraction)])
+        build = time_call(lambda: SkillMatcher(skills_db.keys(), aliases, skills_db), repeat=3)
+        sub_matcher = SkillMatcher(skills_db.keys(), aliases, skills_db)
+        legacy = time_call(lambda: legacy_extract_skills(text, skills_db, aliases))
+        compiled = time_call(lambda: sub_matcher.match(text.lower()))
+        print(f"{len(skills_db) + len(aliases):>8} {legacy:>10.3f} {compiled:>12.3f} {build:>9.2f}")
+
+
+if __name__ == '__main__':
+    main()
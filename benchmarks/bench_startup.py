@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+"""
+Cold-start benchmark for api/index.py.
+Each run imports the app in a fresh interpreter and measures import time and
+first-request latency for a TXT upload. "eager" reproduces the old startup
+(pdfplumber, docx and dotenv imported up front, skill matcher built at import)
+and "lazy" is the current startup with the prebuilt skill index.
+
+Usage: python benchmarks/bench_startup.py [runs]
+"""
+import os
+import sys
+import json
+import statistics
+import subprocess
+
+API_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'api')
+
+CHILD = r'''
+import io, json, logging, os, sys, time
+sys.path.insert(0, os.environ["API_DIR"])
+started = time.perf_counter()
+if os.environ.get("EAGER") == "1":
+    import pdfplumber, docx, dotenv
+logging.disable(logging.WARNING)
+import index
+imported = time.perf_counter()
+client = index.app.test_client()
+response = client.post('/api/upload', content_type='multipart/form-data',
+                       data={'resume': (io.BytesIO(b"Python developer with SQL and AWS experience."), 'resume.txt')})
+assert response.status_code == 200, response.data
+finished = time.perf_counter()
+print(json.dumps({"import_ms": (imported - started) * 1000,
+                  "first_request_ms": (finished - imported) * 1000,
+                  "total_ms": (finished - started) * 1000}))
+'''
+
+MODES = {
+    'eager': {'EAGER': '1', 'SKILL_INDEX_PATH': os.devnull},
+    'lazy': {},
+}
+
+
+def run(mode_env):
+    env = dict(os.environ, API_DIR=API_DIR, **mode_env)
+    env.pop('GEMINI_API_KEY', None)
+    out = subprocess.run([sys.executable, '-c', CHILD], env=env, capture_output=True, text=True, check=True)
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def main():
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    print(f"Cold start, median of {runs} runs (TXT upload, static questions)")
+    print(f"{'mode':>6} {'import ms':>10} {'first req ms':>13} {'total ms':>9}")
+    for mode, mode_env in MODES.items():
+        samples = [run(mode_env) for _ in range(runs)]
+        median = {key: statistics.median(s[key] for s in samples) for key in samples[0]}
+        print(f"{mode:>6} {median['import_ms']:>10.1f} {median['first_request_ms']:>13.1f} {median['total_ms']:>9.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,200 @@
+#!/usr/bin/env python3
+"""
+Synthetic resume corpus generator.
+
+Builds resumes with a configurable length and skill density from the terms in
+QUESTIONS_DB and SKILL_ALIASES, and renders them as TXT, DOCX or PDF. PDFs are
+written directly (Helvetica, ~50 lines per page) so no PDF library is needed.
+The 'pdf-cid' format writes the same text with a composite (Type0/Identity-H)
+font and a ToUnicode map, like many exported resumes, which the fast PDF
+tier can't decode. 'docx-rich' keeps the contact block in the page header
+and the skills in a table, which python-docx's paragraphs don't include.
+
+Usage: python -m benchmarks.corpus --out corpus/ --count 100 --words 600 --density 0.05
+"""
+import io
+import os
+import sys
+import random
+import argparse
+import logging
+
+# Add api directory to path to import index
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'api'))
+
+FORMATS = ('txt', 'docx', 'pdf')
+PDF_FORMATS = ('pdf', 'pdf-cid')
+
+FIRST_NAMES = ["Alex", "Sam", "Jordan", "Priya", "Wei", "Maria", "Omar", "Lena", "Kofi", "Yuki"]
+LAST_NAMES = ["Smith", "Patel", "Garcia", "Chen", "Okafor", "Novak", "Silva", "Kim", "Haddad", "Berg"]
+TITLES = ["Software Engineer", "Data Analyst", "Project Manager", "Registered Nurse", "Accountant",
+          "Marketing Specialist", "DevOps Engineer", "Sales Manager", "UX Designer", "Teacher"]
+FILLER = ("responsible for delivering projects on time with cross functional teams while improving "
+          "performance reducing costs mentoring colleagues and communicating results to stakeholders "
+          "designed implemented maintained documented reviewed planned coordinated").split()
+
+
+def skill_terms():
+    from index import QUESTIONS_DB, SKILL_ALIASES
+    return sorted(set(QUESTIONS_DB) - {"generic", "communication"} | set(SKILL_ALIASES))
+
+
+def make_resume_text(rnd, words=600, density=0.05, terms=None):
+    """Plain-text resume of roughly `words` words; `density` is the fraction of words that are skill terms."""
+    terms = terms or skill_terms()
+    name = f"{rnd.choice(FIRST_NAMES)} {rnd.choice(LAST_NAMES)}"
+    lines = [name, rnd.choice(TITLES), f"{name.lower().replace(' ', '.')}@example.com | +1 555 {rnd.randint(1000, 9999)}", ""]
+
+    lines.append("SKILLS")
+    lines.append(", ".join(rnd.sample(terms, min(len(terms), max(3, int(words * density / 4))))))
+    lines.append("")
+
+    lines.append("EXPERIENCE")
+    count = 0
+    while count < words:
+        sentence = []
+        for _ in range(rnd.randint(8, 16)):
+            sentence.append(rnd.choice(terms) if rnd.random() < density else rnd.choice(FILLER))
+        count += len(sentence)
+        lines.append("- " + " ".join(sentence).capitalize() + ".")
+    lines.append("")
+    lines.append("EDUCATION")
+    lines.append(f"B.Sc. {rnd.choice(['Computer Science', 'Business', 'Nursing', 'Engineering'])}, {rnd.randint(2000, 2022)}")
+    return "\n".join(lines) + "\n"
+
+
+def to_txt(text):
+    return text.encode('utf-8')
+
+
+def to_docx(text, rich=False):
+    """rich=True puts the contact block in the page header and the skills list in a table, as many templates do."""
+    import docx
+    document = docx.Document()
+    lines = text.splitlines()
+    if rich:
+        header = document.sections[0].header.paragraphs[0]
+        header.text = " | ".join(lines[:3])
+        lines = lines[3:]
+    for i, line in enumerate(lines):
+        if rich and i > 0 and lines[i - 1] == "SKILLS":
+            skills = line.split(", ")
+            table = document.add_table(rows=0, cols=2)
+            for row_start in range(0, len(skills), 4):
+                cells = table.add_row().cells
+                cells[0].text = "Skills" if row_start == 0 else ""
+                cells[1].text = ", ".join(skills[row_start:row_start + 4])
+            continue
+        document.add_paragraph(line)
+    buffer = io.BytesIO()
+    document.save(buffer)
+    return buffer.getvalue()
+
+
+def _wrap(line, width=95):
+    out = []
+    while len(line) > width:
+        cut = line.rfind(' ', 0, width)
+        cut = cut if cut > 0 else width
+        out.append(line[:cut])
+        line = line[cut:].lstrip()
+    out.append(line)
+    return out
+
+
+def _pdf_escape(line):
+    return line.replace('\\', '\\\\').replace('(', '\\(').replace(')', '\\)')
+
+
+def _pdf_hex(line):
+    return "<" + "".join(f"{ord(c) if ord(c) < 256 else 63:04X}" for c in line) + ">"
+
+
+CID_TO_UNICODE = (b"/CIDInit /ProcSet findresource begin 12 dict begin begincmap "
+                  b"/CIDSystemInfo << /Registry (Adobe) /Ordering (UCS) /Supplement 0 >> def "
+                  b"/CMapName /Adobe-Identity-UCS def /CMapType 2 def "
+                  b"1 begincodespacerange <0000> <FFFF> endcodespacerange "
+                  b"1 beginbfrange <0000> <00FF> <0000> endbfrange "
+                  b"endcmap CMapName currentdict /CMap defineresource pop end end")
+
+
+def to_pdf(text, lines_per_page=50, cid=False):
+    """Minimal single-font PDF with one text object per page; cid=True uses a Type0 font with 2-byte codes."""
+    lines = [wrapped for line in text.splitlines() for wrapped in _wrap(line)]
+    pages = [lines[i:i + lines_per_page] for i in range(0, len(lines), lines_per_page)] or [[]]
+    show = (lambda l: f"{_pdf_hex(l)} '") if cid else (lambda l: f"({_pdf_escape(l)}) '")
+
+    font_id = 3 + 2 * len(pages)
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        ("<< /Type /Pages /Kids [%s] /Count %d >>" % (
+            " ".join(f"{3 + 2 * i} 0 R" for i in range(len(pages))), len(pages))).encode(),
+    ]
+    for i, page_lines in enumerate(pages):
+        content = "BT /F1 10 Tf 50 760 Td 14 TL " + " ".join(show(l) for l in page_lines) + " ET"
+        content = content.encode('latin-1', 'replace')
+        objects.append((f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+                        f"/Resources << /Font << /F1 {font_id} 0 R >> >> /Contents {4 + 2 * i} 0 R >>").encode())
+        objects.append(b"<< /Length %d >>\nstream\n" % len(content) + content + b"\nendstream")
+    if cid:
+        objects.append(b"<< /Type /Font /Subtype /Type0 /BaseFont /Helvetica /Encoding /Identity-H "
+                       b"/DescendantFonts [%d 0 R] /ToUnicode %d 0 R >>" % (font_id + 1, font_id + 2))
+        objects.append(b"<< /Type /Font /Subtype /CIDFontType2 /BaseFont /Helvetica /DW 500 "
+                       b"/CIDSystemInfo << /Registry (Adobe) /Ordering (Identity) /Supplement 0 >> "
+                       b"/FontDescriptor << /Type /FontDescriptor /FontName /Helvetica /Flags 32 "
+                       b"/FontBBox [0 -200 1000 900] /ItalicAngle 0 /Ascent 900 /Descent -200 "
+                       b"/CapHeight 700 /StemV 80 >> >>")
+        objects.append(b"<< /Length %d >>\nstream\n" % len(CID_TO_UNICODE) + CID_TO_UNICODE + b"\nendstream")
+    else:
+        objects.append(b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica /Encoding /WinAnsiEncoding >>")
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += b"%d 0 obj\n" % number + body + b"\nendobj\n"
+    xref = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    for offset in offsets:
+        out += b"%010d 00000 n \n" % offset
+    out += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref)
+    return bytes(out)
+
+
+RENDERERS = {'txt': to_txt, 'docx': to_docx, 'docx-rich': lambda text: to_docx(text, rich=True),
+             'pdf': to_pdf, 'pdf-cid': lambda text: to_pdf(text, cid=True)}
+
+
+def generate_corpus(count=20, words=600, density=0.05, formats=FORMATS, seed=0):
+    """Return a list of (filename, file_bytes, text) tuples, cycling through formats."""
+    rnd = random.Random(seed)
+    terms = skill_terms()
+    corpus = []
+    for i in range(count):
+        fmt = formats[i % len(formats)]
+        text = make_resume_text(rnd, words=words, density=density, terms=terms)
+        corpus.append((f"resume_{i:05d}.{fmt.split('-')[0]}", RENDERERS[fmt](text), text))
+    return corpus
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a synthetic resume corpus")
+    parser.add_argument('--out', required=True, help="Output directory")
+    parser.add_argument('--count', type=int, default=20)
+    parser.add_argument('--words', type=int, default=600, help="Approximate words per resume")
+    parser.add_argument('--density', type=float, default=0.05, help="Fraction of words that are skill terms")
+    parser.add_argument('--formats', default=",".join(FORMATS), help="Comma-separated subset of txt,docx,docx-rich,pdf,pdf-cid")
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    logging.disable(logging.INFO)
+    os.makedirs(args.out, exist_ok=True)
+    corpus = generate_corpus(args.count, args.words, args.density, tuple(args.formats.split(',')), args.seed)
+    for filename, data, _ in corpus:
+        with open(os.path.join(args.out, filename), 'wb') as f:
+            f.write(data)
+    print(f"Wrote {len(corpus)} resumes to {args.out}")
+
+
+if __name__ == '__main__':
+    main()
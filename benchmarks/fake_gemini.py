@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+"""
+Local stand-in for the Gemini REST API (POST /v1beta/models/<model>:generateContent)
+for load tests. Point the app at it with GEMINI_API_BASE=http://127.0.0.1:<port>.
+
+Every call waits for a latency drawn from a distribution, then answers with
+one of these outcomes, picked by the configured rates:
+
+- ok: candidate text with question JSON like the model's, always including
+  FAKE_AI_QUESTION so clients can tell AI answers from the static fallback
+- error: HTTP 500 with a Gemini-style error body
+- rate_limited: HTTP 429
+- malformed: HTTP 200 whose candidate text is truncated, invalid JSON
+- stall: holds the connection for --stall seconds, past the app's deadline
+
+Latency specs: '0.8' or 'fixed:0.8', 'uniform:LO,HI', 'normal:MEAN,SD',
+'lognormal:MEDIAN,SIGMA', 'exponential:MEAN'.
+GET /stats returns the outcome counts and latency percentiles so far.
+Standard library only (asyncio), so thousands of slow calls cost no threads.
+
+Usage: python benchmarks/fake_gemini.py [--port 8085] [--latency lognormal:0.8,0.5]
+       [--error-rate 0.02] [--rate-limit-rate 0] [--malformed-rate 0.03] [--stall-rate 0]
+"""
+import json
+import math
+import random
+import asyncio
+import argparse
+from http import HTTPStatus
+
+FAKE_AI_QUESTION = "Walk me through a project listed on your resume."
+OUTCOMES = ('ok', 'error', 'rate_limited', 'malformed', 'stall')
+
+
+def parse_latency(spec):
+    """Return a function(rnd) -> seconds for a latency spec (see module docstring)."""
+    kind, _, params = spec.partition(':')
+    if not params:
+        kind, params = 'fixed', kind
+    values = [float(value) for value in params.split(',')]
+    samplers = {
+        'fixed': lambda rnd: values[0],
+        'uniform': lambda rnd: rnd.uniform(values[0], values[1]),
+        'normal': lambda rnd: max(0.0, rnd.gauss(values[0], values[1])),
+        'lognormal': lambda rnd: rnd.lognormvariate(math.log(values[0]), values[1]),
+        'exponential': lambda rnd: rnd.expovariate(1.0 / values[0]),
+    }
+    if kind not in samplers:
+        raise ValueError(f"Unknown latency distribution: {kind}")
+    return samplers[kind]
+
+
+class FakeGemini:
+    def __init__(self, latency='0.5', error_rate=0.0, rate_limit_rate=0.0, malformed_rate=0.0,
+                 stall_rate=0.0, stall_seconds=60.0, seed=None):
+        self.sample_latency = parse_latency(latency)
+        self.rates = [('error', error_rate), ('rate_limited', rate_limit_rate),
+                      ('malformed', malformed_rate), ('stall', stall_rate)]
+        self.stall_seconds = stall_seconds
+        self.random = random.Random(seed)
+        self.counts = dict.fromkeys(OUTCOMES, 0)
+        self.latencies = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    def pick_outcome(self):
+        roll = self.random.random()
+        for outcome, rate in self.rates:
+            if roll < rate:
+                return outcome
+            roll -= rate
+        return 'ok'
+
+    @staticmethod
+    def model_text(prompt):
+        # No "skills"/"experience" keys, so the app keeps its own matched skills (like FakeGeminiModel)
+        words = len(prompt.split())
+        return json.dumps({"questions": {
+            "technical": [{"level": "beginner", "question": FAKE_AI_QUESTION},
+                          {"level": "intermediate", "question": f"Which of the {words} words in your resume "
+                                                                f"describe your proudest technical result?"}],
+            "hr": ["Why are you interested in this role?"]}})
+
+    async def generate(self, body):
+        """(status, response body) for one generateContent call."""
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            latency = self.sample_latency(self.random)
+            outcome = self.pick_outcome()
+            await asyncio.sleep(self.stall_seconds if outcome == 'stall' else latency)
+        finally:
+            self.in_flight -= 1
+        self.counts[outcome] += 1
+        self.latencies.append(latency)
+
+        if outcome == 'error':
+            return 500, {"error": {"code": 500, "message": "Internal error", "status": "INTERNAL"}}
+        if outcome == 'rate_limited':
+            return 429, {"error": {"code": 429, "message": "Resource exhausted", "status": "RESOURCE_EXHAUSTED"}}
+        try:
+            prompt = json.loads(body)['contents'][0]['parts'][0]['text']
+        except (ValueError, KeyError, IndexError, TypeError):
+            return 400, {"error": {"code": 400, "message": "Invalid request", "status": "INVALID_ARGUMENT"}}
+        text = self.model_text(prompt)
+        if outcome == 'malformed':
+            text = "Sure! Here is the JSON:\n" + text[:len(text) // 2]
+        return 200, {"candidates": [{"content": {"role": "model", "parts": [{"text": text}]},
+                                     "finishReason": "STOP"}]}
+
+    def stats(self):
+        latencies = sorted(self.latencies)
+
+        def percentile(q):
+            return round(latencies[min(len(latencies) - 1, int(q * len(latencies)))], 4) if latencies else None
+
+        return {'calls': sum(self.counts.values()), 'outcomes': dict(self.counts),
+                'in_flight': self.in_flight, 'max_in_flight': self.max_in_flight,
+                'latency_p50': percentile(0.5), 'latency_p95': percentile(0.95), 'latency_p99': percentile(0.99)}
+
+    async def handle(self, reader, writer):
+        try:
+            request_line = await reader.readline()
+            if not request_line:
+                return
+            method, path, _ = request_line.decode('latin-1').split(' ', 2)
+            length = 0
+            while True:
+                line = await reader.readline()
+                if line in (b"\r\n", b"\n", b""):
+                    break
+                name, _, value = line.decode('latin-1').partition(':')
+                if name.strip().lower() == 'content-length':
+                    length = int(value.strip())
+            body = await reader.readexactly(length) if length else b""
+
+            if method == 'GET' and path == '/stats':
+                status, payload = 200, self.stats()
+            elif method == 'POST' and path.split('?')[0].endswith(':generateContent'):
+                status, payload = await self.generate(body)
+            else:
+                status, payload = 404, {"error": {"code": 404, "message": "Not found", "status": "NOT_FOUND"}}
+            data = json.dumps(payload).encode()
+            writer.write(f"HTTP/1.1 {status} {HTTPStatus(status).phrase}\r\nContent-Type: application/json\r\n"
+                         f"Content-Length: {len(data)}\r\nConnection: close\r\n\r\n".encode() + data)
+            await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+
+async def serve(fake, host, port):
+    server = await asyncio.start_server(fake.handle, host, port, backlog=4096)
+    async with server:
+        await server.serve_forever()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local stand-in for the Gemini generateContent API")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8085)
+    parser.add_argument('--latency', default='lognormal:0.8,0.5', help="Latency distribution spec")
+    parser.add_argument('--error-rate', type=float, default=0.0, help="Share of HTTP 500 responses")
+    parser.add_argument('--rate-limit-rate', type=float, default=0.0, help="Share of HTTP 429 responses")
+    parser.add_argument('--malformed-rate', type=float, default=0.0, help="Share of invalid-JSON answers")
+    parser.add_argument('--stall-rate', type=float, default=0.0, help="Share of calls held for --stall seconds")
+    parser.add_argument('--stall', type=float, default=60.0)
+    parser.add_argument('--seed', type=int, default=None)
+    args = parser.parse_args()
+
+    fake = FakeGemini(args.latency, args.error_rate, args.rate_limit_rate, args.malformed_rate,
+                      args.stall_rate, args.stall, args.seed)
+    print(f"Fake Gemini on http://{args.host}:{args.port} (latency {args.latency})", flush=True)
+    try:
+        asyncio.run(serve(fake, args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
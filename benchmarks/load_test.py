@@ -0,0 +1,254 @@
+#!/usr/bin/env python3
+"""
+Load test for POST /api/upload against a local stand-in for Gemini, on one
+machine with no network access.
+
+Starts benchmarks/fake_gemini.py (latency distribution, error, 429,
+malformed-JSON and stall rates) and the app (wsgi: Flask behind a fixed
+thread pool, or asgi: api/_asgi.py under uvicorn; see bench_serving.py)
+pointed at it through GEMINI_API_BASE. It then replays a resume corpus at
+a target rate for a fixed duration. Arrivals are open-loop (Poisson or evenly
+spaced), so a slow server builds a backlog the way real traffic would,
+instead of slowing the clients down.
+
+The report shows offered and achieved throughput, latency percentiles,
+response statuses, the fallback rate (200 responses with static rather than
+AI questions; failed calls can also be answered from a stored question set
+for the same skills, counted separately), the app's LLM outcome counters
+and circuit breaker state, and what the fake server served.
+
+The corpus is every .pdf/.docx/.txt file in --corpus, or a synthetic one
+(benchmarks/corpus.py). The analysis cache and question-set reuse are
+bypassed unless --cache is given, so every upload calls the LLM.
+
+Usage: python benchmarks/load_test.py [--rps 20] [--duration 30] [--mode asgi]
+       [--latency lognormal:0.8,0.5] [--error-rate 0.02] [--malformed-rate 0.03]
+       [--corpus DIR] [--json report.json]
+"""
+import os
+import sys
+import json
+import random
+import asyncio
+import argparse
+import subprocess
+import urllib.request
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.append(os.path.join(ROOT, 'api'))
+sys.path.append(ROOT)
+
+from benchmarks.bench_serving import percentile, wait_for_port
+from benchmarks.fake_gemini import FAKE_AI_QUESTION
+
+BOUNDARY = "loadtestboundary4kQ9zT2mW7xR"
+# LLM outcome counters that mean the call gave no usable answer
+LLM_FAILURES = ('unavailable', 'error', 'parse_error', 'invalid_response', 'shed')
+AI_MARKER = FAKE_AI_QUESTION.encode()
+
+
+def load_corpus(args):
+    """[(filename, bytes)] from --corpus, or a synthetic mix of TXT, DOCX and PDF resumes."""
+    if args.corpus:
+        files = sorted(name for name in os.listdir(args.corpus)
+                       if os.path.splitext(name)[1].lower() in ('.pdf', '.docx', '.txt'))
+        corpus = []
+        for name in files:
+            with open(os.path.join(args.corpus, name), 'rb') as f:
+                corpus.append((name, f.read()))
+        if not corpus:
+            raise SystemExit(f"No .pdf/.docx/.txt files in {args.corpus}")
+        return corpus
+    from benchmarks.corpus import generate_corpus
+    return [(name, data) for name, data, _ in generate_corpus(args.count, args.words, seed=args.seed)]
+
+
+def multipart_body(filename, data):
+    return (f"--{BOUNDARY}\r\nContent-Disposition: form-data; name=\"resume\"; filename=\"{filename}\"\r\n"
+            f"Content-Type: application/octet-stream\r\n\r\n").encode() + data + f"\r\n--{BOUNDARY}--\r\n".encode()
+
+
+async def upload(port, path, body):
+    """(status, got AI questions) for one upload; status 0 if the connection failed."""
+    try:
+        reader, writer = await asyncio.open_connection('127.0.0.1', port)
+        writer.write((f"POST {path} HTTP/1.1\r\nHost: 127.0.0.1:{port}\r\n"
+                      f"Content-Type: multipart/form-data; boundary={BOUNDARY}\r\n"
+                      f"Content-Length: {len(body)}\r\nConnection: close\r\n\r\n").encode() + body)
+        await writer.drain()
+        response = await reader.read()
+        writer.close()
+    except OSError:
+        return 0, False
+    status = int(response.split(b" ", 2)[1]) if response.startswith(b"HTTP/") else 0
+    return status, AI_MARKER in response
+
+
+async def replay(port, path, bodies, rps, duration, arrivals, max_outstanding, seed):
+    """Send uploads at `rps` for `duration` seconds. Returns (wall seconds, results, dropped)."""
+    loop = asyncio.get_running_loop()
+    rnd = random.Random(seed)
+    results = []
+    tasks = []
+    dropped = 0
+    outstanding = 0
+
+    async def one(body):
+        nonlocal outstanding
+        outstanding += 1
+        started = loop.time()
+        status, used_llm = await upload(port, path, body)
+        outstanding -= 1
+        results.append((loop.time() - started, status, used_llm))
+
+    started = loop.time()
+    next_at = started
+    sent = 0
+    while next_at - started < duration:
+        await asyncio.sleep(max(0.0, next_at - loop.time()))
+        if outstanding >= max_outstanding:
+            dropped += 1
+        else:
+            tasks.append(loop.create_task(one(bodies[sent % len(bodies)])))
+        sent += 1
+        next_at += rnd.expovariate(rps) if arrivals == 'poisson' else 1.0 / rps
+    await asyncio.gather(*tasks)
+    return loop.time() - started, results, dropped
+
+
+def get_json(url):
+    with urllib.request.urlopen(url, timeout=10) as response:
+        return json.loads(response.read())
+
+
+def llm_outcomes(port):
+    """resume_llm_outcomes_total counters from the app's /api/metrics."""
+    with urllib.request.urlopen(f"http://127.0.0.1:{port}/api/metrics", timeout=10) as response:
+        text = response.read().decode()
+    outcomes = {}
+    for line in text.splitlines():
+        if line.startswith('resume_llm_outcomes_total{'):
+            labels, _, value = line.rpartition(' ')
+            outcomes[labels.split('"')[1]] = int(float(value))
+    return outcomes
+
+
+def start_servers(args):
+    fake = subprocess.Popen(
+        [sys.executable, os.path.join(ROOT, 'benchmarks', 'fake_gemini.py'), '--port', str(args.gemini_port),
+         '--latency', args.latency, '--error-rate', str(args.error_rate),
+         '--rate-limit-rate', str(args.rate_limit_rate), '--malformed-rate', str(args.malformed_rate),
+         '--stall-rate', str(args.stall_rate), '--seed', str(args.seed)],
+        stdout=subprocess.DEVNULL)
+    env = dict(os.environ, GEMINI_API_BASE=f"http://127.0.0.1:{args.gemini_port}")
+    env.pop("GEMINI_FAKE_LATENCY", None)
+    env.pop("GEMINI_API_KEY", None)
+    if not args.cache:
+        env["QSET_MAX_SERVES"] = "0"
+    app = subprocess.Popen(
+        [sys.executable, os.path.join(ROOT, 'benchmarks', 'bench_serving.py'), '--serve', args.mode,
+         '--port', str(args.port), '--wsgi-workers', str(args.wsgi_workers)], env=env)
+    return fake, app
+
+
+def build_report(args, elapsed, results, dropped, outcomes, llm, fake):
+    ok = [(seconds, used_llm) for seconds, status, used_llm in results if status == 200]
+    latencies = sorted(seconds * 1000 for seconds, _, _ in results)
+    statuses = {}
+    for _, status, _ in results:
+        statuses[str(status)] = statuses.get(str(status), 0) + 1
+    return {
+        'mode': args.mode,
+        'offered_rps': args.rps,
+        'duration_s': args.duration,
+        'sent': len(results),
+        'dropped_by_client': dropped,
+        'throughput_rps': round(len(ok) / elapsed, 2) if elapsed else 0.0,
+        'latency_ms': {
+            'p50': round(percentile(latencies, 0.50)) if latencies else None,
+            'p95': round(percentile(latencies, 0.95)) if latencies else None,
+            'p99': round(percentile(latencies, 0.99)) if latencies else None,
+            'max': round(latencies[-1]) if latencies else None,
+        },
+        'statuses': statuses,
+        'fallback_rate': round(sum(1 for _, used_llm in ok if not used_llm) / len(ok), 4) if ok else None,
+        # Failed calls answered from a stored AI question set (QUESTION_SET_CACHE stale entry) instead
+        'stale_question_sets': max(0, sum(outcomes.get(key, 0) for key in LLM_FAILURES) - outcomes.get('fallback', 0)),
+        'llm_outcomes': outcomes,
+        'circuit': {key: llm.get(key) for key in ('state', 'calls', 'failures', 'timeouts', 'slow_calls',
+                                                  'short_circuited', 'circuit_opened')},
+        'fake_gemini': fake,
+    }
+
+
+def print_report(report):
+    latency = report['latency_ms']
+    print(f"mode {report['mode']}: offered {report['offered_rps']} req/s for {report['duration_s']}s, "
+          f"sent {report['sent']}, dropped by client {report['dropped_by_client']}")
+    print(f"throughput {report['throughput_rps']} req/s (200 responses)")
+    print(f"latency ms: p50 {latency['p50']}  p95 {latency['p95']}  p99 {latency['p99']}  max {latency['max']}")
+    print(f"statuses: {report['statuses']}")
+    if report['fallback_rate'] is not None:
+        print(f"fallback rate: {report['fallback_rate'] * 100:.1f}% of 200 responses got static questions; "
+              f"{report['stale_question_sets']} failed LLM calls were answered from stored question sets")
+    print(f"LLM outcomes: {report['llm_outcomes']}")
+    print(f"circuit breaker: {report['circuit']}")
+    print(f"fake Gemini: {report['fake_gemini']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test /api/upload against a local fake Gemini server")
+    parser.add_argument('--rps', type=float, default=20.0, help="Target request rate")
+    parser.add_argument('--duration', type=float, default=30.0, help="Seconds of load")
+    parser.add_argument('--arrivals', choices=('poisson', 'uniform'), default='poisson')
+    parser.add_argument('--max-outstanding', type=int, default=1000,
+                        help="Client-side cap on open requests; arrivals past it are dropped and counted")
+    parser.add_argument('--mode', choices=('wsgi', 'asgi'), default='asgi')
+    parser.add_argument('--wsgi-workers', type=int, default=16)
+    parser.add_argument('--corpus', help="Directory of .pdf/.docx/.txt resumes (default: synthetic)")
+    parser.add_argument('--count', type=int, default=60, help="Synthetic corpus size")
+    parser.add_argument('--words', type=int, default=600, help="Words per synthetic resume")
+    parser.add_argument('--cache', action='store_true', help="Let the analysis and question-set caches work")
+    parser.add_argument('--latency', default='lognormal:0.8,0.5', help="Fake Gemini latency distribution")
+    parser.add_argument('--error-rate', type=float, default=0.0)
+    parser.add_argument('--rate-limit-rate', type=float, default=0.0)
+    parser.add_argument('--malformed-rate', type=float, default=0.0)
+    parser.add_argument('--stall-rate', type=float, default=0.0)
+    parser.add_argument('--port', type=int, default=5098)
+    parser.add_argument('--gemini-port', type=int, default=8085)
+    parser.add_argument('--seed', type=int, default=7)
+    parser.add_argument('--json', help="Also write the report to this file")
+    args = parser.parse_args()
+
+    corpus = load_corpus(args)
+    bodies = [multipart_body(name, data) for name, data in corpus]
+    path = "/api/upload" if args.cache else "/api/upload?nocache=1"
+    fake, app = start_servers(args)
+    try:
+        wait_for_port(args.gemini_port)
+        wait_for_port(args.port)
+        # One warm-up upload so lazy imports aren't counted
+        asyncio.run(upload(args.port, path, bodies[0]))
+        before = llm_outcomes(args.port)
+        elapsed, results, dropped = asyncio.run(replay(args.port, path, bodies, args.rps, args.duration,
+                                                       args.arrivals, args.max_outstanding, args.seed))
+        after = llm_outcomes(args.port)
+        outcomes = {key: after[key] - before.get(key, 0) for key in after if after[key] - before.get(key, 0)}
+        llm = get_json(f"http://127.0.0.1:{args.port}/api/llm/stats")
+        fake_stats = get_json(f"http://127.0.0.1:{args.gemini_port}/stats")
+    finally:
+        for process in (app, fake):
+            process.terminate()
+            process.wait()
+
+    report = build_report(args, elapsed, results, dropped, outcomes, llm, fake_stats)
+    print(f"{len(corpus)} resumes, fake Gemini latency {args.latency}, error {args.error_rate}, "
+          f"429 {args.rate_limit_rate}, malformed {args.malformed_rate}, stall {args.stall_rate}")
+    print_report(report)
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
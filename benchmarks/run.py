@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""
+Benchmark suite runner.
+
+Generates a synthetic corpus (benchmarks/corpus.py) and times extract_skills,
+extract_text_from_pdf, extract_text_from_docx and the end-to-end /api/upload
+path through Flask's test client with Gemini replaced by the local fake.
+Results are written as JSON so runs from different commits can be compared.
+
+Usage:
+    python -m benchmarks.run --count 30 --output bench.json
+    python -m benchmarks.run --compare bench.json --threshold 0.2
+"""
+import io
+import os
+import sys
+import json
+import time
+import platform
+import argparse
+import logging
+import statistics
+import subprocess
+
+# Stub Gemini before the app is imported: instant fake responses, no question-set reuse
+os.environ["GEMINI_FAKE_LATENCY"] = os.environ.get("GEMINI_FAKE_LATENCY", "0")
+os.environ["GEMINI_FAKE_FAILURE_RATE"] = "0"
+os.environ["QSET_MAX_SERVES"] = "0"
+os.environ.pop("GEMINI_API_KEY", None)
+
+from benchmarks.corpus import generate_corpus
+
+logging.disable(logging.WARNING)
+import index
+
+
+def summarize(samples):
+    samples = sorted(samples)
+    total = sum(samples)
+    return {
+        'n': len(samples),
+        'mean_ms': round(total / len(samples) * 1000, 3),
+        'p50_ms': round(samples[len(samples) // 2] * 1000, 3),
+        'p95_ms': round(samples[min(len(samples) - 1, int(len(samples) * 0.95))] * 1000, 3),
+        'max_ms': round(samples[-1] * 1000, 3),
+        'per_second': round(len(samples) / total, 2) if total else None,
+    }
+
+
+def timed(fn, items, repeat):
+    samples = []
+    for _ in range(repeat):
+        for item in items:
+            started = time.perf_counter()
+            fn(item)
+            samples.append(time.perf_counter() - started)
+    return summarize(samples)
+
+
+def upload(client, filename, data):
+    response = client.post('/api/upload?nocache=1', content_type='multipart/form-data',
+                           data={'resume': (io.BytesIO(data), filename)})
+    assert response.status_code == 200, response.get_data(as_text=True)
+
+
+def run_benchmarks(corpus, repeat):
+    by_format = {}
+    for filename, data, text in corpus:
+        by_format.setdefault(os.path.splitext(filename)[1], []).append((filename, data, text))
+    client = index.app.test_client()
+
+    results = {
+        'extract_skills': timed(lambda item: index.extract_skills(item[2]), corpus, repeat),
+    }
+    if '.pdf' in by_format:
+        results['extract_text_from_pdf'] = timed(
+            lambda item: index.extract_text_from_pdf(io.BytesIO(item[1])), by_format['.pdf'], repeat)
+    if '.docx' in by_format:
+        results['extract_text_from_docx'] = timed(
+            lambda item: index.extract_text_from_docx(io.BytesIO(item[1])), by_format['.docx'], repeat)
+    for ext, items in sorted(by_format.items()):
+        results[f'upload{ext.replace(".", "_")}'] = timed(
+            lambda item: upload(client, item[0], item[1]), items, repeat)
+    return results
+
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(results, baseline_path, threshold):
+    """Print p50 deltas against a previous run; returns the names of regressed benchmarks."""
+    with open(baseline_path) as f:
+        baseline = json.load(f)['results']
+    regressions = []
+    print(f"\nCompared with {baseline_path} (regression threshold {threshold:.0%} on p50)")
+    for name, current in results.items():
+        if name not in baseline:
+            continue
+        before, after = baseline[name]['p50_ms'], current['p50_ms']
+        change = (after - before) / before if before else 0.0
+        flag = "REGRESSION" if change > threshold else ""
+        if flag:
+            regressions.append(name)
+        print(f"{name:<26} {before:>10.3f} -> {after:>10.3f} ms  {change:>+7.1%} {flag}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run backend performance benchmarks")
+    parser.add_argument('--count', type=int, default=30, help="Resumes in the synthetic corpus")
+    parser.add_argument('--words', type=int, default=600, help="Approximate words per resume")
+    parser.add_argument('--density', type=float, default=0.05, help="Fraction of words that are skill terms")
+    parser.add_argument('--formats', default='txt,docx,pdf')
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', help="Write results JSON to this path")
+    parser.add_argument('--compare', help="Baseline results JSON to compare against")
+    parser.add_argument('--threshold', type=float, default=0.2, help="Relative p50 slowdown counted as a regression")
+    args = parser.parse_args()
+
+    params = {k: getattr(args, k) for k in ('count', 'words', 'density', 'formats', 'repeat', 'seed')}
+    corpus = generate_corpus(args.count, args.words, args.density, tuple(args.formats.split(',')), args.seed)
+    results = run_benchmarks(corpus, args.repeat)
+
+    report = {
+        'meta': {
+            'commit': git_commit(),
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'cpu_count': os.cpu_count(),
+            'params': params,
+        },
+        'results': results,
+    }
+
+    print(f"{'benchmark':<26} {'n':>5} {'mean ms':>10} {'p50 ms':>10} {'p95 ms':>10} {'per sec':>9}")
+    for name, r in results.items():
+        print(f"{name:<26} {r['n']:>5} {r['mean_ms']:>10.3f} {r['p50_ms']:>10.3f} {r['p95_ms']:>10.3f} {r['per_second']:>9}")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"\nWrote {args.output}")
+
+    if args.compare and compare(results, args.compare, args.threshold):
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
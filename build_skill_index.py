@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""
+Build-time step: precompile the skill matcher into api/skill_index.json so
+cold starts load it instead of rebuilding the trie from QUESTIONS_DB and
+SKILL_ALIASES (plus skill_aliases.json overrides). Re-run after editing
+questions.json or the aliases; a stale
+index is detected by its fingerprint and ignored at startup.
+--check writes nothing and exits with status 1 if the index on disk differs
+from a fresh build (run in CI, see .github/workflows/skill-index.yml).
+
+Usage: python build_skill_index.py [--out PATH] [--check]
+"""
+import sys
+import os
+import json
+import logging
+import argparse
+
+# Add api directory to path to import index
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), 'api'))
+
+logging.disable(logging.INFO)
+from index import QUESTIONS_DB, SKILL_INDEX_PATH, SkillMatcher, load_skill_aliases, skill_index_fingerprint
+
+
+def build_index():
+    """The skill index file contents for the current questions.json and aliases."""
+    aliases = load_skill_aliases()
+    matcher = SkillMatcher(QUESTIONS_DB.keys(), aliases, QUESTIONS_DB)
+    return json.dumps({
+        'fingerprint': skill_index_fingerprint(QUESTIONS_DB.keys(), aliases),
+        'matcher': matcher.to_dict()
+    }, separators=(',', ':')), len(matcher.rules)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Precompile the skill matcher for fast cold starts")
+    parser.add_argument('--out', default=SKILL_INDEX_PATH, help=f"Index file (default: {SKILL_INDEX_PATH})")
+    parser.add_argument('--check', action='store_true',
+                        help="Don't write; exit with status 1 if the index file is missing or stale")
+    args = parser.parse_args()
+
+    contents, terms = build_index()
+    if args.check:
+        try:
+            with open(args.out, 'r') as f:
+                current = f.read()
+        except FileNotFoundError:
+            current = None
+        if current != contents:
+            print(f"{args.out} is {'missing' if current is None else 'stale'}; "
+                  f"run python build_skill_index.py and commit the result", file=sys.stderr)
+            sys.exit(1)
+        print(f"{args.out} is up to date ({terms} terms)")
+        return
+
+    with open(args.out, 'w') as f:
+        f.write(contents)
+    print(f"Wrote skill index with {terms} terms to {args.out}")
+
+
+if __name__ == '__main__':
+    main()
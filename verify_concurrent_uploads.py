@@ -0,0 +1,70 @@
+import sys
+import os
+import io
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
+# Add api directory to path to import the Flask app
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), 'api'))
+
+logging.disable(logging.INFO)
+os.environ.pop("GEMINI_API_KEY", None)  # Static question bank only - no network calls
+
+import docx
+from index import app, extract_skills
+
+SKILL_SETS = [
+    ["python", "django", "postgresql"],
+    ["java", "spring", "kubernetes"],
+    ["react", "typescript", "html"],
+    ["accounting", "excel", "auditing"],
+    ["nursing", "patient care"],
+    ["seo", "digital marketing"],
+    ["rust", "docker", "aws"],
+    ["tableau", "sql", "data analysis"],
+]
+
+
+def make_resume(index, skills):
+    return (f"Candidate {index}\nSKILLS: {', '.join(skills)}\n"
+            f"EXPERIENCE: Worked with {' and '.join(skills)} for {index % 10 + 1} years.\n")
+
+
+def make_upload(index):
+    skills = SKILL_SETS[index % len(SKILL_SETS)]
+    text = make_resume(index, skills)
+    if index % 2:
+        document = docx.Document()
+        for line in text.splitlines():
+            document.add_paragraph(line)
+        buffer = io.BytesIO()
+        document.save(buffer)
+        return text, buffer.getvalue(), f"resume_{index}.docx"
+    return text, text.encode('utf-8'), f"resume_{index}.txt"
+
+
+def upload(index):
+    text, data, filename = make_upload(index)
+    client = app.test_client()
+    response = client.post('/api/upload?nocache=1',
+                           data={'resume': (io.BytesIO(data), filename)},
+                           content_type='multipart/form-data')
+    expected = sorted(extract_skills(text))
+    actual = sorted(response.get_json().get('skills', []))
+    return filename, response.status_code, expected == actual
+
+
+print("Running Concurrent Upload Verification...")
+print("-" * 50)
+
+with ThreadPoolExecutor(max_workers=16) as pool:
+    results = list(pool.map(upload, range(64)))
+
+passed = 0
+for filename, status, matches in results:
+    if status == 200 and matches:
+        passed += 1
+    else:
+        print(f"FAIL: {filename} (status {status}) got another upload's result")
+
+print(f"Total Passed: {passed}/{len(results)}")
@@ -0,0 +1,85 @@
+import sys
+import os
+import random
+import logging
+
+# Add api directory to path to import the app module
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), 'api'))
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+logging.disable(logging.WARNING)
+from index import analyze_incremental, extract_skills
+from benchmarks.corpus import generate_corpus
+
+RESUME = """Jane Doe
+PYTHON DEVELOPER
+jane@example.com
+
+SKILLS
+Docker, Kubernetes
+
+AWS CERTIFIED
+EXPERIENCE
+Built services at Example Corp.
+"""
+
+# (description, original text, edited text)
+EDITS = [
+    ("all-caps content lines keep their skills", RESUME, RESUME.replace("Docker", "Docker, Terraform")),
+    ("edit inside an all-caps line", RESUME, RESUME.replace("AWS CERTIFIED", "AWS AND GCP CERTIFIED")),
+    ("skill on a heading line", "Summary: react and node\nSKILLS\nsql\n", "Summary: react and vue\nSKILLS\nsql\n"),
+    ("section added in front of a skill", RESUME, RESUME.replace("EXPERIENCE", "PROJECTS\nMachine\nEXPERIENCE")),
+    ("edited section followed by an unchanged one", RESUME, RESUME.replace("Built services", "Built Go services")),
+]
+
+
+def check(original, edited):
+    payload, _, state, _ = analyze_incremental(original, seed_key="verify")
+    if state['skills'] != extract_skills(original):
+        print(f"FAIL: first analysis found {state['skills']}, expected {extract_skills(original)}")
+        return False
+    _, _, state, _ = analyze_incremental(edited, previous=state, seed_key="verify")
+    if state['skills'] != extract_skills(edited):
+        print(f"FAIL: incremental analysis found {state['skills']}, expected {extract_skills(edited)}")
+        return False
+    return True
+
+
+def corpus_edits(count=40):
+    """Random line edits (inserted skills, new headings, deleted lines) on synthetic resumes."""
+    rnd = random.Random(3)
+    cases = []
+    for _, _, text in generate_corpus(count, words=200, formats=('txt',), seed=5):
+        lines = text.splitlines()
+        for _ in range(3):
+            at = rnd.randrange(len(lines))
+            action = rnd.choice(('skill', 'heading', 'caps', 'delete'))
+            if action == 'skill':
+                lines[at] += " " + rnd.choice(("python", "aws", "c++", "go", "sql"))
+            elif action == 'heading':
+                lines.insert(at, rnd.choice(("PROJECTS", "Certifications:", "Languages")))
+            elif action == 'caps':
+                lines.insert(at, rnd.choice(("AWS CERTIFIED", "SENIOR JAVA ENGINEER", "REACT / NODE")))
+            elif len(lines) > 1:
+                del lines[at]
+        cases.append((text, "\n".join(lines) + "\n"))
+    return cases
+
+
+print("Running Incremental Analysis Verification...")
+print("-" * 50)
+
+passed = 0
+total = 0
+for name, original, edited in EDITS:
+    ok = check(original, edited)
+    print(f"{'PASS' if ok else 'FAIL'}: {name}")
+    passed += ok
+    total += 1
+
+failures = sum(not check(original, edited) for original, edited in corpus_edits())
+print(f"{'PASS' if not failures else 'FAIL'}: random edits of synthetic resumes ({failures} mismatches)")
+passed += not failures
+total += 1
+
+print(f"Total Passed: {passed}/{total}")
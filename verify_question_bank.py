@@ -0,0 +1,62 @@
+import sys
+import os
+
+# Add api directory to path to import the question bank
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), 'api'))
+
+from _question_bank import QuestionBank
+
+# Uneven pools: one skill with a single question, one with plenty, a tiny generic pool,
+# and questions shared between skills
+QUESTIONS_DB = {
+    "rust": ["Explain ownership in Rust."],
+    "python": [f"Python question {i}" for i in range(12)],
+    "sql": ["Python question 0", "Python question 1", "Python question 2", "What is a SQL join?"],
+    "generic": ["Tell me about a challenge you overcame."],
+}
+
+bank = QuestionBank(QUESTIONS_DB)
+
+
+def check_select(skills, expected_count):
+    failures = 0
+    for seed in range(200):
+        questions = bank.select(skills, seed_key=f"resume|{seed}")
+        if len(questions) != expected_count or len(set(questions)) != len(questions):
+            print(f"FAIL: select({skills}) with seed {seed} gave {len(questions)} questions: {questions}")
+            failures += 1
+    return failures == 0
+
+
+def check_sample_with_exclusions():
+    # Exclude most of python's pool; the 3 questions left must still be found
+    start, end = bank.ranges["python"]
+    ids = list(bank.ids[start:end])
+    exclude = set(ids[:9])
+    for seed in range(200):
+        picked = bank.sample("python", 3, bank.rng(seed), exclude)
+        if sorted(picked) != sorted(ids[9:]):
+            print(f"FAIL: sample with seed {seed} picked {picked}, expected {ids[9:]}")
+            return False
+    return True
+
+
+print("Running Question Bank Verification...")
+print("-" * 50)
+
+test_cases = [
+    ("short skill and generic pools are topped up from other skills", lambda: check_select(["rust", "sql"], 5)),
+    ("only the questions that exist are returned", lambda: check_select(["rust"], 2)),
+    ("shared questions are not repeated", lambda: check_select(["sql", "python"], 5)),
+    ("one pick short per skill is made up by the generic pool", lambda: check_select(["rust", "python", "sql"], 5)),
+    ("sample skips excluded questions", check_sample_with_exclusions),
+    ("same seed gives the same questions", lambda: bank.select(["rust", "python"], "a") == bank.select(["rust", "python"], "a")),
+]
+
+passed = 0
+for name, check in test_cases:
+    ok = check()
+    print(f"{'PASS' if ok else 'FAIL'}: {name}")
+    passed += ok
+
+print(f"Total Passed: {passed}/{len(test_cases)}")